@@ -195,16 +195,18 @@ def automated_login(client_id,secret_key,FY_ID,TOTP_KEY,PIN,redirect_uri):
     
     print("automated_login completed successfully")
 
+def quote_ltp(res):
+    # Last price from a quotes response (None if the response has none)
+    if isinstance(res, dict) and 'd' in res and len(res['d']) > 0:
+        return res['d'][0]['v'].get('lp')
+    print("Last Price (lp) not found in the response.")
+    return None
+
 def get_ltp(SYMBOL):
     global fyers
     data={"symbols":f"{SYMBOL}"}
     res=fyers.quotes(data)
-    if 'd' in res and len(res['d']) > 0:
-        lp = res['d'][0]['v']['lp']
-        return lp
-
-    else:
-        print("Last Price (lp) not found in the response.")
+    return quote_ltp(res)
 
 
 
@@ -358,7 +360,76 @@ def fetchOHLC_Weekly(symbol):
 
 #     return df_weekly  # Return last 20 weeks
 
-def fetchOHLC(symbol,tf):
+def history_request(symbol, tf, range_from=None):
+    # Query parameters for the history API: from range_from (or 90 days back) up to today
+    dat =str(datetime.now().date())
+    dat1 = str((datetime.now() - timedelta(90)).date())
+    if range_from is not None:
+        range_from_date = range_from.date() if isinstance(range_from, datetime) else range_from
+        # Never go further back than the default 90-day window
+        dat1 = str(max(range_from_date, (datetime.now() - timedelta(90)).date()))
+    return {
+        "symbol": symbol,
+        "resolution":str(tf),
+        "date_format": "1",
+        "range_from": dat1,
+        "range_to": dat,
+        "cont_flag": "1"
+    }
+
+def history_to_dataframe(response, symbol_for_logging):
+    # History API response -> DataFrame (date in IST, open, high, low, close, volume)
+    # Returns None on an API error and an empty DataFrame when no candles came back
+    # Check response structure (minimal logging)
+    if isinstance(response, dict):
+        if 's' in response:
+            status = response['s']
+            if status != 'ok':
+                print(f"⚠️ API Status: {status}")
+        if 'candles' in response:
+            candle_count = len(response['candles']) if isinstance(response['candles'], list) else 0
+            print(f"✓ Fetched {candle_count} candles for {symbol_for_logging}")
+        else:
+            # Always use the stored symbol for error reporting to avoid corruption
+            print(f"⚠️ WARNING: 'candles' key not found in response for {symbol_for_logging}")
+            print(f"Response keys: {list(response.keys())}")
+            # Debug: Check if response contains symbol info
+            if 'message' in response:
+                print(f"DEBUG fetchOHLC: API error message: {response.get('message')}")
+            if 'symbol' in response:
+                print(f"DEBUG fetchOHLC: Response contains symbol: {response.get('symbol')}")
+    else:
+        print(f"⚠️ WARNING: Response is not a dict, type: {type(response)}")
+    
+    # Check if response has error
+    if isinstance(response, dict) and response.get('s') != 'ok':
+        error_msg = response.get('message', 'Unknown error')
+        print(f"❌ API Error: {error_msg}")
+        print(f"Response: {response}")
+        return None
+    
+    # Check if candles exist
+    if 'candles' not in response:
+        print("❌ ERROR: 'candles' key missing in response")
+        return None
+    
+    if not isinstance(response['candles'], list):
+        print(f"❌ ERROR: 'candles' is not a list, type: {type(response['candles'])}")
+        return None
+    
+    if len(response['candles']) == 0:
+        print("⚠️ WARNING: Empty candles list returned")
+        return pd.DataFrame()  # Return empty DataFrame
+    
+    cl = ['date', 'open', 'high', 'low', 'close', 'volume']
+    df = pd.DataFrame(response['candles'], columns=cl)
+    df['date']=df['date'].apply(pd.Timestamp,unit='s',tzinfo=pytz.timezone('Asia/Kolkata'))
+    
+    return df
+
+def fetchOHLC(symbol,tf,range_from=None):
+    # range_from: optional date/datetime to start the history from (defaults to 90 days back).
+    # Used to fetch only the candles needed instead of the full 90-day window.
     # Ensure symbol is a string and strip any whitespace
     symbol = str(symbol).strip() if symbol else None
     if not symbol:
@@ -368,23 +439,13 @@ def fetchOHLC(symbol,tf):
     # Debug: Print the symbol being sent to API
     print(f"DEBUG fetchOHLC: Symbol received: '{symbol}' (type: {type(symbol)}, length: {len(symbol)})")
     
-    dat =str(datetime.now().date())
-    dat1 = str((datetime.now() - timedelta(90)).date())
-    
     # Ensure symbol is clean before creating data dict
     clean_symbol = str(symbol).strip()
     
     # Debug: Verify symbol before creating data dict
     print(f"DEBUG fetchOHLC: Clean symbol before data dict: '{clean_symbol}' (length: {len(clean_symbol)})")
     
-    data = {
-        "symbol": clean_symbol,  # Use the cleaned symbol
-        "resolution":str(tf),
-        "date_format": "1",
-        "range_from": dat1,
-        "range_to": dat,
-        "cont_flag": "1"
-    }
+    data = history_request(clean_symbol, tf, range_from)
 
     print("data: ",data)
     
@@ -405,53 +466,7 @@ def fetchOHLC(symbol,tf):
         print(f"DEBUG fetchOHLC: About to call API with symbol: '{symbol_for_logging}'")
         
         response = fyers.history(data=data)
-        
-        # Check response structure (minimal logging)
-        if isinstance(response, dict):
-            if 's' in response:
-                status = response['s']
-                if status != 'ok':
-                    print(f"⚠️ API Status: {status}")
-            if 'candles' in response:
-                candle_count = len(response['candles']) if isinstance(response['candles'], list) else 0
-                print(f"✓ Fetched {candle_count} candles for {symbol_for_logging}")
-            else:
-                # Always use the stored symbol for error reporting to avoid corruption
-                print(f"⚠️ WARNING: 'candles' key not found in response for {symbol_for_logging}")
-                print(f"Response keys: {list(response.keys())}")
-                # Debug: Check if response contains symbol info
-                if 'message' in response:
-                    print(f"DEBUG fetchOHLC: API error message: {response.get('message')}")
-                if 'symbol' in response:
-                    print(f"DEBUG fetchOHLC: Response contains symbol: {response.get('symbol')}")
-        else:
-            print(f"⚠️ WARNING: Response is not a dict, type: {type(response)}")
-        
-        # Check if response has error
-        if isinstance(response, dict) and response.get('s') != 'ok':
-            error_msg = response.get('message', 'Unknown error')
-            print(f"❌ API Error: {error_msg}")
-            print(f"Response: {response}")
-            return None
-        
-        # Check if candles exist
-        if 'candles' not in response:
-            print("❌ ERROR: 'candles' key missing in response")
-            return None
-        
-        if not isinstance(response['candles'], list):
-            print(f"❌ ERROR: 'candles' is not a list, type: {type(response['candles'])}")
-            return None
-        
-        if len(response['candles']) == 0:
-            print("⚠️ WARNING: Empty candles list returned")
-            return pd.DataFrame()  # Return empty DataFrame
-        
-        cl = ['date', 'open', 'high', 'low', 'close', 'volume']
-        df = pd.DataFrame(response['candles'], columns=cl)
-        df['date']=df['date'].apply(pd.Timestamp,unit='s',tzinfo=pytz.timezone('Asia/Kolkata'))
-        
-        return df
+        return history_to_dataframe(response, symbol_for_logging)
         
     except Exception as e:
         print(f"\n❌ EXCEPTION in fetchOHLC:")
@@ -0,0 +1,73 @@
+"""
+Binary chart payload encoding for IV Charts application
+Compact alternative to the JSON chart payload that the browser can wrap as typed arrays without parsing
+
+Layout (little-endian, every block starts on an 8-byte boundary so it can be viewed in place):
+- Header, 24 bytes: magic 'IVB1', version (uint16), flags (uint16, bit 0 = values are float32),
+  point count (uint32), series mask (uint32), base time (int64 epoch seconds)
+- Time deltas: int32[count] seconds from the previous point (the first delta is 0)
+- One float32/float64[count] block per series present in the mask, in SERIES order
+
+Times are chart time: the IST wallclock read as UTC epoch seconds, which is what convertToIST() in the
+chart produces from the '+05:30' ISO strings. Missing values (None) are NaN.
+"""
+
+import json
+import struct
+import numpy as np
+
+BINARY_MAGIC = b'IVB1'
+BINARY_VERSION = 1
+BINARY_MIMETYPE = 'application/octet-stream'
+BINARY_HEADER = struct.Struct('<4sHHIIq')
+FLAG_FLOAT32 = 1
+
+# Aligned payload lists that can be encoded, bit i of the series mask = SERIES[i]
+SERIES = ('iv_values', 'close_prices', 'fclose_prices', 'strikes', 'iv_open', 'iv_high', 'iv_low')
+
+
+def chart_times(timestamps):
+    """'%Y-%m-%dT%H:%M:%S+05:30' strings -> int64 chart-time epoch seconds (IST wallclock as UTC)"""
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # numpy parses the naive ISO part directly; the offset is always +05:30, so it is dropped
+    return np.array([t[:19] for t in timestamps], dtype='datetime64[s]').astype(np.int64)
+
+
+def _pad(length):
+    return b'\0' * (-length % 8)
+
+
+def encode_chart_payload(payload, float32=True):
+    """
+    Encode a chart payload dict as (body bytes, metadata dict)
+    The metadata holds the non-list keys (last_update, has_more, resolution, ...) for a response header
+    """
+    timestamps = payload.get('timestamps') or []
+    count = len(timestamps)
+    times = chart_times(timestamps)
+    dtype = '<f4' if float32 else '<f8'
+
+    mask = 0
+    blocks = []
+    for bit, key in enumerate(SERIES):
+        values = payload.get(key)
+        if isinstance(values, list) and count > 0 and len(values) == count:
+            mask |= 1 << bit
+            blocks.append(np.array([np.nan if v is None else v for v in values], dtype=np.float64).astype(dtype).tobytes())
+
+    base = int(times[0]) if count else 0
+    deltas = np.diff(times, prepend=base).astype('<i4').tobytes()
+    parts = [BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, FLAG_FLOAT32 if float32 else 0, count, mask, base),
+             deltas, _pad(len(deltas))]
+    for block in blocks:
+        parts.extend([block, _pad(len(block))])
+
+    metadata = {key: value for key, value in payload.items() if not isinstance(value, list)}
+    metadata['data_points'] = count
+    return b''.join(parts), metadata
+
+
+def encode_metadata_header(metadata):
+    """Metadata dict -> compact ASCII JSON for the X-IV-Meta response header"""
+    return json.dumps(metadata, separators=(',', ':'), default=str, ensure_ascii=True)
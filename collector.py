@@ -0,0 +1,162 @@
+"""
+Headless IV collector for IV Charts application
+Logs in to Fyers and runs an automatic-mode tracker (continuous ATM series) for every SymbolSetting.csv row,
+writing to the shared storage backend in data/. No web server runs in this process.
+
+Run the web UI next to it as a read-only viewer of the same data folder:
+    python -m collector --timeframe 5 --option-type cp
+    IV_VIEWER_ONLY=1 python main.py
+
+Tracker status and the time each series was last written are published every STATUS_WRITE_SECONDS in
+data/collector_status.json, which the viewer follows. Every in-memory series is also published to shared
+memory (shared_series.py) on each change. SIGINT/SIGTERM cancel every tracker and exit.
+"""
+
+import argparse
+import math
+import signal
+import threading
+from datetime import datetime
+import FyresIntegration
+from FyresIntegration import automated_login
+import main
+from main import (ATM_HYSTERESIS_BAND, ATM_MIN_DWELL_SECONDS, FORWARD_SOURCES, TIME_BASES, fetch_data_loop_automatic,
+                  generate_future_symbol_from_settings, load_credentials, load_symbol_settings, run_tracker,
+                  write_collector_status)
+
+STATUS_WRITE_SECONDS = 5
+DEFAULT_STRIKE_STEP = 50  # Rows without a StrikeStep
+SHUTDOWN_TIMEOUT = 30  # Seconds to wait for each tracker's in-flight request on exit
+
+
+def login():
+    """Log in with FyersCredentials.csv; True if the session is usable"""
+    credentials = load_credentials()
+    if not credentials:
+        print("❌ Could not load FyersCredentials.csv")
+        return False
+    try:
+        automated_login(
+            client_id=credentials.get('client_id'),
+            secret_key=credentials.get('secret_key'),
+            FY_ID=credentials.get('FY_ID'),
+            TOTP_KEY=credentials.get('totpkey'),
+            PIN=credentials.get('PIN'),
+            redirect_uri=credentials.get('redirect_uri')
+        )
+    except Exception as e:
+        print(f"❌ Login failed: {e}")
+    return FyresIntegration.fyers is not None
+
+
+def build_trackers(args):
+    """One tracker status dict per SymbolSetting.csv row that has an option expiry"""
+    trackers = []
+    for row in load_symbol_settings():
+        future_symbol = generate_future_symbol_from_settings(row['prefix'], row['symbol'], row['expiry_date'])
+        if not future_symbol or not row.get('option_expiry_datetime'):
+            print(f"⚠ Skipping {row['prefix']}:{row['symbol']} - no future symbol or option expiry in SymbolSetting.csv")
+            continue
+        trackers.append({
+            "active": True,
+            "mode": "automatic",
+            "future_symbol": future_symbol,
+            "timeframe": args.timeframe,
+            "expiry_type": args.expiry_type,
+            "option_type": args.option_type,
+            "expiry": row['option_expiry_datetime'].isoformat(),
+            "strike_step": row.get('strike_step') or DEFAULT_STRIKE_STEP,
+            "forward_source": args.forward_source,
+            "time_basis": args.time_basis,
+            "atm_hysteresis": args.atm_hysteresis,
+            "atm_min_dwell": args.atm_min_dwell,
+            "symbol": None,
+            "strike": None
+        })
+    return trackers
+
+
+def start_tracker(tracker, args):
+    """Start one tracker's fetch loop on its own thread; returns (thread, cancellation token)"""
+    token = threading.Event()
+    thread = threading.Thread(
+        target=run_tracker,
+        args=(tracker['future_symbol'], token, fetch_data_loop_automatic, tracker['future_symbol'],
+              datetime.fromisoformat(tracker['expiry']), tracker['expiry_type'], tracker['option_type'],
+              tracker['timeframe'], tracker['strike_step'], args.risk_free_rate, tracker['atm_hysteresis'],
+              tracker['atm_min_dwell'], tracker['forward_source'], tracker['time_basis']),
+        kwargs={'status': tracker},
+        name=f"tracker-{tracker['future_symbol']}",
+        daemon=True
+    )
+    thread.start()
+    return thread, token
+
+
+def run_collector(args):
+    """Log in, start a tracker per symbol and publish their status until SIGINT/SIGTERM"""
+    if main.VIEWER_ONLY:
+        print("❌ IV_VIEWER_ONLY=1 is set - the collector must run without it")
+        return 1
+    if not login():
+        print("❌ Fyers login failed - collector not started")
+        return 1
+
+    trackers = build_trackers(args)
+    if not trackers:
+        print("❌ No trackable rows in SymbolSetting.csv")
+        return 1
+
+    if main.start_shared_series_export():
+        print("✓ Publishing series to shared memory for viewer processes")
+
+    shutdown = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: shutdown.set())
+
+    started = datetime.now().isoformat()
+    running = [start_tracker(tracker, args) for tracker in trackers]
+    print(f"✓ Collector started {len(running)} trackers: {', '.join(t['future_symbol'] for t in trackers)}")
+
+    while not shutdown.wait(STATUS_WRITE_SECONDS):
+        for tracker, (thread, _) in zip(trackers, running):
+            tracker['active'] = tracker['active'] and thread.is_alive()
+        try:
+            write_collector_status(trackers, started=started)
+        except OSError as e:
+            print(f"⚠ Could not write collector status: {e}")
+
+    print("Stopping collector - cancelling all trackers...")
+    for tracker, (_, token) in zip(trackers, running):
+        tracker['active'] = False
+        token.set()
+    write_collector_status(trackers, started=started)
+    for thread, _ in running:
+        thread.join(timeout=SHUTDOWN_TIMEOUT)
+    if main.shared_series_writer is not None:
+        main.shared_series_writer.close()
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless IV collector: tracks every SymbolSetting.csv row")
+    parser.add_argument('--timeframe', default='1', help="Candle timeframe/resolution (default: 1)")
+    parser.add_argument('--option-type', default='c', choices=['c', 'p', 'cp'], help="c, p or cp (straddle)")
+    parser.add_argument('--expiry-type', default='weekly', choices=['weekly', 'monthly'])
+    parser.add_argument('--risk-free-rate', type=float, default=0.07)
+    parser.add_argument('--forward-source', default='future', choices=FORWARD_SOURCES)
+    parser.add_argument('--time-basis', default='calendar', choices=TIME_BASES)
+    parser.add_argument('--atm-hysteresis', type=float, default=ATM_HYSTERESIS_BAND,
+                        help=f"ATM roll band past the strike midpoint, fraction of the strike step (default: {ATM_HYSTERESIS_BAND}, 0 = plain rounding)")
+    parser.add_argument('--atm-min-dwell', type=float, default=ATM_MIN_DWELL_SECONDS,
+                        help=f"Seconds a strike stays ATM before another roll (default: {ATM_MIN_DWELL_SECONDS})")
+    args = parser.parse_args(argv)
+    if not (math.isfinite(args.atm_hysteresis) and 0 <= args.atm_hysteresis < 0.5):
+        parser.error("--atm-hysteresis must be between 0 and 0.5")
+    if not (math.isfinite(args.atm_min_dwell) and args.atm_min_dwell >= 0):
+        parser.error("--atm-min-dwell must be a non-negative number of seconds")
+    return args
+
+
+if __name__ == '__main__':
+    raise SystemExit(run_collector(parse_args()))
@@ -0,0 +1,95 @@
+"""
+Chart downsampling for IV Charts application
+Reduce over-dense series to a point budget while keeping their visual shape
+
+- lttb:   Largest-Triangle-Three-Buckets, one point per bucket (keeps peaks and the overall line shape)
+- minmax: lowest and highest point of each bucket (keeps every spike, good for noisy IV)
+
+Rows are selected by index, so IV, close and fclose (and any other aligned list) stay aligned:
+all of them take part in choosing the rows, each scaled to 0..1 so no series dominates.
+"""
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def _normalize(values):
+    """Scale a series to 0..1 (NaN -> 0) so series with different units can be compared"""
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros(len(values))
+    low, high = values[finite].min(), values[finite].max()
+    scaled = (values - low) / (high - low) if high > low else np.zeros(len(values))
+    return np.where(finite, scaled, 0.0)
+
+
+def lttb_indices(x, series, max_points):
+    """
+    Row indexes picked by Largest-Triangle-Three-Buckets over one or more aligned series
+
+    Parameters:
+    - x: Sort key of each row (e.g. epoch seconds)
+    - series: List of value arrays, all the same length as x
+    - max_points: Number of rows to keep (first and last row are always kept)
+    """
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1])
+
+    x = _normalize(x)
+    y = np.column_stack([_normalize(values) for values in series])
+    every = (n - 2) / (max_points - 2)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+
+    for i in range(max_points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Average of the next bucket (the last row for the final bucket)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean(axis=0)
+
+        # Triangle area (a, candidate, next-bucket average), summed over all series
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end])[:, None] * (avg_y - y[a])).sum(axis=1)
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax_indices(series, max_points):
+    """
+    Row indexes of the min and max of every series within equal-size buckets
+
+    The bucket count is chosen so the result (plus first and last row) stays within max_points.
+    """
+    n = len(series[0]) if series else 0
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+
+    columns = [_normalize(values) for values in series]
+    buckets = max(1, (max_points - 2) // (2 * len(columns)))
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    picked = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        for values in columns:
+            window = values[start:end]
+            picked.append(start + int(np.argmin(window)))
+            picked.append(start + int(np.argmax(window)))
+    return np.unique(picked)
+
+
+def downsample_indices(x, series, max_points, method='lttb'):
+    """Row indexes to keep for a point budget (all rows if they already fit)"""
+    if method == 'minmax':
+        return minmax_indices(series, max_points)
+    return lttb_indices(x, series, max_points)
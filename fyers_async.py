@@ -0,0 +1,195 @@
+"""
+Asynchronous Fyers REST engine for IV Charts application
+Runs history and quote requests for every tracker on one asyncio event loop (a single background thread)
+with a shared aiohttp session and a bounded number of requests in flight
+
+Responses go through the same conversion as the synchronous client (FyresIntegration.history_to_dataframe,
+quote_ltp), so callers get the DataFrames fetchOHLC returns. Flask handlers and the fetch loops use the
+blocking facade (fetch_ohlc, fetch_ohlc_many, fetch_ltp), which submits to the loop and waits on the result.
+Quotes requested by different trackers at about the same time are merged into one batched request.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import FyresIntegration
+from FyresIntegration import history_request, history_to_dataframe, quote_ltp
+
+# aiohttp is optional (pip install aiohttp); without it the app keeps using the synchronous fyers client
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+DATA_API = 'https://api-t1.fyers.in/data'
+# Requests in flight at once across all trackers (IV_FYERS_CONCURRENCY overrides)
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('IV_FYERS_CONCURRENCY') or 8)
+REQUEST_TIMEOUT = 30  # Seconds for one request, connect to last byte
+CANCEL_POLL = 0.2  # Seconds between checks of a caller's stop_event while its request is in flight
+QUOTES_BATCH = 50  # Symbols per quotes request
+QUOTES_WINDOW = 0.05  # Seconds a quote waits for other trackers' quotes to share its request
+
+
+class FyersAsyncEngine:
+    """One event loop thread driving all Fyers REST calls; start() is called on first use"""
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS):
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+        self._pending_quotes = {}  # symbol -> future of the next batched quotes request (engine loop only)
+        self._quote_tasks = set()
+
+    # --- event loop thread ---
+
+    def start(self):
+        """Start the event loop thread (no-op if it is running)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not AIOHTTP_AVAILABLE:
+                raise RuntimeError("aiohttp is not installed. Install with: pip install aiohttp")
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name='fyers-async', daemon=True)
+            self._thread.start()
+            ready.wait()
+            print(f"✓ Async Fyers engine started (max {self.max_concurrency} concurrent requests)")
+
+    def _run(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        ready.set()
+        self._loop.run_forever()
+
+    def close(self):
+        """Close the HTTP session and stop the event loop thread"""
+        if self._loop is None or not self._loop.is_running():
+            return
+        self.submit(self._close_session()).result(timeout=REQUEST_TIMEOUT)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=REQUEST_TIMEOUT)
+        self._thread = None
+
+    async def _close_session(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop; returns a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, stop_event=None, timeout=None):
+        """
+        Run a coroutine on the engine loop and block for its result
+        If stop_event is set while waiting, the request is cancelled and None is returned
+        """
+        future = self.submit(coro)
+        if stop_event is None:
+            return future.result(timeout=timeout)
+        waited = 0.0
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL)
+            except concurrent.futures.TimeoutError:
+                waited += CANCEL_POLL
+                if stop_event.is_set() or (timeout is not None and waited >= timeout):
+                    future.cancel()
+                    if stop_event.is_set():
+                        return None
+                    raise
+
+    # --- coroutines (run on the engine loop) ---
+
+    async def _get(self, endpoint, params):
+        """GET a data API endpoint with the logged-in token; returns the JSON response dict"""
+        fyers = FyresIntegration.fyers
+        if fyers is None:
+            return {'s': 'error', 'message': 'Fyers not initialized'}
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+        headers = {'Authorization': f"{fyers.client_id}:{fyers.token}", 'Content-Type': 'application/json', 'version': '3'}
+        async with self._semaphore:
+            try:
+                async with self._session.get(DATA_API + endpoint, params=params, headers=headers) as response:
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                return {'s': 'error', 'message': f"{type(e).__name__}: {e}"}
+
+    async def history(self, symbol, tf, range_from=None):
+        """History for one symbol as a DataFrame (None on an API error), like fetchOHLC"""
+        symbol = str(symbol).strip()
+        response = await self._get('/history', history_request(symbol, tf, range_from))
+        return history_to_dataframe(response, symbol)
+
+    async def history_many(self, requests):
+        """History for several (symbol, tf, range_from) requests at once, in request order"""
+        return await asyncio.gather(*(self.history(*request) for request in requests))
+
+    async def quotes(self, symbols):
+        """Last price per symbol ({symbol: ltp or None}), batched QUOTES_BATCH symbols per request"""
+        symbols = list(dict.fromkeys(str(s).strip() for s in symbols))
+        batches = [symbols[i:i + QUOTES_BATCH] for i in range(0, len(symbols), QUOTES_BATCH)]
+        responses = await asyncio.gather(*(self._get('/quotes', {'symbols': ','.join(batch)}) for batch in batches))
+        ltps = dict.fromkeys(symbols)
+        for response in responses:
+            for quote in (response.get('d') or []) if isinstance(response, dict) else []:
+                if quote.get('n') in ltps:
+                    ltps[quote['n']] = quote_ltp({'d': [quote]})
+        return ltps
+
+    async def quote(self, symbol):
+        """
+        Last price for one symbol. Quotes requested by any tracker within QUOTES_WINDOW of each other
+        share one batched quotes() call, so N trackers polling their futures cost ceil(N / QUOTES_BATCH)
+        requests instead of N
+        """
+        symbol = str(symbol).strip()
+        future = self._pending_quotes.get(symbol)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending_quotes:
+                loop.call_later(QUOTES_WINDOW, self._flush_quotes)
+            future = self._pending_quotes[symbol] = loop.create_future()
+        # A cancelled caller (stop_event) must not cancel the request other trackers are waiting on
+        return await asyncio.shield(future)
+
+    def _flush_quotes(self):
+        """Send one quotes() call for every symbol queued in the last window and resolve their futures"""
+        pending, self._pending_quotes = self._pending_quotes, {}
+        task = asyncio.get_running_loop().create_task(self.quotes(list(pending)))
+        self._quote_tasks.add(task)
+
+        def resolve(task):
+            self._quote_tasks.discard(task)
+            ltps = task.result() if not task.cancelled() and task.exception() is None else {}
+            for symbol, future in pending.items():
+                if not future.done():
+                    future.set_result(ltps.get(symbol))
+        task.add_done_callback(resolve)
+
+    # --- blocking facade (Flask handlers, fetch loops) ---
+
+    def fetch_ohlc(self, symbol, tf, range_from=None, stop_event=None):
+        """Blocking history fetch; None if it failed or stop_event was set while waiting"""
+        return self.run(self.history(symbol, tf, range_from), stop_event)
+
+    def fetch_ohlc_many(self, requests, stop_event=None):
+        """Blocking concurrent history fetch for (symbol, tf, range_from) requests; list of DataFrames/None"""
+        results = self.run(self.history_many(requests), stop_event)
+        return results if results is not None else [None] * len(requests)
+
+    def fetch_ltp(self, symbol, stop_event=None):
+        """Blocking last price for one symbol (None if not available), batched with other trackers' quotes"""
+        return self.run(self.quote(symbol), stop_event)
+
+
+# Shared engine for the whole process
+fyers_engine = FyersAsyncEngine()
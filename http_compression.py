@@ -0,0 +1,59 @@
+"""
+HTTP response compression for IV Charts application
+Negotiates brotli (if installed), gzip or deflate from Accept-Encoding and compresses response bodies
+"""
+
+import gzip
+import zlib
+
+# brotli is optional (pip install brotli); gzip/deflate are always available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Responses smaller than this are sent as they are (compression would not pay for itself)
+COMPRESSION_MIN_BYTES = 1024
+# Mimetypes worth compressing (JSON, CSV, the binary chart payload, HTML/JS/CSS)
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/octet-stream', 'text/csv', 'text/html',
+                          'text/plain', 'text/css', 'application/javascript', 'text/javascript')
+
+# Server preference when the client accepts several with the same quality
+SUPPORTED_ENCODINGS = (('br',) if BROTLI_AVAILABLE else ()) + ('gzip', 'deflate')
+
+
+def negotiate_encoding(accept_encodings):
+    """
+    Pick a content encoding from a werkzeug Accept-Encoding object (request.accept_encodings)
+    Returns 'br', 'gzip', 'deflate' or None (send uncompressed)
+    """
+    best = None
+    best_quality = 0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data, encoding):
+    """Compress bytes with the given content encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if encoding == 'deflate':
+        return zlib.compress(data, 6)
+    return data
+
+
+def is_compressible(response):
+    """True if a response's type and size make it worth compressing"""
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    return (response.content_length or 0) >= COMPRESSION_MIN_BYTES
@@ -0,0 +1,759 @@
+"""
+IV history storage backends for IV Charts application
+
+- csv:     one data/<symbol>.csv per symbol (original format, also used for export)
+- parquet: typed, compressed columnar files partitioned by symbol and trading day
+           data/parquet/<symbol>/<YYYY-MM-DD>.parquet
+- feather: same layout as parquet using Arrow IPC (Feather v2) files
+- sqlite:  one SQLite database in WAL mode, data/iv_history.db, primary key (symbol, ts)
+
+All backends store dates as timezone-naive IST wallclock times and return DataFrames sorted by date.
+
+SeriesFileStore keeps a fixed-width binary copy of each series (ts, iv, close, fclose) next to the
+backend, data/series/<symbol>.ivs, that readers memory-map and slice by binary search on ts, plus a
+5m/15m/1h/1D pyramid of rolled-up IV OHLC for zoomed-out reads.
+"""
+
+import os
+import re
+import sqlite3
+import struct
+import threading
+import numpy as np
+import pandas as pd
+
+# pyarrow is needed for the columnar (parquet/feather) backends
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+STORAGE_BACKENDS = ('csv', 'parquet', 'feather', 'sqlite')
+
+# Columns stored as float64 in the columnar backends; everything else (except date) is stored as string
+NUMERIC_COLUMNS = ['close', 'fclose', 'strike', 'iv', 'call_iv', 'put_iv', 'volume']
+
+
+def safe_symbol_name(symbol):
+    """Sanitize a symbol for use as a file/folder name (e.g. NSE:NIFTY25N1125000CE -> NSE_NIFTY25N1125000CE)"""
+    safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
+    return safe_symbol.replace(':', '_').replace(' ', '_')
+
+
+def _naive_dates(dates):
+    """Parse a date column to timezone-naive IST datetimes"""
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+    return dates
+
+
+def _filter_range(df, start=None, end=None):
+    """Keep rows with start <= date <= end (either bound optional)"""
+    if start is not None:
+        df = df[df['date'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['date'] <= pd.Timestamp(end)]
+    return df
+
+
+class CSVStorage:
+    """One CSV file per symbol in the data folder (rewritten in full on every merge)"""
+
+    name = 'csv'
+
+    def __init__(self, data_folder):
+        self.data_folder = data_folder
+
+    def path(self, symbol):
+        return os.path.join(self.data_folder, f"{safe_symbol_name(symbol)}.csv")
+
+    def exists(self, symbol):
+        return os.path.exists(self.path(symbol))
+
+    def list_symbols(self):
+        """Sanitized names of all stored symbols"""
+        if not os.path.exists(self.data_folder):
+            return []
+        return [f[:-4] for f in os.listdir(self.data_folder) if f.endswith('.csv')]
+
+    def read(self, symbol, start=None, end=None):
+        """Read a symbol's IV history (optionally only start..end), None if there is none"""
+        filename = self.path(symbol)
+        if not os.path.exists(filename):
+            return None
+        df = pd.read_csv(filename)
+        if 'date' not in df.columns:
+            return df
+        df['date'] = _naive_dates(df['date'])
+        df = _filter_range(df, start, end)
+        return df.sort_values('date').reset_index(drop=True)
+
+    def write(self, symbol, new_data, replace_from=None):
+        """
+        Merge rows into the symbol's CSV (rows with the same date are replaced by the new ones)
+        replace_from: stored rows at or after this date are dropped first, so from there on the history is
+        exactly new_data (a re-stitched continuous ATM segment)
+        Returns the file path
+        """
+        filename = self.path(symbol)
+        columns_to_save = list(new_data.columns)
+        new_data = new_data.copy()
+
+        if os.path.exists(filename):
+            try:
+                # Read existing CSV
+                existing_df = pd.read_csv(filename)
+
+                # Ensure date column is datetime for comparison
+                if 'date' in existing_df.columns:
+                    existing_df['date'] = pd.to_datetime(existing_df['date'])
+                if 'date' in new_data.columns:
+                    new_data['date'] = pd.to_datetime(new_data['date'])
+
+                if replace_from is not None:
+                    existing_df = existing_df[_naive_dates(existing_df['date']) < pd.Timestamp(replace_from)]
+                
+                # Merge: Remove duplicates based on date (keep latest)
+                combined_df = pd.concat([existing_df, new_data], ignore_index=True)
+                combined_df = combined_df.drop_duplicates(subset=['date'], keep='last')
+                combined_df = combined_df.sort_values('date')
+
+                # Convert date back to string format
+                combined_df['date'] = combined_df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+                # Save merged data
+                combined_df[columns_to_save].to_csv(filename, index=False, float_format='%.4f')
+
+                print(f"IV data appended/merged to: {filename}")
+                print(f"  Added {len(new_data)} new rows, Total rows: {len(combined_df)}, Columns: {', '.join(columns_to_save)}")
+                return filename
+            except Exception as e:
+                print(f"Warning: Could not merge with existing CSV ({e}), overwriting file...")
+
+        # New file (or merge failed): save directly
+        new_data['date'] = pd.to_datetime(new_data['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        new_data[columns_to_save].to_csv(filename, index=False, float_format='%.4f')
+        print(f"IV data saved to: {filename}")
+        print(f"  Saved {len(new_data)} rows with columns: {', '.join(columns_to_save)}")
+        return filename
+
+    def delete(self, symbol=None):
+        """Delete one symbol's history, or all of it if symbol is None. Returns the number of files deleted"""
+        if symbol:
+            filename = self.path(symbol)
+            if os.path.exists(filename):
+                os.remove(filename)
+                print(f"Deleted CSV file for symbol {symbol}: {filename}")
+                return 1
+            return 0
+
+        deleted_count = 0
+        for name in self.list_symbols():
+            filepath = os.path.join(self.data_folder, f"{name}.csv")
+            try:
+                os.remove(filepath)
+                deleted_count += 1
+                print(f"Deleted CSV file: {filepath}")
+            except Exception as e:
+                print(f"Error deleting {filepath}: {e}")
+        return deleted_count
+
+    def export_csv(self, symbol, start=None, end=None):
+        """CSV text of a symbol's IV history (same format as the CSV backend files), None if there is none"""
+        df = self.read(symbol, start, end)
+        if df is None:
+            return None
+        df = df.copy()
+        df['date'] = df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return df.to_csv(index=False, float_format='%.4f')
+
+    def latest(self, symbol, count):
+        """The last count rows of a symbol's IV history, None if there is none"""
+        df = self.read(symbol)
+        if df is None:
+            return None
+        return df.tail(count).reset_index(drop=True)
+
+    def read_many(self, symbols, start=None, end=None):
+        """IV history of several symbols in one DataFrame with a 'symbol' column (sanitized names)"""
+        frames = []
+        for symbol in symbols:
+            df = self.read(symbol, start, end)
+            if df is not None and len(df) > 0:
+                frames.append(df.assign(symbol=safe_symbol_name(symbol)))
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True).sort_values(['date', 'symbol']).reset_index(drop=True)
+
+
+class ColumnarStorage(CSVStorage):
+    """
+    Parquet/Feather files partitioned by symbol and trading day
+
+    Each day is a small typed, compressed file, so a merge only rewrites the partitions it touches and
+    a range read only opens the partitions between start and end (no text parsing or date parsing).
+    """
+
+    def __init__(self, data_folder, file_format='parquet'):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the parquet/feather storage backends. Install with: pip install pyarrow")
+        super().__init__(data_folder)
+        self.name = file_format
+        self.file_format = file_format
+        self.extension = '.parquet' if file_format == 'parquet' else '.feather'
+        self.root = os.path.join(data_folder, file_format)
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, symbol):
+        return os.path.join(self.root, safe_symbol_name(symbol))
+
+    def _partitions(self, symbol, start=None, end=None):
+        """Partition files of a symbol (sorted by day), limited to the days between start and end"""
+        folder = self.path(symbol)
+        if not os.path.isdir(folder):
+            return []
+        start_day = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+        end_day = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None
+        partitions = []
+        for f in sorted(os.listdir(folder)):
+            if not f.endswith(self.extension):
+                continue
+            day = f[:-len(self.extension)]
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            partitions.append(os.path.join(folder, f))
+        return partitions
+
+    def _read_table(self, filename):
+        if self.file_format == 'parquet':
+            return pyarrow.parquet.read_table(filename)
+        return pyarrow.feather.read_table(filename)
+
+    def _read_file(self, filename):
+        return self._read_table(filename).to_pandas()
+
+    def _write_file(self, df, filename):
+        # Write to a temp file and rename so concurrent readers never see a partial partition
+        tmp_filename = f"{filename}.tmp"
+        if self.file_format == 'parquet':
+            df.to_parquet(tmp_filename, index=False, compression='zstd')
+        else:
+            df.to_feather(tmp_filename, compression='zstd')
+        os.replace(tmp_filename, filename)
+
+    def exists(self, symbol):
+        return len(self._partitions(symbol)) > 0
+
+    def list_symbols(self):
+        if not os.path.exists(self.root):
+            return []
+        return [d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d))]
+
+    def read(self, symbol, start=None, end=None):
+        partitions = self._partitions(symbol, start, end)
+        if not partitions:
+            return None
+        tables = [self._read_table(f) for f in partitions]
+        try:
+            # Concatenate as Arrow tables and convert to pandas once
+            df = pyarrow.concat_tables(tables).to_pandas()
+        except pyarrow.ArrowInvalid:
+            # Partitions with different columns (e.g. straddle columns added later)
+            df = pd.concat([t.to_pandas() for t in tables], ignore_index=True)
+        df = _filter_range(df, start, end)
+        return df.sort_values('date').reset_index(drop=True)
+
+    def write(self, symbol, new_data, replace_from=None):
+        """
+        Merge rows into the symbol's day partitions (rows with the same date are replaced). Returns the folder path
+        replace_from: stored rows at or after this date are dropped first (see CSVStorage.write)
+        """
+        folder = self.path(symbol)
+        os.makedirs(folder, exist_ok=True)
+        if replace_from is not None:
+            self._truncate(symbol, pd.Timestamp(replace_from))
+
+        new_data = new_data.copy()
+        new_data['date'] = _naive_dates(new_data['date'])
+        for col in new_data.columns:
+            if col == 'date':
+                continue
+            if col in NUMERIC_COLUMNS:
+                new_data[col] = pd.to_numeric(new_data[col], errors='coerce').astype('float64')
+            else:
+                # Text columns, with missing values kept missing (astype(str) would store 'nan'/'None')
+                new_data[col] = new_data[col].where(new_data[col].isna(), new_data[col].astype(str))
+
+        days_written = 0
+        for day, day_rows in new_data.groupby(new_data['date'].dt.strftime('%Y-%m-%d')):
+            filename = os.path.join(folder, f"{day}{self.extension}")
+            if os.path.exists(filename):
+                day_rows = pd.concat([self._read_file(filename), day_rows], ignore_index=True)
+            day_rows = day_rows.drop_duplicates(subset=['date'], keep='last').sort_values('date').reset_index(drop=True)
+            self._write_file(day_rows, filename)
+            days_written += 1
+
+        print(f"IV data merged to: {folder} ({len(new_data)} rows across {days_written} day partition(s))")
+        return folder
+
+    def _truncate(self, symbol, cutoff):
+        """Drop the stored rows at or after cutoff (partitions entirely after it are removed)"""
+        for filename in self._partitions(symbol, start=cutoff):
+            day_rows = self._read_file(filename)
+            day_rows = day_rows[day_rows['date'] < cutoff]
+            if len(day_rows) == 0:
+                os.remove(filename)
+            else:
+                self._write_file(day_rows.reset_index(drop=True), filename)
+
+    def delete(self, symbol=None):
+        symbols = [safe_symbol_name(symbol)] if symbol else self.list_symbols()
+        deleted_count = 0
+        for name in symbols:
+            folder = os.path.join(self.root, name)
+            if not os.path.isdir(folder):
+                continue
+            for f in os.listdir(folder):
+                os.remove(os.path.join(folder, f))
+            os.rmdir(folder)
+            deleted_count += 1
+            print(f"Deleted {self.file_format} history: {folder}")
+        return deleted_count
+
+
+class SQLiteStorage(CSVStorage):
+    """
+    IV history in one SQLite database (WAL mode) with a composite (symbol, ts) primary key
+
+    - ts is the candle time in seconds (naive IST wallclock, same convention as the CSV dates)
+    - symbol is the sanitized symbol name, so names match the CSV/columnar backends
+    - Each thread gets its own connection; in WAL mode readers (Flask handlers) never block the
+      writer (fetch loop) and the writer never blocks readers. Writes are serialized by a lock.
+    """
+
+    name = 'sqlite'
+    DB_FILE = 'iv_history.db'
+    # Stored columns besides symbol/ts (other DataFrame columns are dropped)
+    REAL_COLUMNS = ['close', 'fclose', 'strike', 'iv', 'call_iv', 'put_iv', 'volume']
+    TEXT_COLUMNS = ['option_name', 'underlying_name', 'expiry', 'option_type', 'timeframe', 'forward_source']
+    # Always returned, even when a queried window has no values in them (other all-empty columns are dropped)
+    CORE_COLUMNS = ['close', 'fclose', 'iv']
+
+    def __init__(self, data_folder):
+        super().__init__(data_folder)
+        self.db_path = os.path.join(data_folder, self.DB_FILE)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Same column order as the CSV files
+        self.columns = ['option_name', 'underlying_name', 'close', 'fclose', 'strike', 'expiry', 'iv',
+                        'option_type', 'timeframe', 'volume', 'call_iv', 'put_iv', 'forward_source']
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        column_defs = ', '.join(f"{c} {'REAL' if c in self.REAL_COLUMNS else 'TEXT'}" for c in self.columns)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS iv_history (
+                symbol TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                {column_defs},
+                PRIMARY KEY (symbol, ts)
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def _connection(self):
+        """Per-thread connection (sqlite3 connections must not be shared between threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, avoids an fsync per commit
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def path(self, symbol):
+        return self.db_path
+
+    def _query(self, where, params, order='ASC', limit=None):
+        sql = f"SELECT symbol, ts, {', '.join(self.columns)} FROM iv_history WHERE {where} ORDER BY ts {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = self._connection().execute(sql, params).fetchall()
+        if not rows:
+            return None
+        df = pd.DataFrame(rows, columns=['symbol', 'ts'] + self.columns)
+        df.insert(0, 'date', pd.to_datetime(df['ts'], unit='s'))
+        # Drop per-series columns this symbol never had (e.g. straddle columns on a single-leg series)
+        empty = [c for c in self.columns if c not in self.CORE_COLUMNS and df[c].isna().all()]
+        df = df.drop(columns=['ts'] + empty)
+        return df.sort_values('date').reset_index(drop=True)
+
+    @staticmethod
+    def _range_clause(start=None, end=None):
+        where, params = '', []
+        if start is not None:
+            where += ' AND ts >= ?'
+            params.append(int(pd.Timestamp(start).value // 10**9))
+        if end is not None:
+            where += ' AND ts <= ?'
+            params.append(int(pd.Timestamp(end).value // 10**9))
+        return where, params
+
+    def exists(self, symbol):
+        row = self._connection().execute(
+            'SELECT 1 FROM iv_history WHERE symbol = ? LIMIT 1', (safe_symbol_name(symbol),)).fetchone()
+        return row is not None
+
+    def list_symbols(self):
+        return [r[0] for r in self._connection().execute('SELECT DISTINCT symbol FROM iv_history ORDER BY symbol')]
+
+    def read(self, symbol, start=None, end=None):
+        where, params = self._range_clause(start, end)
+        df = self._query('symbol = ?' + where, [safe_symbol_name(symbol)] + params)
+        return df.drop(columns=['symbol']) if df is not None else None
+
+    def latest(self, symbol, count):
+        df = self._query('symbol = ?', [safe_symbol_name(symbol)], order='DESC', limit=count)
+        return df.drop(columns=['symbol']) if df is not None else None
+
+    def read_many(self, symbols, start=None, end=None):
+        names = [safe_symbol_name(s) for s in symbols]
+        if not names:
+            return None
+        where, params = self._range_clause(start, end)
+        df = self._query(f"symbol IN ({', '.join('?' * len(names))})" + where, names + params)
+        return df.sort_values(['date', 'symbol']).reset_index(drop=True) if df is not None else None
+
+    def write(self, symbol, new_data, replace_from=None):
+        """
+        Bulk upsert rows (rows with the same (symbol, ts) are replaced). Returns the database path
+        replace_from: stored rows at or after this date are deleted in the same transaction (see CSVStorage.write)
+        """
+        df = new_data.copy()
+        df['ts'] = _naive_dates(df['date']).astype('datetime64[s]').astype('int64')
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = None
+            elif col in self.REAL_COLUMNS:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            else:
+                df[col] = df[col].map(lambda v: None if pd.isna(v) else str(v))
+        df = df[['ts'] + self.columns].astype(object).where(df[['ts'] + self.columns].notna(), None)
+        name = safe_symbol_name(symbol)
+        rows = [(name,) + tuple(r) for r in df.itertuples(index=False, name=None)]
+
+        columns = ['symbol', 'ts'] + self.columns
+        updates = ', '.join(f"{c} = excluded.{c}" for c in self.columns)
+        sql = (f"INSERT INTO iv_history ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT(symbol, ts) DO UPDATE SET {updates}")
+        with self._write_lock:
+            conn = self._connection()
+            with conn:  # One transaction per batch
+                if replace_from is not None:
+                    conn.execute('DELETE FROM iv_history WHERE symbol = ? AND ts >= ?',
+                                 (name, int(pd.Timestamp(replace_from).value // 10**9)))
+                conn.executemany(sql, rows)
+        print(f"IV data upserted to: {self.db_path} ({len(rows)} rows for {name})")
+        return self.db_path
+
+    def delete(self, symbol=None):
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                if symbol:
+                    deleted_count = conn.execute('DELETE FROM iv_history WHERE symbol = ?', (safe_symbol_name(symbol),)).rowcount
+                else:
+                    deleted_count = conn.execute('DELETE FROM iv_history').rowcount
+        print(f"Deleted {deleted_count} row(s) from {self.db_path}")
+        return deleted_count
+
+
+class SeriesFileStore:
+    """
+    Fixed-width binary IV series files for zero-copy reads, one per symbol: data/series/<symbol>.ivs
+
+    Layout: 16-byte header (magic 'IVS1', format version, record size, reserved) followed by records
+    of int64 ts (seconds, naive IST wallclock) + float64 iv, close, fclose, sorted by ts.
+    The record count is derived from the file size, so there is no header to keep in sync.
+
+    Writes are append-only in the common case (new candles after the last one). An append is not atomic:
+    readers take the record count from the file size rounded down to whole records, so they never map a
+    partial trailing record (on local filesystems the size only grows once the bytes are written), but a
+    reader racing an append of several candles can see only the earliest of them - a valid earlier state of
+    the sorted series - and picks up the rest on its next read. Rows at or before the last stored ts (the
+    live candle being updated, or a stitched segment after an ATM roll) are written to a new file that
+    replaces the old one (os.replace), never in place: readers in this or other processes (viewer workers)
+    that mapped the old file keep reading it, untorn, until they re-open. Readers np.memmap the file and
+    binary-search ts, so a cold read only touches the pages of the requested window.
+
+    Each write also updates a resolution pyramid, data/series/<symbol>.<level>.ivp for 5m, 15m, 1h and 1D:
+    OHLC of IV plus the last close/fclose per bucket. Each level is rolled up from the one below it and
+    only the buckets touched by the write are recomputed, so zoomed-out reads cost a fixed number of points.
+    """
+
+    MAGIC = b'IVS1'
+    LEVEL_MAGIC = b'IVP1'
+    VERSION = 1
+    HEADER = struct.Struct('<4sIII')
+    RECORD = np.dtype([('ts', '<i8'), ('iv', '<f8'), ('close', '<f8'), ('fclose', '<f8')])
+    # Rolled-up records: 'iv' is the IV close of the bucket
+    LEVEL_RECORD = np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                             ('iv', '<f8'), ('close', '<f8'), ('fclose', '<f8')])
+    # Pyramid levels (name, bucket seconds), finest first; '1m' is the raw series itself
+    LEVELS = (('5m', 300), ('15m', 900), ('1h', 3600), ('1D', 86400))
+
+    def __init__(self, data_folder):
+        self.root = os.path.join(data_folder, 'series')
+        os.makedirs(self.root, exist_ok=True)
+        self._write_lock = threading.Lock()
+
+    def path(self, symbol, level=None):
+        if level is None or level == '1m':
+            return os.path.join(self.root, f"{safe_symbol_name(symbol)}.ivs")
+        return os.path.join(self.root, f"{safe_symbol_name(symbol)}.{level}.ivp")
+
+    def exists(self, symbol):
+        return self._count(self.path(symbol)) > 0
+
+    def _count(self, filename, dtype=None):
+        if not os.path.exists(filename):
+            return 0
+        dtype = dtype or self.RECORD
+        return max(0, (os.path.getsize(filename) - self.HEADER.size) // dtype.itemsize)
+
+    def _map(self, filename, count, dtype=None):
+        return np.memmap(filename, dtype=dtype or self.RECORD, mode='r', offset=self.HEADER.size, shape=(count,))
+
+    def _read_from(self, filename, dtype, start_ts=None):
+        """Copy of the records with ts >= start_ts (all records if start_ts is None)"""
+        count = self._count(filename, dtype)
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        records = self._map(filename, count, dtype)
+        lo = int(np.searchsorted(records['ts'], start_ts, side='left')) if start_ts is not None else 0
+        window = np.array(records[lo:])
+        del records
+        return window
+
+    def _write_tail(self, filename, dtype, magic, records, merge=True, replace_from_ts=None):
+        """
+        Write sorted records from their first ts onwards and return the first ts written
+        merge=True keeps existing records the new ones don't replace; merge=False replaces the whole tail
+        (used for pyramid levels, where records are recomputed from everything at or after their first ts)
+        replace_from_ts: existing records at or after this ts are dropped even if no new record replaces them
+        """
+        count = self._count(filename, dtype)
+        if count == 0:
+            self._replace(filename, magic, dtype, records.tobytes())
+            return int(records['ts'][0])
+
+        existing = self._map(filename, count, dtype)
+        first_ts = int(records['ts'][0]) if replace_from_ts is None else min(int(records['ts'][0]), replace_from_ts)
+        start = int(np.searchsorted(existing['ts'], first_ts, side='left'))
+        if start == count:
+            # Only new candles: append
+            del existing
+            with open(filename, 'ab') as f:
+                f.write(records.tobytes())
+            return int(records['ts'][0])
+        if merge:
+            # Merge the new rows into the existing tail (new values win on equal ts)
+            tail = np.array(existing[start:])
+            if replace_from_ts is not None:
+                tail = tail[tail['ts'] < replace_from_ts]
+            records = _dedupe_records(np.concatenate([tail, records]))
+        head = existing[:start].tobytes()
+        del existing
+        self._replace(filename, magic, dtype, head + records.tobytes())
+        return first_ts
+
+    def _replace(self, filename, magic, dtype, body):
+        """Write header + body to a temporary file and atomically move it over filename"""
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            f.write(self.HEADER.pack(magic, self.VERSION, dtype.itemsize, 0))
+            f.write(body)
+        os.replace(tmp_filename, filename)
+
+    @classmethod
+    def to_records(cls, df):
+        """DataFrame (date, iv, close, fclose) -> sorted, de-duplicated record array"""
+        records = np.zeros(len(df), dtype=cls.RECORD)
+        records['ts'] = _naive_dates(df['date']).to_numpy(dtype='datetime64[s]').astype(np.int64)
+        for col in ('iv', 'close', 'fclose'):
+            records[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64) if col in df.columns else np.nan
+        return _dedupe_records(records)
+
+    @classmethod
+    def rollup(cls, records, seconds):
+        """
+        Roll records (raw or an already rolled-up level) up into buckets of `seconds`
+        Returns LEVEL_RECORD records: IV open/high/low/close plus the last close/fclose of each bucket
+        """
+        if len(records) == 0:
+            return np.zeros(0, dtype=cls.LEVEL_RECORD)
+        bucket = records['ts'] // seconds * seconds
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ends = np.r_[starts[1:], len(records)] - 1
+        rolled = records.dtype.names == cls.LEVEL_RECORD.names
+        opens = records['open'] if rolled else records['iv']
+        highs = records['high'] if rolled else records['iv']
+        lows = records['low'] if rolled else records['iv']
+
+        out = np.zeros(len(starts), dtype=cls.LEVEL_RECORD)
+        out['ts'] = bucket[starts]
+        out['open'] = opens[starts]
+        out['high'] = np.fmax.reduceat(highs, starts)
+        out['low'] = np.fmin.reduceat(lows, starts)
+        out['iv'] = records['iv'][ends]
+        out['close'] = records['close'][ends]
+        out['fclose'] = records['fclose'][ends]
+        return out
+
+    def _update_levels(self, symbol, first_ts):
+        """Recompute the pyramid buckets from first_ts onwards (everything if a level file is missing)"""
+        if any(self._count(self.path(symbol, name), self.LEVEL_RECORD) == 0 for name, _ in self.LEVELS):
+            first_ts = None
+        source_file, source_dtype = self.path(symbol), self.RECORD
+        for name, seconds in self.LEVELS:
+            bucket_start = first_ts // seconds * seconds if first_ts is not None else None
+            source = self._read_from(source_file, source_dtype, bucket_start)
+            if len(source) == 0:
+                return
+            level_file = self.path(symbol, name)
+            self._write_tail(level_file, self.LEVEL_RECORD, self.LEVEL_MAGIC, self.rollup(source, seconds), merge=False)
+            first_ts = bucket_start
+            source_file, source_dtype = level_file, self.LEVEL_RECORD
+
+    def write(self, symbol, df, replace_from=None):
+        """
+        Append/merge rows into the symbol's series file and pyramid. Returns the number of records written
+        replace_from: stored records at or after this date are dropped first (see CSVStorage.write)
+        """
+        if df is None or len(df) == 0 or 'date' not in df.columns:
+            return 0
+        records = self.to_records(df)
+        replace_from_ts = int(pd.Timestamp(replace_from).value // 10**9) if replace_from is not None else None
+
+        with self._write_lock:
+            first_ts = self._write_tail(self.path(symbol), self.RECORD, self.MAGIC, records, replace_from_ts=replace_from_ts)
+            self._update_levels(symbol, first_ts)
+        return len(records)
+
+    def _window(self, filename, dtype, start=None, end=None):
+        """(records, total) for start..end of a file; only the pages holding the window are read"""
+        count = self._count(filename, dtype)
+        if count == 0:
+            return None, 0
+        series = self._map(filename, count, dtype)
+        lo, hi = 0, count
+        if start is not None:
+            lo = int(np.searchsorted(series['ts'], int(pd.Timestamp(start).value // 10**9), side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(series['ts'], int(pd.Timestamp(end).value // 10**9), side='right'))
+        window = np.array(series[lo:hi])  # Copy just the window, then release the mapping
+        del series
+        return window, count
+
+    def read(self, symbol, start=None, end=None, level=None):
+        """
+        Read the window start..end as a DataFrame, None if there is no series
+        Raw series (level None/'1m'): date, iv, close, fclose
+        Pyramid level ('5m', '15m', '1h', '1D'): date, open, high, low, iv (IV close), close, fclose
+        """
+        dtype = self.RECORD if level in (None, '1m') else self.LEVEL_RECORD
+        window, count = self._window(self.path(symbol, level), dtype, start, end)
+        if count == 0:
+            return None
+        df = pd.DataFrame({name: window[name] for name in dtype.names if name != 'ts'})
+        df.insert(0, 'date', window['ts'].astype('datetime64[s]'))
+        return df
+
+    def read_page(self, symbol, before=None, limit=2000):
+        """
+        Up to `limit` raw points strictly before `before` (the latest points if before is None)
+        Returns (DataFrame or None, has_more) where has_more tells if older points exist
+        """
+        filename = self.path(symbol)
+        count = self._count(filename)
+        if count == 0:
+            return None, False
+        series = self._map(filename, count)
+        hi = int(np.searchsorted(series['ts'], int(pd.Timestamp(before).value // 10**9), side='left')) if before is not None else count
+        lo = max(0, hi - limit)
+        window = np.array(series[lo:hi])
+        del series
+        df = pd.DataFrame({name: window[name] for name in self.RECORD.names if name != 'ts'})
+        df.insert(0, 'date', window['ts'].astype('datetime64[s]'))
+        return df, lo > 0
+
+    def count_in_range(self, symbol, start=None, end=None, level=None):
+        """Number of points between start and end at a level (two binary searches, nothing is copied)"""
+        dtype = self.RECORD if level in (None, '1m') else self.LEVEL_RECORD
+        filename = self.path(symbol, level)
+        count = self._count(filename, dtype)
+        if count == 0:
+            return 0
+        series = self._map(filename, count, dtype)
+        lo = int(np.searchsorted(series['ts'], int(pd.Timestamp(start).value // 10**9), side='left')) if start is not None else 0
+        hi = int(np.searchsorted(series['ts'], int(pd.Timestamp(end).value // 10**9), side='right')) if end is not None else count
+        del series
+        return max(0, hi - lo)
+
+    def pick_level(self, symbol, start=None, end=None, max_points=None):
+        """
+        Finest level whose point count for start..end fits max_points
+        Returns '1m' (raw) when it fits or no budget is given, the coarsest level ('1D') if nothing fits
+        """
+        if not max_points or self.count_in_range(symbol, start, end) <= max_points:
+            return '1m'
+        for name, _ in self.LEVELS:
+            if self.count_in_range(symbol, start, end, name) <= max_points:
+                return name
+        return self.LEVELS[-1][0]
+
+    def delete(self, symbol=None):
+        """Delete one symbol's series file (and pyramid), or all of them. Returns the number of series deleted"""
+        if symbol:
+            filenames = [self.path(symbol)] + [self.path(symbol, name) for name, _ in self.LEVELS]
+        else:
+            filenames = [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith(('.ivs', '.ivp'))]
+        deleted_count = 0
+        for filename in filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+                if filename.endswith('.ivs'):
+                    deleted_count += 1
+        return deleted_count
+
+
+def _dedupe_records(records):
+    """Sort records by ts and keep the last row for duplicate timestamps (same rule as the other backends)"""
+    records = records[np.argsort(records['ts'], kind='stable')]
+    if len(records) == 0:
+        return records
+    keep = np.append(records['ts'][1:] != records['ts'][:-1], True)
+    return records[keep]
+
+
+def create_storage_backend(name, data_folder):
+    """
+    Create the IV history storage backend by name ('csv', 'parquet', 'feather', 'sqlite')
+    Falls back to CSV if the backend's dependencies are missing
+    """
+    name = (name or 'csv').lower()
+    if name not in STORAGE_BACKENDS:
+        print(f"Warning: Unknown storage backend '{name}', using csv")
+        name = 'csv'
+    if name in ('parquet', 'feather'):
+        if not PYARROW_AVAILABLE:
+            print(f"Warning: pyarrow not installed, {name} storage unavailable - using csv. Install with: pip install pyarrow")
+            return CSVStorage(data_folder)
+        return ColumnarStorage(data_folder, file_format=name)
+    if name == 'sqlite':
+        return SQLiteStorage(data_folder)
+    return CSVStorage(data_folder)
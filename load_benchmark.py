@@ -0,0 +1,181 @@
+"""
+Load benchmark for IV Charts application
+Seeds a synthetic IV series in a scratch folder, starts main.py there in each serve mode and hammers
+/api/get_iv_data with concurrent keep-alive clients, then reports requests/second and latency per mode
+
+    python load_benchmark.py                              # dev vs production, 16 clients, 10 s each
+    python load_benchmark.py --clients 32 --points 20000 --threads 16
+    IV_VIEWER_ONLY=1 python load_benchmark.py --modes production --workers 4   # gunicorn workers
+
+Nothing is written to this repository's data/ folder; the scratch folder is removed afterwards.
+"""
+
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from serving import DEFAULT_THREADS
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SYMBOL = 'NSE:BENCH-ATM-CE-20260106'
+READY_TIMEOUT = 60  # Seconds to wait for a server to answer
+WARMUP_REQUESTS = 20
+
+SEED_SCRIPT = """
+import sys
+sys.path.insert(0, {repo!r})
+import numpy as np
+import pandas as pd
+import main
+n = {points}
+df = pd.DataFrame({{
+    'date': pd.date_range('2026-01-05 09:15', periods=n, freq='min'),
+    'iv': 12 + np.sin(np.arange(n) / 50.0),
+    'close': 100 + np.cos(np.arange(n) / 40.0),
+    'fclose': 26000 + np.arange(n) * 0.1
+}})
+main.save_iv_to_csv({symbol!r}, df, timeframe='1')
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def seed(folder, points):
+    """Write the synthetic series to folder/data through the app's own storage path"""
+    subprocess.run([sys.executable, '-c', SEED_SCRIPT.format(repo=REPO_DIR, points=points, symbol=SYMBOL)],
+                   cwd=folder, check=True, stdout=subprocess.DEVNULL)
+
+
+def start_server(folder, mode, port, threads, workers):
+    command = [sys.executable, os.path.join(REPO_DIR, 'main.py'), '--serve', mode, '--port', str(port),
+               '--threads', str(threads), '--workers', str(workers), '--no-browser']
+    log = open(os.path.join(folder, f'server-{mode}.log'), 'w')
+    return subprocess.Popen(command, cwd=folder, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(port, path, server):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not answer within {READY_TIMEOUT} s")
+
+
+def client(port, path, headers, deadline, latencies, errors):
+    """One keep-alive client: request path back to back until deadline"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.close()
+
+
+def run_load(port, path, clients, duration, headers):
+    """(requests/second, p50 ms, p99 ms, errors) for `clients` concurrent clients over `duration` seconds"""
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    workers = [threading.Thread(target=client, args=(port, path, headers, deadline, latencies, errors))
+               for _ in range(clients)]
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float('nan')
+
+    return len(latencies) / elapsed, percentile(0.50), percentile(0.99), len(errors)
+
+
+def benchmark(args):
+    folder = tempfile.mkdtemp(prefix='iv_bench_')
+    path = f"/api/get_iv_data?symbol={SYMBOL}" + (f"&last={args.last}" if args.last else '')
+    headers = {'Accept-Encoding': 'gzip'} if args.gzip else {}
+    results = []
+    try:
+        print(f"Seeding {args.points} points in {folder} ...")
+        seed(folder, args.points)
+        for mode in args.modes:
+            port = free_port()
+            server = start_server(folder, mode, port, args.threads, args.workers)
+            try:
+                wait_ready(port, path, server)
+                for _ in range(WARMUP_REQUESTS):
+                    run_load(port, path, 1, 0.01, headers)
+                print(f"{mode}: {args.clients} clients x {args.duration} s ...")
+                results.append((mode,) + run_load(port, path, args.clients, args.duration, headers))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+    finally:
+        if args.keep:
+            print(f"Server logs kept in {folder}")
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"\nGET {path} ({args.points} points, {args.clients} clients, {'gzip' if args.gzip else 'identity'})")
+    print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, rps, p50, p99, errors in results:
+        print(f"{mode:<12}{rps:>10.1f}{p50:>10.1f}{p99:>10.1f}{errors:>8}")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark /api/get_iv_data under the dev and production servers")
+    parser.add_argument('--modes', nargs='+', default=['dev', 'production'], choices=['dev', 'production'])
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent keep-alive clients (default: 16)")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds of load per mode (default: 10)")
+    parser.add_argument('--points', type=int, default=5000, help="Rows in the synthetic series (default: 5000)")
+    parser.add_argument('--last', type=int, default=0, help="Request only the latest N rows (default: all)")
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help=f"Production request threads per process (default: {DEFAULT_THREADS})")
+    parser.add_argument('--workers', type=int, default=1, help="Production worker processes (gunicorn, viewer only)")
+    parser.add_argument('--gzip', action='store_true', help="Send Accept-Encoding: gzip")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch folder and server logs")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    benchmark(parse_args())
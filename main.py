@@ -1,8 +1,9 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, Response
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import math
 import os
 import csv
 import re
@@ -10,6 +11,17 @@ from FyresIntegration import automated_login, fetchOHLC, fyres_quote
 import FyresIntegration
 import threading
 import time
+import bisect
+import hashlib
+import itertools
+from market_calendar import MARKET_HOURS, TIME_BASES, compute_time_to_expiry, is_session_open, wait_for_market_open, candle_bounds
+from iv_storage import create_storage_backend, SeriesFileStore
+from downsampling import DOWNSAMPLE_METHODS, downsample_indices
+from chart_encoding import BINARY_MIMETYPE, encode_chart_payload, encode_metadata_header
+from http_compression import BROTLI_AVAILABLE, COMPRESSION_MIN_BYTES, negotiate_encoding, compress_body, is_compressible
+from fyers_async import AIOHTTP_AVAILABLE, fyers_engine
+from shared_series import SHARED_MEMORY_AVAILABLE, SharedSeriesWriter, SharedSeriesReader
+from serving import DEFAULT_THREADS, DEFAULT_WORKERS, SERVE_MODES, serve_production
 
 # Import pytz for timezone handling (for market hours)
 try:
@@ -30,17 +42,142 @@ except ImportError:
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production
 
+# Compress JSON/CSV/binary responses above COMPRESSION_MIN_BYTES (gzip/deflate, brotli if installed)
+# Set IV_COMPRESSION=0 to send everything uncompressed
+COMPRESSION_ENABLED = os.environ.get('IV_COMPRESSION', '1') != '0'
+if COMPRESSION_ENABLED:
+    print(f"Response compression: {'brotli, ' if BROTLI_AVAILABLE else ''}gzip, deflate (responses >= {COMPRESSION_MIN_BYTES} bytes)")
+
+# History and quote requests go through the asyncio engine (one event loop, bounded concurrency) when
+# aiohttp is installed; IV_FYERS_ASYNC=0 falls back to the synchronous fyers client
+FYERS_ASYNC_ENABLED = AIOHTTP_AVAILABLE and os.environ.get('IV_FYERS_ASYNC', '1') != '0'
+if FYERS_ASYNC_ENABLED:
+    print("Fyers requests: async engine (aiohttp)")
+elif os.environ.get('IV_FYERS_ASYNC', '1') != '0':
+    print("Warning: aiohttp not installed, Fyers requests use the synchronous client. Install with: pip install aiohttp")
+
+def _add_vary(response, header):
+    """Add a header name to the Vary response header (without duplicating it)"""
+    values = [v.strip() for v in response.headers.get('Vary', '').split(',') if v.strip()]
+    if header not in values:
+        values.append(header)
+    response.headers['Vary'] = ', '.join(values)
+
+@app.after_request
+def compress_response(response):
+    """Compress large responses with the encoding negotiated from Accept-Encoding"""
+    if not COMPRESSION_ENABLED or not is_compressible(response):
+        return response
+    encoding = negotiate_encoding(request.accept_encodings)
+    _add_vary(response, 'Accept-Encoding')
+    if encoding is None:
+        return response
+    response.set_data(compress_body(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 # Global variables for data storage
 iv_data_store = {}
 fetching_status = {"active": False, "symbol": None, "timeframe": None}
 
-# Thread management for fetching
-fetch_thread = None  # Track the active fetch thread
-fetch_lock = threading.Lock()  # Lock to prevent race conditions
+# Store version per symbol, bumped on every change to iv_data_store[symbol] (cached chart responses and
+# long-polls key on it). Always change iv_data_store through set_iv_data / drop_iv_data so the version follows the data
+iv_data_versions = {}
+_iv_version_counter = itertools.count(1)
+# Last version of each symbol that changed more than its tail (older rows rewritten, e.g. after a stitch or reload);
+# a client at or after this version can be sent only the rows from its last timestamp onwards
+iv_data_resync_versions = {}
+# Notified on every version bump (wakes /api/poll long-polls)
+iv_data_changed = threading.Condition()
+# Identifies this server process: versions start again at 1 after a restart, so a version a client kept
+# (e.g. in the chart's IndexedDB cache) only counts together with the epoch it came from
+iv_data_epoch = f"{os.getpid()}-{time.time()}"
+
+CHART_SERIES_KEYS = ('timestamps', 'iv_values', 'close_prices', 'fclose_prices')
+
+def bump_iv_data_version(symbol, resync=True):
+    """Give a symbol a new store version (the counter is process-wide, so versions never repeat)"""
+    with iv_data_changed:
+        version = next(_iv_version_counter)
+        iv_data_versions[symbol] = version
+        if resync:
+            iv_data_resync_versions[symbol] = version
+        iv_data_changed.notify_all()
+
+def _is_tail_update(old, new):
+    """True if new only appends to old and/or changes old's last row (the usual live-candle update)"""
+    if not old:
+        return False
+    keep = len(old.get('timestamps') or []) - 1
+    if keep < 0 or len(new.get('timestamps') or []) < keep:
+        return False
+    for key in CHART_SERIES_KEYS:
+        old_values, new_values = old.get(key) or [], new.get(key) or []
+        if len(old_values) != keep + 1 and len(old_values) != 0:
+            return False
+        if old_values[:keep] != new_values[:keep]:
+            return False
+    return True
+
+def _is_same_tail(old, new):
+    """For a tail update: True if new's rows and extra keys equal old's (only last_update may differ)"""
+    if old.keys() - {'last_update'} != new.keys() - {'last_update'}:
+        return False
+    for key in old:
+        if key == 'last_update':
+            continue
+        if key in CHART_SERIES_KEYS:
+            # Rows before the last one were already compared by _is_tail_update
+            old_values, new_values = old[key] or [], new[key] or []
+            if len(old_values) != len(new_values) or old_values[-1:] != new_values[-1:]:
+                return False
+        elif old[key] != new[key]:
+            return False
+    return True
+
+def set_iv_data(symbol, entry):
+    """Replace a symbol's chart data in iv_data_store and bump its store version (no-op if nothing changed)"""
+    old = iv_data_store.get(symbol)
+    tail_only = _is_tail_update(old, entry)
+    if tail_only and _is_same_tail(old, entry):
+        return  # Same data: keep the version, so cached responses/ETags stay valid and polls stay asleep
+    iv_data_store[symbol] = entry
+    bump_iv_data_version(symbol, resync=not tail_only)
+    if shared_series_writer is not None:
+        publish_shared_series(symbol, entry, len(old['timestamps']) - 1 if tail_only else 0)
+
+def drop_iv_data(symbol=None):
+    """Remove one symbol's chart data (or all of it when symbol is None) and bump the affected versions"""
+    if symbol is None:
+        iv_data_store.clear()
+        for stored_symbol in list(iv_data_versions):
+            bump_iv_data_version(stored_symbol)
+    else:
+        iv_data_store.pop(symbol, None)
+        bump_iv_data_version(symbol)
+    if shared_series_writer is not None:
+        shared_series_writer.drop(symbol)
+
+# Stitched continuous ATM series (DataFrames) keyed by continuous symbol
+# e.g. "NSE:NIFTY-ATM-CE-20260106" -> rows from whichever strike was ATM at each timestamp
+continuous_atm_frames = {}
 
 # Thread management for fetching
 fetch_thread = None  # Track the active fetch thread
 fetch_lock = threading.Lock()  # Lock to prevent race conditions
+# Cancellation token of the active tracker (fetch loop). Each started loop gets a fresh Event; stopping
+# sets it, which wakes every sleep in that loop and makes it exit after any in-flight API call
+fetch_cancel_token = threading.Event()
+# Held by a fetch loop for each store write (memory and storage) after it re-checks its token, and by
+# start/stop while they cancel the token and clear memory: a cancelled loop can't put rows back after the clear
+store_write_lock = threading.RLock()
+# One lock per tracker key, held while its loop runs, so two loops never write the same series at once.
+# The web UI runs one tracker at a time under WEB_TRACKER_KEY (manual and automatic loops write the same
+# per-option series); the collector keys its trackers by future symbol (each writes its own continuous series)
+WEB_TRACKER_KEY = 'web'
+tracker_locks = {}
+tracker_locks_guard = threading.Lock()
+TRACKER_LOCK_POLL = 0.2  # Seconds between checks of a waiting tracker's own token
 
 # Global logs storage (max 1000 entries to prevent memory issues)
 app_logs = []
@@ -79,74 +216,86 @@ if not os.path.exists(DATA_FOLDER):
     os.makedirs(DATA_FOLDER)
     print(f"Created data folder: {DATA_FOLDER}")
 
-# Market hours configuration
-# NSE: 9:15 AM to 3:30 PM IST
-# MCX: 9:00 AM to 11:30 PM IST (23:30)
-MARKET_HOURS = {
-    'NSE': {'open': (9, 15), 'close': (15, 30)},  # 9:15 AM to 3:30 PM IST
-    'MCX': {'open': (9, 0), 'close': (23, 30)}     # 9:00 AM to 11:30 PM IST
-}
+# IV history storage backend: 'csv' (one data/<symbol>.csv per symbol), 'parquet' or 'feather'
+# (columnar files partitioned by symbol and trading day - needs pyarrow), or 'sqlite' (data/iv_history.db in
+# WAL mode, indexed on (symbol, ts)). CSV export is available for every backend.
+STORAGE_BACKEND = os.environ.get('IV_STORAGE_BACKEND', 'csv')
+iv_storage = create_storage_backend(STORAGE_BACKEND, DATA_FOLDER)
+print(f"IV history storage backend: {iv_storage.name}")
+
+# Memory-mapped binary copy of each series (date, iv, close, fclose) in data/series/<symbol>.ivs for fast
+# cold chart loads. Written alongside the storage backend; set IV_SERIES_MMAP=0 to disable.
+IV_SERIES_MMAP = os.environ.get('IV_SERIES_MMAP', '1') != '0'
+iv_series = SeriesFileStore(DATA_FOLDER) if IV_SERIES_MMAP else None
+
+# Headless collector (collector.py) and read-only viewer. The collector runs a tracker per SymbolSetting.csv
+# row and publishes their status, plus when each series was last written to storage, in
+# data/collector_status.json. With IV_VIEWER_ONLY=1 this app starts no fetch loops: it serves the shared
+# storage and reloads a series whenever the collector has written it again.
+COLLECTOR_STATUS_FILE = os.path.join(DATA_FOLDER, 'collector_status.json')
+VIEWER_ONLY = os.environ.get('IV_VIEWER_ONLY', '0') == '1'
+VIEWER_REFRESH_SECONDS = 2  # How often the viewer checks the collector status file
+# Symbol -> time.time() of its last write to the storage backend (published by the collector)
+iv_data_persisted = {}
+
+# Shared-memory series (shared_series.py): the collector publishes every in-memory series to a shared memory
+# segment on each change, and viewer processes map the segments to serve the latest candles without disk
+# reads. IV_SHARED_SERIES=0 disables it (the viewer then reloads from storage after each candle close).
+SHARED_SERIES_ENABLED = SHARED_MEMORY_AVAILABLE and os.environ.get('IV_SHARED_SERIES', '1') != '0'
+SHARED_SERIES_POLL_SECONDS = 0.25  # How often the viewer checks viewed series' segment versions
+shared_series_writer = None  # Collector only (start_shared_series_export)
+shared_series_reader = SharedSeriesReader() if VIEWER_ONLY and SHARED_SERIES_ENABLED else None
+
+def publish_shared_series(symbol, entry, from_index=0):
+    """Collector: copy a symbol's chart data into its shared memory segment (rows from from_index onward changed)"""
+    try:
+        shared_series_writer.publish(symbol, entry, from_index)
+    except Exception as e:
+        print(f"⚠ Could not publish {symbol} to shared memory: {e}")
+
+def start_shared_series_export():
+    """Collector: publish every in-memory series to shared memory from now on; False if not available"""
+    global shared_series_writer
+    if not SHARED_SERIES_ENABLED:
+        return False
+    shared_series_writer = SharedSeriesWriter()
+    for symbol, entry in list(iv_data_store.items()):
+        publish_shared_series(symbol, entry)
+    return True
+
+def sync_shared_series(symbol):
+    """Viewer: bring a symbol's chart data up to date from the collector's shared memory; True if it has a segment"""
+    payload, changed = shared_series_reader.payload(symbol)
+    if payload is None:
+        return False
+    if changed:
+        entry = dict(payload)
+        entry['last_update'] = datetime.now().isoformat()
+        set_iv_data(symbol, entry)
+    return True
+
+def market_exchange(symbol=None, exchange=None):
+    """Exchange whose calendar applies to a symbol ('MCX' for MCX: symbols, otherwise NSE)"""
+    if exchange:
+        return exchange
+    if symbol and symbol.startswith('MCX:'):
+        return 'MCX'
+    return 'NSE'
 
 def is_market_open(symbol=None, exchange=None):
     """
     Check if market is currently open based on symbol or exchange
     Returns True if market is open, False otherwise
     
-    Market hours:
-    - NSE: 9:15 AM to 3:30 PM IST
-    - MCX: 9:00 AM to 11:30 PM IST (23:30)
+    Sessions come from the market calendar (market_calendar.py): regular hours
+    (NSE: 9:15 AM to 3:30 PM IST, MCX: 9:00 AM to 11:30 PM IST), MarketHolidays.csv and MarketSpecialSessions.csv
     """
     try:
-        # Determine exchange from symbol or use provided exchange
-        if not exchange:
-            if symbol:
-                if symbol.startswith('MCX:'):
-                    exchange = 'MCX'
-                elif symbol.startswith('NSE:'):
-                    exchange = 'NSE'
-                else:
-                    # Default to NSE if not specified
-                    exchange = 'NSE'
-            else:
-                exchange = 'NSE'  # Default
-        
+        exchange = market_exchange(symbol, exchange)
         if exchange not in MARKET_HOURS:
             print(f"  [is_market_open] Exchange {exchange} not recognized, assuming market is open")
             return True  # If exchange not recognized, assume market is open
-        
-        # Get current IST time
-        if PYTZ_AVAILABLE:
-            ist = pytz.timezone('Asia/Kolkata')
-            current_time = datetime.now(ist)
-        else:
-            # Fallback: assume IST is UTC+5:30 (not perfect but works)
-            current_time = datetime.now()
-        
-        current_hour = current_time.hour
-        current_minute = current_time.minute
-        current_weekday = current_time.weekday()  # 0 = Monday, 6 = Sunday
-        
-        # Check if it's a weekend (Saturday = 5, Sunday = 6)
-        if current_weekday >= 5:
-            print(f"  [is_market_open] Weekend detected (weekday={current_weekday}), market is closed")
-            return False
-        
-        # Get market hours
-        market_open = MARKET_HOURS[exchange]['open']
-        market_close = MARKET_HOURS[exchange]['close']
-        
-        open_hour, open_minute = market_open
-        close_hour, close_minute = market_close
-        
-        # Convert to minutes for easier comparison
-        current_minutes = current_hour * 60 + current_minute
-        open_minutes = open_hour * 60 + open_minute
-        close_minutes = close_hour * 60 + close_minute
-        
-        # Check if current time is within market hours
-        is_open = open_minutes <= current_minutes <= close_minutes
-        print(f"  [is_market_open] {exchange}: Current time={current_hour:02d}:{current_minute:02d} ({current_minutes} min), Market hours={open_hour:02d}:{open_minute:02d}-{close_hour:02d}:{close_minute:02d} ({open_minutes}-{close_minutes} min), Result={'OPEN' if is_open else 'CLOSED'}")
-        return is_open
+        return is_session_open(exchange)
     except Exception as e:
         print(f"  [is_market_open] Exception: {e}")
         import traceback
@@ -165,18 +314,11 @@ def cleanup_csv_files():
         return
     
     try:
-        if os.path.exists(DATA_FOLDER):
-            csv_files = [f for f in os.listdir(DATA_FOLDER) if f.endswith('.csv')]
-            deleted_count = 0
-            for csv_file in csv_files:
-                filepath = os.path.join(DATA_FOLDER, csv_file)
-                try:
-                    os.remove(filepath)
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"Warning: Could not delete {csv_file}: {e}")
-            if deleted_count > 0:
-                print(f"Cleaned up {deleted_count} CSV file(s) from data folder for fresh start")
+        deleted_count = iv_storage.delete()
+        if iv_series is not None:
+            iv_series.delete()
+        if deleted_count > 0:
+            print(f"Cleaned up {deleted_count} IV history file(s) from data folder for fresh start")
     except Exception as e:
         print(f"Warning: Could not clean up CSV files: {e}")
 
@@ -185,35 +327,14 @@ cleanup_csv_files()
 
 def delete_csv_files(symbol=None):
     """
-    Delete CSV files from data folder
-    If symbol is provided, delete only that symbol's CSV file
-    If symbol is None, delete all CSV files
+    Delete stored IV history (CSV files, or partitions of the configured storage backend)
+    If symbol is provided, delete only that symbol's history
+    If symbol is None, delete all of it
     """
     try:
-        if not os.path.exists(DATA_FOLDER):
-            return 0
-        
-        deleted_count = 0
-        if symbol:
-            # Delete specific symbol's CSV file
-            safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-            safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-            filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
-            if os.path.exists(filename):
-                os.remove(filename)
-                print(f"Deleted CSV file for symbol {symbol}: {filename}")
-                deleted_count = 1
-        else:
-            # Delete all CSV files
-            csv_files = [f for f in os.listdir(DATA_FOLDER) if f.endswith('.csv')]
-            for csv_file in csv_files:
-                filepath = os.path.join(DATA_FOLDER, csv_file)
-                try:
-                    os.remove(filepath)
-                    deleted_count += 1
-                    print(f"Deleted CSV file: {filepath}")
-                except Exception as e:
-                    print(f"Error deleting {filepath}: {e}")
+        deleted_count = iv_storage.delete(symbol)
+        if iv_series is not None:
+            iv_series.delete(symbol)
         
         print(f"Deleted {deleted_count} CSV file(s)")
         if deleted_count > 0:
@@ -401,23 +522,17 @@ def generate_future_symbol_from_settings(prefix, symbol, expiry_date):
         traceback.print_exc()
         return None
 
-def save_iv_to_csv(symbol, df_with_iv, timeframe=None, strike=None, expiry=None, option_type=None):
+def save_iv_to_csv(symbol, df_with_iv, timeframe=None, strike=None, expiry=None, option_type=None, replace_from=None):
     """
-    Save IV calculation results to CSV file in data folder
-    File name: symbolname.csv (sanitized)
+    Save IV calculation results to the IV history storage backend
+    CSV backend file name: data/symbolname.csv (sanitized)
     
-    Appends/merges new data with existing CSV file to preserve historical data.
+    Appends/merges new data with existing history to preserve historical data.
+    replace_from: stored rows at or after this date are replaced by df_with_iv instead of merged with it
     Includes: date, option_name, underlying_name, close, fclose, strike, expiry, iv, option_type, timeframe
     """
     try:
-        # Sanitize symbol name for filename (remove invalid characters)
-        safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-        safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-        
-        # Create filename
-        filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
-        
-        # Prepare data for CSV
+        # Prepare data for storage
         csv_data = df_with_iv.copy()
         
         # Ensure date column is properly formatted
@@ -441,7 +556,10 @@ def save_iv_to_csv(symbol, df_with_iv, timeframe=None, strike=None, expiry=None,
         additional_columns = [
             'option_type',
             'timeframe',
-            'volume'
+            'volume',
+            'call_iv',  # Paired CE+PE (straddle) series
+            'put_iv',
+            'forward_source'  # 'parity' or 'future' when the forward is implied from put-call parity
         ]
         
         # Map old column names to new ones if they exist
@@ -472,51 +590,11 @@ def save_iv_to_csv(symbol, df_with_iv, timeframe=None, strike=None, expiry=None,
         # Prepare new data with only required columns
         new_data = csv_data[columns_to_save].copy()
         
-        # Check if CSV file already exists
-        if os.path.exists(filename):
-            try:
-                # Read existing CSV
-                existing_df = pd.read_csv(filename)
-                
-                # Ensure date column is datetime for comparison
-                if 'date' in existing_df.columns:
-                    existing_df['date'] = pd.to_datetime(existing_df['date'])
-                if 'date' in new_data.columns:
-                    new_data['date'] = pd.to_datetime(new_data['date'])
-                
-                # Merge: Remove duplicates based on date (keep latest)
-                # Combine both dataframes
-                combined_df = pd.concat([existing_df, new_data], ignore_index=True)
-                
-                # Remove duplicates based on date, keeping the last occurrence
-                combined_df = combined_df.drop_duplicates(subset=['date'], keep='last')
-                
-                # Sort by date
-                combined_df = combined_df.sort_values('date')
-                
-                # Convert date back to string format
-                combined_df['date'] = combined_df['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Save merged data
-                combined_df[columns_to_save].to_csv(filename, index=False, float_format='%.4f')
-                
-                new_rows = len(new_data)
-                total_rows = len(combined_df)
-                print(f"IV data appended/merged to: {filename}")
-                print(f"  Added {new_rows} new rows, Total rows: {total_rows}, Columns: {', '.join(columns_to_save)}")
-            except Exception as e:
-                print(f"Warning: Could not merge with existing CSV ({e}), overwriting file...")
-                # Fallback: overwrite if merge fails
-                new_data['date'] = pd.to_datetime(new_data['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
-                new_data[columns_to_save].to_csv(filename, index=False, float_format='%.4f')
-                print(f"IV data saved to: {filename} (overwritten)")
-                print(f"  Saved {len(new_data)} rows with columns: {', '.join(columns_to_save)}")
-        else:
-            # New file: save directly
-            new_data['date'] = pd.to_datetime(new_data['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
-            new_data[columns_to_save].to_csv(filename, index=False, float_format='%.4f')
-            print(f"IV data saved to: {filename}")
-            print(f"  Saved {len(new_data)} rows with columns: {', '.join(columns_to_save)}")
+        # Merge with existing history (rows with the same date are replaced)
+        filename = iv_storage.write(symbol, new_data, replace_from=replace_from)
+        if iv_series is not None:
+            iv_series.write(symbol, new_data, replace_from=replace_from)
+        iv_data_persisted[symbol] = time.time()
         
         return filename
     except Exception as e:
@@ -525,6 +603,89 @@ def save_iv_to_csv(symbol, df_with_iv, timeframe=None, strike=None, expiry=None,
         traceback.print_exc()
         return None
 
+def load_iv_history(symbol, start=None, end=None):
+    """
+    Load a symbol's stored IV history as a DataFrame (naive IST dates, sorted), or None if there is none
+    Falls back to a case-insensitive match on the stored (sanitized) symbol names
+    """
+    df = iv_storage.read(symbol, start, end)
+    if df is None:
+        symbol_no_colon = symbol.replace(':', '_')
+        for stored_name in iv_storage.list_symbols():
+            if stored_name.upper() == symbol_no_colon.upper():
+                print(f"  Found matching stored history: {stored_name} (case-insensitive match)")
+                df = iv_storage.read(stored_name, start, end)
+                break
+    if df is None or 'date' not in df.columns or 'iv' not in df.columns:
+        return None
+    return df
+
+def load_iv_series(symbol, start=None, end=None):
+    """
+    Load just the chart columns (date, iv, close, fclose) of a symbol's history
+    Reads the memory-mapped series file when there is one; otherwise reads the storage backend and
+    writes the series file so the next cold load is a binary search + slice
+    """
+    if iv_series is not None and iv_series.exists(symbol):
+        df = iv_series.read(symbol, start, end)
+        if df is not None and len(df) > 0:
+            return df
+    df = load_iv_history(symbol, start, end)
+    if df is not None and iv_series is not None and start is None and end is None:
+        try:
+            iv_series.write(symbol, df)
+        except Exception as e:
+            print(f"Warning: Could not write series file for {symbol}: {e}")
+    return df
+
+# Chart resolutions: 'auto' picks the finest level that fits max_points, '1m' is the raw series
+CHART_RESOLUTIONS = ('auto', '1m') + tuple(name for name, _ in SeriesFileStore.LEVELS)
+
+def load_chart_level(symbol, start=None, end=None, max_points=None, resolution='auto'):
+    """
+    Chart payload from the resolution pyramid (IV OHLC per bucket), or None when the raw series fits
+    
+    The payload is the usual chart payload (iv_values = IV close of each bucket) plus iv_open/iv_high/iv_low
+    and the resolution used. Reads the pyramid files when the binary series is enabled; otherwise rolls the
+    stored history up on the fly.
+    """
+    if iv_series is not None:
+        if not iv_series.exists(symbol):
+            load_iv_series(symbol)  # Writes the series file and pyramid from the storage backend
+        if not iv_series.exists(symbol):
+            return None
+        level = iv_series.pick_level(symbol, start, end, max_points) if resolution == 'auto' else resolution
+        if level == '1m':
+            return None
+        df = iv_series.read(symbol, start, end, level)
+    else:
+        df = load_iv_history(symbol, start, end)
+        if df is None:
+            return None
+        records = SeriesFileStore.to_records(df)
+        if resolution == 'auto' and (not max_points or len(records) <= max_points):
+            return None
+        if resolution == '1m':
+            return None
+        for name, seconds in SeriesFileStore.LEVELS:
+            records = SeriesFileStore.rollup(records, seconds)
+            if name == resolution or (resolution == 'auto' and len(records) <= max_points):
+                break
+        level = name
+        df = pd.DataFrame({name: records[name] for name in records.dtype.names if name != 'ts'})
+        df.insert(0, 'date', records['ts'].astype('datetime64[s]'))
+    
+    if df is None:
+        df = pd.DataFrame({'date': pd.to_datetime([]), 'open': [], 'high': [], 'low': [], 'iv': [], 'close': [], 'fclose': []})
+    payload = build_iv_payload(df)
+    payload.update({
+        "iv_open": df['open'].tolist(),
+        "iv_high": df['high'].tolist(),
+        "iv_low": df['low'].tolist(),
+        "resolution": level
+    })
+    return payload
+
 def parse_option_symbol(symbol):
     """
     Parse Indian option symbol format (e.g., NIFTY25N1825700PE, RELIANCE25N1825700CE, MCX:CRUDEOILM25NOV5300CE)
@@ -799,12 +960,18 @@ def get_future_symbol(underlying, expiry_date):
     
     return future_symbol
 
-def get_future_ltp(future_symbol):
-    """Get Last Traded Price (LTP) of future from Fyers API"""
+def get_future_ltp(future_symbol, stop_event=None):
+    """
+    Get Last Traded Price (LTP) of future from Fyers API
+    stop_event: a fetch loop's cancellation token - setting it abandons the quote (async engine), returning None
+    """
     try:
         if FyresIntegration.fyers is None:
             return None
         
+        if FYERS_ASYNC_ENABLED:
+            return fyers_engine.fetch_ltp(future_symbol, stop_event=stop_event)
+        
         # Use get_ltp function from FyresIntegration
         from FyresIntegration import get_ltp
         ltp = get_ltp(future_symbol)
@@ -834,6 +1001,62 @@ def calculate_atm_strike(future_ltp, strike_distance=50):
     atm_strike = round(future_ltp / strike_distance) * strike_distance
     return int(atm_strike)
 
+# ATM roll hysteresis (automatic mode)
+# Near the midpoint between two strikes the rounded ATM strike flips on every tick, and every flip
+# means a new symbol, a history refetch and a different CSV rewrite. A roll is only accepted once the
+# future is more than (0.5 + ATM_HYSTERESIS_BAND) strike steps away from the current strike AND the
+# current strike has been ATM for at least ATM_MIN_DWELL_SECONDS.
+ATM_HYSTERESIS_BAND = 0.2  # Fraction of the strike step beyond the midpoint (0 = plain rounding)
+ATM_MIN_DWELL_SECONDS = 30  # Minimum time a strike stays ATM before another roll is accepted
+
+def apply_atm_hysteresis(future_ltp, current_strike, strike_distance=50, hysteresis_band=ATM_HYSTERESIS_BAND):
+    """
+    Calculate the ATM strike with a hysteresis band around the current strike
+    
+    Parameters:
+    - future_ltp: Last Traded Price of the future
+    - current_strike: Strike that is currently ATM (None on the first calculation)
+    - strike_distance: Strike interval
+    - hysteresis_band: Extra distance past the midpoint, as a fraction of strike_distance
+    
+    Returns:
+    - current_strike while the future stays inside the band, otherwise the newly rounded ATM strike
+    """
+    atm_strike = calculate_atm_strike(future_ltp, strike_distance)
+    if atm_strike is None or current_strike is None or atm_strike == current_strike:
+        return atm_strike
+    
+    if abs(future_ltp - current_strike) <= strike_distance * (0.5 + hysteresis_band):
+        return current_strike
+    return atm_strike
+
+def decide_atm_roll(future_ltp, current_strike, previous_atm, dwell_seconds, strike_distance=50,
+                    hysteresis_band=ATM_HYSTERESIS_BAND, min_dwell=ATM_MIN_DWELL_SECONDS):
+    """
+    Decide the strike to track this tick (hysteresis band, then minimum dwell)
+    
+    Parameters:
+    - future_ltp: Last Traded Price of the future
+    - current_strike: Strike that is currently ATM (None on the first calculation)
+    - previous_atm: Plain-rounded ATM strike of the previous tick (None on the first one)
+    - dwell_seconds: Time the current strike has been ATM
+    - strike_distance, hysteresis_band, min_dwell: Strike interval and roll thresholds
+    
+    Returns:
+    - (strike, suppressed): strike is None when the ATM strike can't be calculated; suppressed is True
+      only on the tick where plain rounding moves to a new strike that the band or the dwell holds back,
+      so a future parked past the midpoint counts once, not once per tick
+    """
+    atm_strike = calculate_atm_strike(future_ltp, strike_distance)
+    if atm_strike is None or current_strike is None:
+        return atm_strike, False
+    
+    strike = apply_atm_hysteresis(future_ltp, current_strike, strike_distance, hysteresis_band)
+    if strike != current_strike and dwell_seconds < min_dwell:
+        strike = current_strike
+    suppressed = strike == current_strike and atm_strike != current_strike and atm_strike != previous_atm
+    return strike, suppressed
+
 def generate_option_symbol(underlying, expiry_date, strike, option_type, expiry_type='weekly', is_mcx=False):
     """
     Generate option symbol based on underlying, expiry, strike, and option type
@@ -1060,9 +1283,13 @@ def calculate_iv_pyvollib(option_price, underlying_price, strike, time_to_expiry
             print(f"Error calculating IV with py_vollib Black model: {e}")
         return None
 
-def safe_fetch_ohlc(symbol, timeframe):
+def safe_fetch_ohlc(symbol, timeframe, range_from=None, stop_event=None):
     """
     Safely fetch OHLC data with proper error handling
+    
+    range_from: Optional date/datetime - only fetch history from this point onward
+    (defaults to the full 90-day window used by fetchOHLC)
+    stop_event: Optional tracker token - with the async engine, setting it abandons the request (returns None)
     """
     try:
         # Ensure symbol is a string and strip any whitespace
@@ -1078,8 +1305,14 @@ def safe_fetch_ohlc(symbol, timeframe):
             print(f"❌ ERROR: Fyers not initialized. Cannot fetch data for {symbol}")
             return None
         
+        if FYERS_ASYNC_ENABLED:
+            return fyers_engine.fetch_ohlc(symbol, timeframe, range_from=range_from, stop_event=stop_event)
+        
         # Call the original fetchOHLC function
-        df = fetchOHLC(symbol, timeframe)
+        if range_from is not None:
+            df = fetchOHLC(symbol, timeframe, range_from=range_from)
+        else:
+            df = fetchOHLC(symbol, timeframe)
         return df
         
     except KeyError as e:
@@ -1100,8 +1333,25 @@ def safe_fetch_ohlc(symbol, timeframe):
         add_log('ERROR', error_msg, {'symbol': symbol, 'error': str(e), 'error_type': type(e).__name__})
         return None
 
+def safe_fetch_ohlc_many(requests, stop_event=None):
+    """
+    Fetch several (symbol, timeframe, range_from) histories, concurrently with the async engine
+    Returns a list of DataFrames (None for a failed fetch) in request order
+    """
+    if not FYERS_ASYNC_ENABLED or FyresIntegration.fyers is None:
+        return [safe_fetch_ohlc(symbol, timeframe, range_from=range_from, stop_event=stop_event)
+                for symbol, timeframe, range_from in requests]
+    try:
+        return fyers_engine.fetch_ohlc_many(requests, stop_event=stop_event)
+    except Exception as e:
+        error_msg = f"Error fetching OHLC data for {', '.join(str(r[0]) for r in requests)}"
+        print(f"❌ {error_msg}: {e}")
+        add_log('ERROR', error_msg, {'error': str(e), 'error_type': type(e).__name__})
+        return [None] * len(requests)
+
 def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06, 
-                manual_strike=None, manual_expiry=None, manual_option_type=None, manual_future_symbol=None):
+                manual_strike=None, manual_expiry=None, manual_option_type=None, manual_future_symbol=None,
+                history_from=None, future_df=None, time_basis='calendar', stop_event=None):
     """
     Calculate Implied Volatility using py_vollib Black model (for options) or Historical Volatility (for underlying)
     
@@ -1114,6 +1364,10 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
     - manual_expiry: Optional manual expiry datetime string (overrides parsed value) - used for option symbol and time_to_expiry calculation
     - manual_option_type: Optional manual option type 'c' or 'p' (overrides parsed value)
     - manual_future_symbol: Optional future symbol (from SymbolSetting.csv). If provided, uses this instead of reconstructing from option expiry
+    - history_from: Optional date/datetime - only fetch future history from this point onward (used after ATM rolls)
+    - future_df: Optional already-fetched future OHLC DataFrame (paired CE+PE mode shares one future fetch)
+    - time_basis: 'calendar' (365-day year) or 'trading' (exchange session minutes and holidays, 252-day year)
+    - stop_event: Optional cancellation token of the calling fetch loop, passed to the future history/LTP requests
     
     For Underlying Assets (fallback):
     - Uses rolling standard deviation of log returns (Historical Volatility)
@@ -1177,7 +1431,8 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
             'strike': manual_strike if manual_strike is not None else (parsed_info['strike'] if parsed_info else None),
             'expiry_date': expiry_date if expiry_date else (parsed_info['expiry_date'] if parsed_info else None),
             'option_type': manual_option_type if manual_option_type else (parsed_info['option_type'] if parsed_info else 'c'),
-            'is_option': True
+            'is_option': True,
+            'is_mcx': is_mcx_underlying
         }
         
         # Validate required fields
@@ -1209,9 +1464,15 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
             future_symbol = get_future_symbol(underlying_symbol, expiry_date)
         
         if future_symbol:
-            # Fetch historical data for future symbol
-            print(f"  Fetching future data for: {future_symbol}")
-            df_future = safe_fetch_ohlc(future_symbol, timeframe)
+            # Fetch historical data for future symbol (unless the caller already has it)
+            if future_df is not None:
+                print(f"  Using shared future data for: {future_symbol}")
+                df_future = future_df
+            else:
+                print(f"  Fetching future data for: {future_symbol}")
+                df_future = safe_fetch_ohlc(future_symbol, timeframe, range_from=history_from, stop_event=stop_event)
+                if stop_event is not None and stop_event.is_set():
+                    return None  # The fetch loop was cancelled - no fallback, the caller discards the result
             
             if df_future is None or len(df_future) == 0:
                 error_msg = f"Could not fetch historical data for future symbol {future_symbol}"
@@ -1233,7 +1494,8 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                     df_option['date'] = df_option['date'].dt.tz_localize(None)
                 
                 # Prepare future dataframe - keep only date and close, rename close to fclose
-                df_future_prep = df_future[['date', 'close']].copy()
+                # (a put-call-parity forward series also carries a forward_source column)
+                df_future_prep = df_future[[c for c in ['date', 'close', 'forward_source'] if c in df_future.columns]].copy()
                 df_future_prep.rename(columns={'close': 'fclose'}, inplace=True)
                 df_future_prep['date'] = pd.to_datetime(df_future_prep['date'])
                 # Remove timezone info for consistent merging (keep exact timestamp)
@@ -1254,7 +1516,7 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                 # This prevents cartesian products while ensuring proper matching
                 print(f"  Merging option data ({len(df_option)} rows) with future data ({len(df_future_prep)} rows)...")
                 df_merged = pd.merge(df_option[['date', 'close', 'date_rounded']], 
-                                    df_future_prep[['fclose', 'date_rounded']], 
+                                    df_future_prep.drop(columns=['date']), 
                                     on='date_rounded', 
                                     how='inner')
                 
@@ -1292,6 +1554,13 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                         })
                         print(f"  Falling back to historical volatility")
                     else:
+                        # Time to expiry in years for every row at once, using option expiry
+                        # (expiry_date is already normalized to naive above)
+                        # calendar: 365-day year, the standard approach used by most Indian brokers
+                        # trading: exchange session minutes to expiry (holidays excluded), 252-day year
+                        exchange = 'MCX' if option_info.get('is_mcx') or str(symbol).upper().startswith('MCX:') else 'NSE'
+                        df_merged['time_to_expiry'] = compute_time_to_expiry(df_merged['date'], expiry_date, basis=time_basis, exchange=exchange)
+                        
                         # Calculate IV for each row using historical future prices
                         print(f"  Starting IV calculation loop for {len(df_merged)} rows...")
                         iv_values = []
@@ -1333,25 +1602,8 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                                 continue
                             
                             if option_price > 0 and future_price > 0:
-                                # Calculate time to expiry for this timestamp
-                                row_date = row['date'] if isinstance(row['date'], datetime) else pd.to_datetime(row['date'])
-                                
-                                # Fix timezone mismatch: make row_date timezone-naive if needed
-                                if row_date.tzinfo is not None:
-                                    # If row_date is timezone-aware, convert to naive
-                                    row_date = row_date.replace(tzinfo=None)
-                                
-                                # expiry_date is already normalized to naive above, so we can use it directly
-                                # Calculate time to expiry in years using option expiry
-                                # Indian brokers typically use calendar days (365) for time to expiry calculation
-                                # However, some use trading days (252). We'll use calendar days as it's more standard.
-                                time_diff = expiry_date - row_date
-                                total_seconds = time_diff.total_seconds()
-                                
-                                # Convert to years using calendar days (365 days per year)
-                                # This is the standard approach used by most Indian brokers
-                                # Note: Using 365.25 accounts for leap years, but 365 is more common in options pricing
-                                time_to_expiry = total_seconds / (365.0 * 24 * 3600)
+                                # Time to expiry for this timestamp (precomputed for all rows above)
+                                time_to_expiry = row['time_to_expiry']
                                 
                                 # Ensure time to expiry is reasonable (not negative, not too large)
                                 if time_to_expiry <= 0:
@@ -1362,12 +1614,6 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                                     iv_values.append(np.nan)
                                     continue
                                 
-                                # Alternative: Use trading days (more accurate for options)
-                                # trading_days_per_year = 252
-                                # calendar_days = time_diff.days
-                                # trading_days = calendar_days * (trading_days_per_year / 365.25)
-                                # time_to_expiry = trading_days / trading_days_per_year
-                                
                                 if time_to_expiry > 0:
                                     # Calculate IV using py_vollib Black model with historical future price
                                     iv_decimal = calculate_iv_pyvollib(
@@ -1517,7 +1763,7 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                 if future_symbol:
                     # Try to fetch historical future data for fclose column
                     print(f"  Attempting to fetch future data for fallback: {future_symbol}")
-                    df_future = safe_fetch_ohlc(future_symbol, timeframe)
+                    df_future = safe_fetch_ohlc(future_symbol, timeframe, stop_event=stop_event)
                     
                     if df_future is not None and len(df_future) > 0:
                         # Merge with future data to get fclose
@@ -1530,7 +1776,7 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
                         print(f"  Merged future data: {df['fclose'].notna().sum()} rows have fclose values")
                     else:
                         # If can't fetch future data, use current LTP for all rows
-                        underlying_price = get_future_ltp(future_symbol)
+                        underlying_price = get_future_ltp(future_symbol, stop_event=stop_event)
                         if underlying_price:
                             df['fclose'] = underlying_price
                             print(f"  Using current LTP for fclose: {underlying_price}")
@@ -1550,18 +1796,569 @@ def calculate_iv(df, window=20, timeframe='1D', symbol=None, risk_free_rate=0.06
     
     return df
 
-def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_type, timeframe, strike_distance, risk_free_rate=0.07):
+def get_ist_now():
+    """Current IST time as a timezone-naive datetime (same convention as the stored candle dates)"""
+    if PYTZ_AVAILABLE:
+        return datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+    return datetime.now()
+
+def timeframe_to_seconds(timeframe):
+    """
+    Convert a Fyers resolution ('1s', '1', '5', ..., '120', '1D') to seconds per candle
+    """
+    tf = str(timeframe).strip()
+    if tf.upper() in ('1D', 'D'):
+        return 24 * 3600
+    try:
+        if tf.lower().endswith('s'):
+            return max(1, int(tf[:-1]))
+        return max(1, int(tf)) * 60
+    except ValueError:
+        return 60
+
+# Candle-aligned polling (both fetch loops): between candle closes only the forming candle is refreshed, in memory,
+# every forming_candle_cadence(timeframe) seconds; the full history fetch, merge and save run once per candle,
+# CANDLE_CLOSE_DELAY seconds after it closes (so the broker has the final candle).
+# IV_POLL_CADENCE (seconds) overrides the per-timeframe cadence.
+FORMING_POLLS_PER_CANDLE = 30
+MIN_FORMING_CADENCE = 2
+MAX_FORMING_CADENCE = 60
+CANDLE_CLOSE_DELAY = 2
+POLL_CADENCE_OVERRIDE = float(os.environ.get('IV_POLL_CADENCE') or 0)
+
+def forming_candle_cadence(timeframe):
+    """Seconds between refreshes of the forming candle: 1/30 of a candle, 2-60 s (1m: 2 s, 15m: 30 s, 1h+: 60 s)"""
+    if POLL_CADENCE_OVERRIDE > 0:
+        return POLL_CADENCE_OVERRIDE
+    return min(MAX_FORMING_CADENCE, max(MIN_FORMING_CADENCE, timeframe_to_seconds(timeframe) / FORMING_POLLS_PER_CANDLE))
+
+def closed_candle_key(timeframe, exchange):
+    """Start of the candle that was forming CANDLE_CLOSE_DELAY seconds ago - changes once per candle, just after a close"""
+    start, _ = candle_bounds(timeframe_to_seconds(timeframe), exchange, get_ist_now() - timedelta(seconds=CANDLE_CLOSE_DELAY))
+    return start
+
+def seconds_until_next_poll(timeframe, exchange, cadence):
+    """Seconds to sleep until the next cadence tick of the forming candle, or until just after it closes"""
+    now = get_ist_now() - timedelta(seconds=CANDLE_CLOSE_DELAY)
+    start, end = candle_bounds(timeframe_to_seconds(timeframe), exchange, now)
+    step = timedelta(seconds=cadence)
+    next_tick = start + step * ((now - start) // step + 1)
+    return max(0.1, (min(next_tick, end) - now).total_seconds())
+
+# Candles of history fetched before the previous candle on a forming-candle refresh, so calculate_iv sees the
+# same rolling windows as a full pass: the 20-candle historical-volatility window (plus one return) and the
+# 5-candle outlier median, which is only used at full width from 40 rows
+FORMING_WARMUP_CANDLES = 41
+
+def forming_fetch_window(candle_key, timeframe, timestamps=None, segment_start=None):
+    """
+    (fetch_from, merge_from) for a forming-candle refresh, neither before segment_start
+    - merge_from: the previous candle - only rows from here on replace the in-memory tail
+    - fetch_from: FORMING_WARMUP_CANDLES candles before that (counted back through the stored chart
+      timestamps where there are enough, so session gaps do not shorten the warm-up)
+    """
+    step = timedelta(seconds=timeframe_to_seconds(timeframe))
+    merge_from = pd.Timestamp(candle_key - step)
+    fetch_from = merge_from - step * FORMING_WARMUP_CANDLES
+    if timestamps:
+        stored = [t for t in timestamps[-(FORMING_WARMUP_CANDLES + 2):] if pd.Timestamp(t[:19]) < merge_from]
+        if stored:
+            fetch_from = min(fetch_from, pd.Timestamp(stored[max(0, len(stored) - FORMING_WARMUP_CANDLES)][:19]))
+    if segment_start is not None:
+        segment_start = pd.Timestamp(segment_start)
+        fetch_from = max(fetch_from, segment_start)
+        merge_from = max(merge_from, segment_start)
+    return fetch_from.to_pydatetime(), merge_from.to_pydatetime()
+
+def build_iv_payload(df_chart):
+    """
+    Format IV rows as the chart payload (timestamps with IST offset, iv/close/fclose lists)
+    df_chart must have 'date' and 'iv' columns; naive dates are treated as IST.
+    """
+    dates = pd.to_datetime(df_chart['date'])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('Asia/Kolkata')
+    return {
+        "timestamps": dates.dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist(),
+        "iv_values": df_chart['iv'].fillna(0).tolist(),
+        "close_prices": df_chart['close'].tolist() if 'close' in df_chart.columns else [],
+        "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
+        "last_update": datetime.now().isoformat()
+    }
+
+def store_iv_data(symbol, df_chart, extra=None):
+    """
+    Store IV data for charting in iv_data_store (all records, no limit)
+
+    df_chart must have 'date' and 'iv' columns; 'close'/'fclose' are optional.
+    Naive dates are treated as IST. Timestamps are formatted with IST offset (+05:30).
+    extra: Optional dict of additional keys to store with the data (e.g. strikes)
+    """
+    df_chart = df_chart.copy()
+    df_chart['date'] = pd.to_datetime(df_chart['date'])
+    if df_chart['date'].dt.tz is None:
+        df_chart['date'] = df_chart['date'].dt.tz_localize('Asia/Kolkata')
+    else:
+        df_chart['date'] = df_chart['date'].dt.tz_convert('Asia/Kolkata')
+    df_chart = df_chart.sort_values('date')
+
+    entry = build_iv_payload(df_chart)
+    if extra:
+        entry.update(extra)
+    set_iv_data(symbol, entry)
+    return entry
+
+def merge_iv_tail(symbol, df_tail):
+    """
+    Replace a symbol's in-memory chart rows from df_tail's first candle onwards with df_tail
+    (forming-candle refresh between candle closes: nothing is written to storage)
+    """
+    tail = build_iv_payload(df_tail.sort_values('date'))
+    current = iv_data_store.get(symbol)
+    if not current or not tail['timestamps']:
+        set_iv_data(symbol, tail)
+        return tail
+    timestamps = current.get('timestamps') or []
+    keep = bisect.bisect_left(timestamps, tail['timestamps'][0])
+    entry = dict(current)
+    for key in CHART_SERIES_KEYS:
+        values = current.get(key) or []
+        entry[key] = (values[:keep] if len(values) == len(timestamps) else []) + tail[key]
+    entry['last_update'] = tail['last_update']
+    set_iv_data(symbol, entry)
+    return entry
+
+def parse_time_bound(value):
+    """
+    Parse a from/to query value to a naive IST Timestamp (None if empty)
+    Accepts IST datetimes (2026-01-05T09:15:00), ISO strings with an offset, or epoch seconds/milliseconds
+    in chart time (IST wallclock treated as UTC, as the chart does)
+    """
+    if value is None or str(value).strip() == '':
+        return None
+    value = str(value).strip()
+    if re.fullmatch(r'\d+(\.\d+)?', value):
+        number = float(value)
+        return pd.Timestamp(number, unit='ms' if number > 1e11 else 's')
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('Asia/Kolkata').tz_localize(None)
+    return ts
+
+def parse_chart_window_args(args):
+    """
+    Read from / to / last / max_points / downsample / resolution from request args
+    Returns (start, end, max_points, method, resolution, last); raises ValueError on invalid values
+    """
+    start = parse_time_bound(args.get('from'))
+    end = parse_time_bound(args.get('to'))
+    max_points = int(args.get('max_points')) if args.get('max_points') else None
+    if max_points is not None and max_points < 2:
+        raise ValueError("max_points must be at least 2")
+    last = int(args.get('last')) if args.get('last') else None
+    if last is not None and last < 1:
+        raise ValueError("last must be at least 1")
+    method = (args.get('downsample') or 'lttb').lower()
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"downsample must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+    resolution = args.get('resolution') or None
+    if resolution is not None and resolution not in CHART_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(CHART_RESOLUTIONS)}")
+    return start, end, max_points, method, resolution, last
+
+def slice_chart_payload(payload, lo, hi):
+    """
+    Copy of a chart payload with rows lo:hi of every list aligned with timestamps
+    (iv_values, close_prices, fclose_prices, strikes, iv_open/high/low); other keys are kept as they are
+    """
+    total = len(payload.get('timestamps') or [])
+    window = dict(payload)
+    for key, values in payload.items():
+        if isinstance(values, list) and len(values) == total and total > 0:
+            window[key] = values[lo:hi]
+    return window
+
+def select_chart_window(payload, start=None, end=None, max_points=None, method='lttb', last=None):
+    """
+    Cut a chart payload to start..end (then its latest `last` rows) and reduce it to at most max_points rows
+    (LTTB or min/max per bucket)
+
+    Every list aligned with timestamps (iv_values, close_prices, fclose_prices, strikes) is sliced with the same
+    rows, so the series stay aligned. Returns the payload unchanged when nothing needs to be cut.
+    """
+    timestamps = payload.get('timestamps') or []
+    total = len(timestamps)
+    if start is None and end is None and not last and (not max_points or total <= max_points):
+        return payload
+
+    # Timestamps all share the IST format, so string order is time order
+    lo = bisect.bisect_left(timestamps, start.strftime('%Y-%m-%dT%H:%M:%S+05:30')) if start is not None else 0
+    hi = bisect.bisect_right(timestamps, end.strftime('%Y-%m-%dT%H:%M:%S+05:30')) if end is not None else total
+    hi = max(hi, lo)
+    if last:
+        lo = max(lo, hi - last)
+    aligned = [key for key, values in payload.items() if isinstance(values, list) and len(values) == total and total > 0]
+    window = slice_chart_payload(payload, lo, hi)
+
+    rows = hi - lo
+    window['total_points'] = rows
+    window['has_more'] = lo > 0
+    window['downsampled'] = False
+    if max_points and rows > max_points:
+        x = pd.to_datetime(window['timestamps'], format='%Y-%m-%dT%H:%M:%S%z').asi8
+        series = [np.array(window[key], dtype=np.float64) for key in ('iv_values', 'close_prices', 'fclose_prices')
+                  if key in aligned]
+        keep = downsample_indices(x, series, max_points, method)
+        for key in aligned:
+            values = window[key]
+            window[key] = [values[i] for i in keep]
+        window['downsampled'] = True
+        window['downsample'] = method
+    return window
+
+def wants_binary_payload():
+    """True if the request asks for the binary chart payload (format=binary, or Accept prefers application/octet-stream)"""
+    if request.args.get('format'):
+        return request.args.get('format').lower() == 'binary'
+    return request.accept_mimetypes.best_match(['application/json', BINARY_MIMETYPE]) == BINARY_MIMETYPE
+
+def chart_response(payload):
+    """
+    Chart payload response in the encoding the request asked for
+    JSON by default; binary (see chart_encoding.py) with the non-list keys as JSON in the X-IV-Meta header.
+    dtype=f64 sends float64 values instead of float32.
+    """
+    if not wants_binary_payload():
+        response = jsonify(payload)
+    else:
+        body, metadata = encode_chart_payload(payload, float32=request.args.get('dtype', 'f32').lower() != 'f64')
+        response = Response(body, mimetype=BINARY_MIMETYPE)
+        response.headers['X-IV-Meta'] = encode_metadata_header(metadata)
+    _add_vary(response, 'Accept')
+    return response
+
+# Serialized chart responses per symbol, valid for one store version: symbol -> {"version", "responses"}
+# responses maps a request variant (query args + encoding) to (body, mimetype, headers)
+chart_response_cache = {}
+chart_response_cache_lock = threading.Lock()
+CHART_CACHE_MAX_VARIANTS = 32  # Per symbol; the chart itself only uses a couple
+# Part of every ETag, so ETags from before a restart (when versions start again at 1) never match
+_etag_salt = iv_data_epoch
+
+def cached_chart_response(symbol, build_payload):
+    """
+    Serve a chart payload for an in-memory symbol from the per-symbol response cache, with ETag / 304
+
+    build_payload() is only called (and its response serialized and compressed) once per store version and
+    request variant (query args, payload encoding, content encoding); repeated polls return the cached bytes,
+    or a bodyless 304 when If-None-Match carries the current ETag.
+    """
+    version = iv_data_versions.get(symbol, 0)
+    encoding = negotiate_encoding(request.accept_encodings) if COMPRESSION_ENABLED else None
+    variant = (wants_binary_payload(), encoding, tuple(sorted((k, v) for k, v in request.args.items(multi=True) if k != 'symbol')))
+    etag = hashlib.sha1(f"{_etag_salt}|{symbol}|{version}|{variant}".encode()).hexdigest()[:20]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    with chart_response_cache_lock:
+        entry = chart_response_cache.get(symbol)
+        cached = entry['responses'].get(variant) if entry and entry['version'] == version else None
+
+    if cached is None:
+        built = chart_response(build_payload())
+        headers = {key: value for key, value in built.headers.items() if key in ('X-IV-Meta', 'Vary')}
+        body = built.get_data()
+        if encoding is not None and len(body) >= COMPRESSION_MIN_BYTES:
+            # Cache the compressed bytes so polls don't compress again
+            body = compress_body(body, encoding)
+            headers['Content-Encoding'] = encoding
+        cached = (body, built.mimetype, headers)
+        with chart_response_cache_lock:
+            entry = chart_response_cache.get(symbol)
+            if entry is None or entry['version'] != version or len(entry['responses']) >= CHART_CACHE_MAX_VARIANTS:
+                entry = {"version": version, "responses": {}}
+                chart_response_cache[symbol] = entry
+            entry['responses'][variant] = cached
+
+    body, mimetype, headers = cached
+    response = Response(body, mimetype=mimetype, headers=headers)
+    if COMPRESSION_ENABLED:
+        _add_vary(response, 'Accept-Encoding')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Points per scroll-back page (the chart's initial window is one page too)
+CHART_PAGE_POINTS = 2000
+CHART_PAGE_MAX_POINTS = 20000
+
+def read_chart_page(symbol, before=None, limit=CHART_PAGE_POINTS):
+    """
+    Up to `limit` points strictly before `before` (naive IST Timestamp; latest points if None)
+    Reads the in-memory series when the symbol is loaded, else the binary series file, else the storage backend
+    Returns (payload, has_more) - payload is None when the symbol has no history
+    """
+    data = iv_data_store.get(symbol)
+    if data is not None:
+        timestamps = data.get('timestamps') or []
+        hi = bisect.bisect_left(timestamps, before.strftime('%Y-%m-%dT%H:%M:%S+05:30')) if before is not None else len(timestamps)
+        lo = max(0, hi - limit)
+        return slice_chart_payload(data, lo, hi), lo > 0
+
+    if iv_series is not None and (iv_series.exists(symbol) or load_iv_series(symbol) is not None):
+        df, has_more = iv_series.read_page(symbol, before, limit)
+        if df is not None:
+            return build_iv_payload(df), has_more
+
+    df = load_iv_history(symbol, None, before - timedelta(seconds=1) if before is not None else None)
+    if df is None:
+        return None, False
+    return build_iv_payload(df.tail(limit)), len(df) > limit
+
+def is_paired_option_type(option_type):
+    """True for the paired CE+PE option type ('cp')"""
+    return str(option_type).lower() in ('cp', 'pc', 'both', 'straddle')
+
+def get_continuous_atm_symbol(underlying, expiry_date, option_type, is_mcx=False):
+    """
+    Build the dataset key for a continuous ATM series of one (underlying, expiry, option type)
+    Format: {EXCHANGE}:{UNDERLYING}-ATM-{CE|PE|STRADDLE}-{YYYYMMDD}
+    Example: NSE:NIFTY-ATM-CE-20260106, MCX:CRUDEOIL-ATM-PE-20260114, NSE:NIFTY-ATM-STRADDLE-20260106
+
+    The key deliberately does not end in CE/PE so parse_option_symbol never treats it as a contract.
+    """
+    exchange = 'MCX' if is_mcx else 'NSE'
+    if is_paired_option_type(option_type):
+        option_suffix = 'STRADDLE'
+    else:
+        option_suffix = 'CE' if str(option_type).lower() == 'c' else 'PE'
+    return f"{exchange}:{underlying}-ATM-{option_suffix}-{expiry_date.strftime('%Y%m%d')}"
+
+def load_continuous_atm_frame(continuous_symbol):
+    """
+    Get the stitched continuous ATM series as a DataFrame (naive IST dates)
+    Loads it from the IV history storage on first use, returns None if there is no history yet
+    """
+    if continuous_symbol in continuous_atm_frames:
+        return continuous_atm_frames[continuous_symbol]
+
+    try:
+        df = iv_storage.read(continuous_symbol)
+        if df is None or 'date' not in df.columns or 'iv' not in df.columns:
+            return None
+        continuous_atm_frames[continuous_symbol] = df
+        print(f"Loaded continuous ATM series {continuous_symbol}: {len(df)} rows")
+        return df
+    except Exception as e:
+        print(f"Warning: Could not load continuous ATM series {continuous_symbol}: {e}")
+        return None
+
+def get_continuous_atm_last_timestamp(continuous_symbol):
+    """Timestamp of the latest row in the continuous ATM series (naive IST), or None"""
+    df = load_continuous_atm_frame(continuous_symbol)
+    if df is None or len(df) == 0:
+        return None
+    return df['date'].iloc[-1].to_pydatetime()
+
+def stitch_continuous_atm(continuous_symbol, df_segment, segment_start=None, timeframe=None, persist=True):
+    """
+    Stitch the current ATM strike's IV rows onto the continuous ATM series
+
+    Rows before segment_start are kept from the existing series (earlier ATM strikes),
+    rows from segment_start onward come from df_segment (the strike that is ATM now).
+    If segment_start is None the whole df_segment is applied on top of the existing rows.
+    Each row keeps its own 'strike' and 'option_name', recording which strike was ATM at that time.
+
+    Updates iv_data_store and saves the applied rows to the continuous series CSV
+    (persist=False only updates memory - forming-candle refreshes between candle closes).
+    Returns the number of rows applied from df_segment.
+    """
+    segment = df_segment.copy()
+    segment['date'] = pd.to_datetime(segment['date'])
+    if segment['date'].dt.tz is not None:
+        segment['date'] = segment['date'].dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+    if segment_start is not None:
+        segment = segment[segment['date'] >= pd.Timestamp(segment_start)]
+    segment = segment.sort_values('date')
+
+    if len(segment) == 0:
+        return 0
+
+    cutoff = pd.Timestamp(segment_start) if segment_start is not None else segment['date'].iloc[0]
+    existing = load_continuous_atm_frame(continuous_symbol)
+    if existing is not None and len(existing) > 0:
+        combined = pd.concat([existing[existing['date'] < cutoff], segment], ignore_index=True)
+    else:
+        combined = segment.reset_index(drop=True)
+    combined = combined.drop_duplicates(subset=['date'], keep='last').sort_values('date').reset_index(drop=True)
+    continuous_atm_frames[continuous_symbol] = combined
+
+    store_iv_data(continuous_symbol, combined, extra={
+        "strikes": combined['strike'].tolist() if 'strike' in combined.columns else []
+    })
+    if persist:
+        # Same rows as memory: the stored series is replaced from the cutoff, not merged (rows of the
+        # previous strike that the new segment doesn't cover must not survive on disk)
+        save_iv_to_csv(symbol=continuous_symbol, df_with_iv=segment, timeframe=timeframe, replace_from=cutoff)
+    return len(segment)
+
+def build_straddle_iv(df_call, df_put):
+    """
+    Combine the ATM call and put IV frames of the same strike into one straddle frame
+
+    Rows are matched on candle date. Columns:
+    - call_iv / put_iv: IV of each leg
+    - iv: put-call averaged IV (mean of the valid legs; one leg if the other is missing/zero)
+    - close: straddle premium (call close + put close)
+    - fclose: future close shared by both legs
+    """
+    columns = ['date', 'iv', 'close', 'fclose', 'strike', 'expiry', 'timeframe']
+    call = df_call[[c for c in columns if c in df_call.columns]].copy()
+    put = df_put[[c for c in ['date', 'iv', 'close'] if c in df_put.columns]].copy()
+    for df_leg in (call, put):
+        df_leg['date'] = pd.to_datetime(df_leg['date'])
+        if df_leg['date'].dt.tz is not None:
+            df_leg['date'] = df_leg['date'].dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+
+    df = pd.merge(call, put, on='date', how='inner', suffixes=('_call', '_put'))
+    df = df.rename(columns={'iv_call': 'call_iv', 'iv_put': 'put_iv'})
+    leg_ivs = df[['call_iv', 'put_iv']].where(df[['call_iv', 'put_iv']] > 0)
+    df['iv'] = leg_ivs.mean(axis=1).fillna(0)
+    df['close'] = df['close_call'] + df['close_put']
+    df = df.drop(columns=['close_call', 'close_put'])
+    df['option_name'] = 'STRADDLE'
+    df['option_type'] = 'cp'
+    return df.sort_values('date').reset_index(drop=True)
+
+FORWARD_SOURCES = ('future', 'parity')
+
+def build_parity_forward(df_call, df_put, strike, expiry_date, risk_free_rate=0.07):
+    """
+    Imply the forward price per candle from a CE/PE pair of the same strike (put-call parity)
+    
+    For options on futures (Black model): C - P = e^(-rT) * (F - K)  =>  F = K + e^(rT) * (C - P)
+    Candles are matched on date, so the forward is time-aligned with the option prices by construction.
+    
+    Returns a DataFrame with 'date' (naive IST), 'close' (implied forward) and 'forward_source' ('parity').
+    Rows without a valid forward (missing leg, non-positive prices, expired) are left out.
+    """
+    legs = []
+    for df_leg in (df_call, df_put):
+        if df_leg is None or len(df_leg) == 0:
+            return pd.DataFrame(columns=['date', 'close', 'forward_source'])
+        leg = df_leg[['date', 'close']].copy()
+        leg['date'] = pd.to_datetime(leg['date'])
+        if leg['date'].dt.tz is not None:
+            leg['date'] = leg['date'].dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+        legs.append(leg)
+    
+    df = pd.merge(legs[0], legs[1], on='date', how='inner', suffixes=('_call', '_put'))
+    # Discounting accrues on calendar time regardless of the IV time basis
+    time_to_expiry = compute_time_to_expiry(df['date'], expiry_date, basis='calendar')
+    call_price = df['close_call'].to_numpy(dtype=float)
+    put_price = df['close_put'].to_numpy(dtype=float)
+    forward = strike + np.exp(risk_free_rate * time_to_expiry) * (call_price - put_price)
+    
+    valid = (time_to_expiry > 0) & (call_price > 0) & (put_price > 0) & (forward > 0)
+    return pd.DataFrame({
+        'date': df['date'].to_numpy()[valid],
+        'close': forward[valid],
+        'forward_source': 'parity'
+    })
+
+def get_parity_forward(df_call, df_put, strike, expiry_date, risk_free_rate, future_symbol, timeframe, range_from=None, stop_event=None):
+    """
+    Forward series for IV from put-call parity, falling back to the future's history only where parity is missing
+    
+    Returns (forward_df, future_fetched). forward_df has 'date', 'close' and 'forward_source'
+    ('parity' or 'future') and can be passed to calculate_iv as future_df.
+    """
+    forward = build_parity_forward(df_call, df_put, strike, expiry_date, risk_free_rate)
+    
+    option_dates = []
+    for df_leg in (df_call, df_put):
+        if df_leg is not None and len(df_leg) > 0:
+            dates = pd.to_datetime(df_leg['date'])
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+            option_dates.append(dates)
+    if not option_dates:
+        return None, False
+    missing = pd.Index(pd.concat(option_dates).unique()).difference(pd.Index(forward['date']))
+    if len(missing) == 0:
+        return forward, False
+    
+    # Parity data missing for some candles (a leg didn't trade) - fill those from the future series
+    print(f"  Parity forward missing for {len(missing)} candles, filling from future {future_symbol}")
+    df_future = safe_fetch_ohlc(future_symbol, timeframe, range_from=range_from, stop_event=stop_event)
+    if df_future is not None and len(df_future) > 0:
+        fallback = df_future[['date', 'close']].copy()
+        fallback['date'] = pd.to_datetime(fallback['date'])
+        if fallback['date'].dt.tz is not None:
+            fallback['date'] = fallback['date'].dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+        fallback = fallback[fallback['date'].isin(missing)]
+        fallback['forward_source'] = 'future'
+        forward = pd.concat([forward, fallback], ignore_index=True)
+    forward = forward.sort_values('date').reset_index(drop=True)
+    return (forward if len(forward) > 0 else None), True
+
+def tracker_lock(key):
+    """Lock that serializes the fetch loops for one tracker key"""
+    with tracker_locks_guard:
+        return tracker_locks.setdefault(key, threading.Lock())
+
+def run_tracker(key, token, target, *args, **kwargs):
+    """
+    Thread body for a fetch loop: wait until any earlier loop with the same tracker key has exited, then run
+    target(*args, stop_event=token, **kwargs). Gives up without fetching if token is cancelled while waiting
+    """
+    lock = tracker_lock(key)
+    while not lock.acquire(timeout=TRACKER_LOCK_POLL):
+        if token.is_set():
+            print(f"Tracker for {key} cancelled before the previous loop exited")
+            return
+    try:
+        if not token.is_set():
+            target(*args, stop_event=token, **kwargs)
+    finally:
+        lock.release()
+        print(f"Tracker for {key} exited")
+
+def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_type, timeframe, strike_distance, risk_free_rate=0.07,
+                              atm_hysteresis=ATM_HYSTERESIS_BAND, atm_min_dwell=ATM_MIN_DWELL_SECONDS, forward_source='future',
+                              time_basis='calendar', stop_event=None, status=None):
     """
     Continuously fetch data in automatic mode:
     1. Get future LTP
     2. Calculate ATM strike
     3. Generate option symbol
     4. Fetch option data and calculate IV
-    5. Repeat every 1 second
+    5. Stitch the IV into the continuous ATM series (one dataset across strike rolls)
+    6. Repeat, aligned to the timeframe's candles: a full pass (history from the segment start, saved to storage)
+       once per candle close, and in-memory refreshes of the forming candle every forming_candle_cadence seconds
+    
+    option_type 'cp' (paired mode) tracks the ATM CE and PE together: the future LTP quote and the
+    future history are fetched once per iteration and shared by both legs. Each leg is stitched into
+    its own CE/PE series and the combined straddle series is what the chart follows.
+    
+    forward_source 'parity' implies the forward from the ATM CE/PE pair (put-call parity) instead of
+    fetching the future's history; the future is only fetched for candles where parity data is missing.
+    
+    After an ATM roll, the new strike only fetches history from the roll time onward.
+    Rolls are filtered by a hysteresis band (atm_hysteresis, fraction of strike step) and a minimum
+    dwell time (atm_min_dwell, seconds) so the ATM strike doesn't thrash near strike midpoints.
     
     Only fetches data during market hours (NSE: 9:15-15:30, MCX: 9:00-23:30)
+    
+    status is the tracker's status dict (the global fetching_status for the loop /api/start_fetching starts,
+    one dict per tracker in the headless collector); the loop keeps its symbol/strike current
     """
     global iv_data_store, fetching_status
+    status = fetching_status if status is None else status
     
     # Extract underlying from future symbol
     if ':' in future_symbol:
@@ -1652,7 +2449,7 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
         error_msg = f"Could not extract underlying from {future_symbol}"
         print(f"ERROR: {error_msg}")
         add_log('ERROR', error_msg, {'future_symbol': future_symbol, 'underlying_part': underlying_part if 'underlying_part' in locals() else 'unknown'})
-        fetching_status["active"] = False
+        status["active"] = False
         return
     
     # Determine exchange for market hours check
@@ -1660,12 +2457,35 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
     
     iteration = 0
     print(f"Starting automatic fetch loop for future_symbol={future_symbol}, underlying={underlying}", flush=True)
-    print(f"Initial fetch status check: active={fetching_status.get('active')}, mode={fetching_status.get('mode')}, future_symbol={fetching_status.get('future_symbol')}", flush=True)
+    print(f"Initial fetch status check: active={status.get('active')}, mode={status.get('mode')}, future_symbol={status.get('future_symbol')}", flush=True)
     
     # Store the initial future_symbol to detect if it changed (user restarted with different symbol)
     initial_future_symbol = future_symbol
     
-    print(f"Entering while loop. Initial conditions: active={fetching_status.get('active')}, mode={fetching_status.get('mode')}, future_symbol={fetching_status.get('future_symbol')}", flush=True)
+    # Paired mode ('cp'): track the ATM CE and PE together on one future stream and emit a straddle series
+    paired = is_paired_option_type(option_type)
+    leg_types = ['c', 'p'] if paired else [option_type]
+    
+    # Continuous ATM series: one dataset for (underlying, option expiry, option type) across strike rolls
+    # In paired mode continuous_symbol is the straddle series and each leg keeps its own CE/PE series
+    continuous_symbol = get_continuous_atm_symbol(underlying, expiry_date, option_type, is_mcx=is_mcx)
+    leg_continuous_symbols = {leg_type: get_continuous_atm_symbol(underlying, expiry_date, leg_type, is_mcx=is_mcx) for leg_type in leg_types}
+    status.setdefault("continuous_symbol", continuous_symbol)
+    current_strike = status.get("strike")
+    # Start of the current strike's segment - only history from here onward is fetched and stitched.
+    # Resume from the last stored point so a restart doesn't refetch/overwrite older stitched history.
+    segment_start = get_continuous_atm_last_timestamp(continuous_symbol)
+    print(f"Continuous ATM series: {continuous_symbol} (segment start: {segment_start})", flush=True)
+    
+    # ATM roll bookkeeping: when the current strike became ATM, the last plain-rounded ATM strike,
+    # rolls suppressed since then and the roll being processed this iteration (logged with its cost
+    # once the new strike is stitched)
+    strike_since = time.monotonic()
+    previous_atm = None
+    suppressed_rolls = 0
+    pending_roll = None
+    
+    print(f"Entering while loop. Initial conditions: active={status.get('active')}, mode={status.get('mode')}, future_symbol={status.get('future_symbol')}", flush=True)
     import sys
     sys.stdout.flush()
     
@@ -1673,18 +2493,24 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
     thread_id = threading.current_thread().ident
     print(f"[Thread {thread_id}] Starting while loop", flush=True)
     
-    while fetching_status["active"] and fetching_status.get("mode") == "automatic":
+    # Candle-aligned polling: start of the last candle whose full pass completed (None = run one now)
+    stop_event = stop_event or threading.Event()
+    poll_cadence = forming_candle_cadence(timeframe)
+    processed_candle = None
+    print(f"Refreshing the forming {timeframe} candle every {poll_cadence:g}s, full history merge after each candle close", flush=True)
+    
+    while not stop_event.is_set() and status["active"] and status.get("mode") == "automatic":
         loop_count += 1
         print(f"[Thread {thread_id}] Loop iteration #{loop_count}", flush=True)
         
         # Check if future_symbol changed (user restarted with different symbol)
-        current_future_symbol = fetching_status.get("future_symbol")
+        current_future_symbol = status.get("future_symbol")
         if current_future_symbol and current_future_symbol != initial_future_symbol:
             print(f"[Thread {thread_id}] Future symbol changed from {initial_future_symbol} to {current_future_symbol}. Stopping old thread.", flush=True)
             break
         
         # Debug: Print loop status
-        print(f"[Thread {thread_id}] Loop check: active={fetching_status.get('active')}, mode={fetching_status.get('mode')}, future_symbol={fetching_status.get('future_symbol')}", flush=True)
+        print(f"[Thread {thread_id}] Loop check: active={status.get('active')}, mode={status.get('mode')}, future_symbol={status.get('future_symbol')}", flush=True)
         print(f"[Thread {thread_id}] Entering try block...", flush=True)
         import sys
         sys.stdout.flush()  # Force flush
@@ -1695,29 +2521,34 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
             market_open = is_market_open(symbol=future_symbol, exchange=exchange)
             print(f"Market check for {exchange}: {'OPEN' if market_open else 'CLOSED'}", flush=True)
             if not market_open:
-                print(f"Market is closed for {exchange}. Waiting 60 seconds before checking again...")
-                time.sleep(60)  # Wait 60 seconds before checking again
+                # Sleep until the next session opens (stop_fetching wakes it)
+                if not wait_for_market_open(exchange, stop_event):
+                    break
                 continue
             
             iteration += 1
             print(f"\n=== Automatic Mode Iteration {iteration} ===", flush=True)
-            print(f"Fetch status: active={fetching_status.get('active')}, mode={fetching_status.get('mode')}", flush=True)
+            print(f"Fetch status: active={status.get('active')}, mode={status.get('mode')}", flush=True)
             
             # Check if fyers is available
             if FyresIntegration.fyers is None:
                 print("ERROR: Fyers not initialized. Waiting...", flush=True)
                 add_log('WARNING', 'Fyers not initialized in fetch loop', {'iteration': iteration})
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
             
             print(f"Fyers is initialized, proceeding with data fetch...", flush=True)
             
             # Get future LTP
             print(f"Fetching LTP for {future_symbol}...", flush=True)
-            future_ltp = get_future_ltp(future_symbol)
+            future_ltp = get_future_ltp(future_symbol, stop_event=stop_event)
+            if stop_event.is_set():
+                break
             if future_ltp is None:
                 print(f"Could not fetch LTP for {future_symbol}. Retrying in 5 seconds...", flush=True)
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
             
             print(f"Future LTP: {future_ltp}", flush=True)
@@ -1725,204 +2556,321 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
             # Calculate ATM strike
             # Use the strike_distance passed to the function (from user input or defaults)
             # strike_distance is already set from the function parameter, no need to recalculate
-            atm_strike = calculate_atm_strike(future_ltp, strike_distance)
+            dwell_seconds = time.monotonic() - strike_since
+            atm_strike, suppressed = decide_atm_roll(future_ltp, current_strike, previous_atm, dwell_seconds,
+                                                     strike_distance, atm_hysteresis, atm_min_dwell)
             if atm_strike is None:
                 print(f"Could not calculate ATM strike. Retrying in 5 seconds...")
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
+            previous_atm = calculate_atm_strike(future_ltp, strike_distance)
             
-            print(f"ATM Strike: {atm_strike}")
+            if suppressed:
+                # Plain rounding just moved to another strike; the band or the dwell keeps the current one
+                suppressed_rolls += 1
+                print(f"ATM roll {current_strike} -> {previous_atm} suppressed (dwell {dwell_seconds:.0f}s, min {atm_min_dwell}s, band {atm_hysteresis})")
+            elif current_strike is not None and atm_strike != current_strike:
+                # ATM roll: the new strike owns the continuous series from the start of the current candle
+                roll_time = pd.Timestamp(get_ist_now()).floor(f"{timeframe_to_seconds(timeframe)}s").to_pydatetime()
+                print(f"ATM roll: {current_strike} -> {atm_strike} at {roll_time}", flush=True)
+                pending_roll = {
+                    'from_strike': current_strike,
+                    'to_strike': atm_strike,
+                    'roll_time': roll_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'future_ltp': future_ltp,
+                    'dwell_seconds': round(dwell_seconds, 1),
+                    'suppressed_rolls': suppressed_rolls,
+                    'started': time.monotonic()
+                }
+                segment_start = roll_time
+                strike_since = time.monotonic()
+                suppressed_rolls = 0
+            current_strike = atm_strike
             
-            # Generate option symbol using OPTION expiry date (from web input, not future expiry)
+            print(f"ATM Strike: {atm_strike}")
+            
+            # Full pass once per candle close (and on a roll): history from the segment start, saved to storage.
+            # Otherwise only refresh the forming candle in memory from a short history window.
+            candle_key = closed_candle_key(timeframe, exchange)
+            full_pass = candle_key != processed_candle or pending_roll is not None
+            if full_pass:
+                fetch_from, merge_from = segment_start, segment_start
+            else:
+                fetch_from, merge_from = forming_fetch_window(candle_key, timeframe, (iv_data_store.get(continuous_symbol) or {}).get('timestamps'),
+                                                              segment_start)
+            
+            # Generate option symbol(s) using OPTION expiry date (from web input, not future expiry)
             # future_symbol already has the correct future expiry from SymbolSetting.csv
             # expiry_date parameter is the OPTION expiry date from web input
-            symbol = generate_option_symbol(underlying, expiry_date, atm_strike, option_type, expiry_type, is_mcx=is_mcx)
-            if not symbol:
+            leg_symbols = {}
+            for leg_type in leg_types:
+                leg_symbols[leg_type] = generate_option_symbol(underlying, expiry_date, atm_strike, leg_type, expiry_type, is_mcx=is_mcx)
+            if not all(leg_symbols.values()):
                 print(f"Could not generate option symbol. Retrying in 5 seconds...")
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
             
-            print(f"Generated Option Symbol: {symbol}")
+            symbol = leg_symbols[leg_types[0]]
+            print(f"Generated Option Symbol: {', '.join(leg_symbols.values())}")
             
             # Update fetching status with current symbol (this is what the frontend polls)
             # Only update if we're still fetching the same future_symbol and mode (avoid race conditions)
-            current_future_symbol = fetching_status.get("future_symbol")
-            current_mode = fetching_status.get("mode")
+            current_future_symbol = status.get("future_symbol")
+            current_mode = status.get("mode")
             if current_future_symbol == future_symbol and current_mode == "automatic":
-                fetching_status["symbol"] = symbol
-                fetching_status["strike"] = atm_strike
-                print(f"Updated fetching_status.symbol to: {symbol}")
+                status["symbol"] = symbol
+                status["strike"] = atm_strike
+                status["future_ltp"] = future_ltp
+                if paired:
+                    status["leg_symbols"] = leg_symbols
+                print(f"Updated status.symbol to: {symbol}")
             else:
                 print(f"Future symbol or mode changed, stopping thread. Current future_symbol: {current_future_symbol}, Expected: {future_symbol}, Mode: {current_mode}")
                 break
             
-            # Fetch historical data for the option symbol
-            print(f"Fetching option data for: {symbol}")
-            df = safe_fetch_ohlc(symbol, timeframe)
+            # Forward for the IV calculation, shared by all legs:
+            # - parity: fetch the CE and PE histories first and imply the forward from them
+            # - paired: fetch the future history once and share it between the CE and PE legs
+            df_future_shared = None
+            prefetched_legs = {}
+            history_calls = 0
+            if forward_source == 'parity':
+                # Both legs in one concurrent batch
+                parity_symbols = {}
+                for parity_type in ('c', 'p'):
+                    parity_symbols[parity_type] = leg_symbols.get(parity_type) or generate_option_symbol(underlying, expiry_date, atm_strike, parity_type, expiry_type, is_mcx=is_mcx)
+                    print(f"Fetching option data for parity forward: {parity_symbols[parity_type]} (from: {fetch_from if fetch_from else 'full history'})")
+                frames = safe_fetch_ohlc_many([(s, timeframe, fetch_from) for s in parity_symbols.values()], stop_event=stop_event)
+                prefetched_legs = dict(zip(parity_symbols, frames))
+                history_calls += len(frames)
+                if stop_event.is_set():
+                    break
+                df_future_shared, future_fetched = get_parity_forward(
+                    prefetched_legs['c'], prefetched_legs['p'], atm_strike, expiry_date, risk_free_rate,
+                    future_symbol, timeframe, range_from=fetch_from, stop_event=stop_event
+                )
+                history_calls += int(future_fetched)
+            elif paired:
+                # Shared future and both legs in one concurrent batch
+                print(f"Fetching shared future data for: {future_symbol} and option data for: {', '.join(leg_symbols.values())} (from: {fetch_from if fetch_from else 'full history'})")
+                frames = safe_fetch_ohlc_many([(s, timeframe, fetch_from) for s in [future_symbol, *leg_symbols.values()]], stop_event=stop_event)
+                df_future_shared = frames[0]
+                prefetched_legs = dict(zip(leg_symbols, frames[1:]))
+                history_calls += len(frames)
+            if stop_event.is_set():
+                break  # Cancelled during the forward fetch - do not touch the store
+            if df_future_shared is not None and len(df_future_shared) == 0:
+                df_future_shared = None
+            if df_future_shared is None and (paired or forward_source == 'parity'):
+                print(f"⚠ No shared forward data, each leg will fetch the future separately")
             
-            if df is None or len(df) == 0:
-                error_msg = f"Failed to fetch data for {symbol}"
-                print(f"❌ {error_msg}. Retrying in 5 seconds...")
-                add_log('WARNING', error_msg, {'symbol': symbol, 'iteration': iteration, 'action': 'retrying'})
+            leg_frames = {}
+            leg_rows_applied = {}
+            leg_failed = False
+            option_rows_fetched = 0
+            for leg_type, symbol in leg_symbols.items():
+                # Fetch historical data for the option symbol (already fetched in parity mode)
+                if leg_type in prefetched_legs:
+                    df = prefetched_legs[leg_type]
+                else:
+                    print(f"Fetching option data for: {symbol} (from: {fetch_from if fetch_from else 'full history'})")
+                    df = safe_fetch_ohlc(symbol, timeframe, range_from=fetch_from, stop_event=stop_event)
+                    history_calls += 1
+                if stop_event.is_set():
+                    break
+                
+                if df is None or len(df) == 0:
+                    error_msg = f"Failed to fetch data for {symbol}"
+                    print(f"❌ {error_msg}. Retrying in 5 seconds...")
+                    add_log('WARNING', error_msg, {'symbol': symbol, 'iteration': iteration, 'action': 'retrying'})
+                    
+                    # Even if fetch failed, try to load existing CSV data for this symbol
+                    # This ensures chart can display historical data even if current fetch fails
+                    try:
+                        print(f"  Attempting to load existing IV history for {symbol}...")
+                        df_csv = load_iv_history(symbol)
+                        if df_csv is not None:
+                            with store_write_lock:
+                                if stop_event.is_set():
+                                    break
+                                store_iv_data(symbol, df_csv)  # Show all rows, no limit
+                            print(f"  ✓ Loaded {len(df_csv)} data points from stored history for {symbol}")
+                    except Exception as e:
+                        print(f"  Could not load CSV data: {e}")
+                    
+                    leg_failed = True
+                    continue
+                
+                print(f"✓ Fetched {len(df)} candles for {symbol}")
+                option_rows_fetched += len(df)
                 
-                # Even if fetch failed, try to load existing CSV data for this symbol
-                # This ensures chart can display historical data even if current fetch fails
+                # Calculate IV - pass the correct future_symbol from SymbolSetting.csv
+                # Option expiry is used for time_to_expiry calculation
+                print(f"Starting IV calculation for {symbol} with future_symbol={future_symbol}...")
                 try:
-                    safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-                    safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-                    filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
-                    if os.path.exists(filename):
-                        print(f"  Attempting to load existing CSV data for {symbol}...")
-                        df_csv = pd.read_csv(filename)
-                        if 'date' in df_csv.columns and 'iv' in df_csv.columns:
-                            df_csv['date'] = pd.to_datetime(df_csv['date'])
-                            if df_csv['date'].dt.tz is None:
-                                df_csv['date'] = df_csv['date'].dt.tz_localize('Asia/Kolkata')
-                            else:
-                                df_csv['date'] = df_csv['date'].dt.tz_convert('Asia/Kolkata')
-                            df_csv = df_csv.sort_values('date')
-                            df_chart_csv = df_csv  # Show all rows, no limit
-                            timestamps_csv = df_chart_csv['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                            iv_values_csv = df_chart_csv['iv'].fillna(0).tolist()
-                            iv_data_store[symbol] = {
-                                "timestamps": timestamps_csv,
-                                "iv_values": iv_values_csv,
-                                "close_prices": df_chart_csv['close'].tolist() if 'close' in df_chart_csv.columns else [],
-                                "fclose_prices": df_chart_csv['fclose'].tolist() if 'fclose' in df_chart_csv.columns else [],
-                                "last_update": datetime.now().isoformat()
-                            }
-                            print(f"  ✓ Loaded {len(timestamps_csv)} data points from CSV for {symbol}")
+                    df_with_iv = calculate_iv(
+                        df.copy(),
+                        window=20,
+                        timeframe=timeframe,
+                        symbol=symbol,
+                        risk_free_rate=risk_free_rate,
+                        manual_strike=atm_strike,
+                        manual_expiry=expiry_date.isoformat(),  # Option expiry (used for option symbol and time_to_expiry calculation)
+                        manual_option_type=leg_type,
+                        manual_future_symbol=future_symbol,  # Pass the correct future symbol from SymbolSetting.csv
+                        history_from=fetch_from,  # Only the future history the current segment (or forming candle) needs
+                        future_df=df_future_shared,  # Paired/parity mode: all legs reuse one forward series
+                        time_basis=time_basis,
+                        stop_event=stop_event
+                    )
+                    if df_future_shared is None:
+                        history_calls += 1  # calculate_iv fetched the future history itself
+                    print(f"IV calculation completed. Result: {'None' if df_with_iv is None else f'{len(df_with_iv)} rows'}")
                 except Exception as e:
-                    print(f"  Could not load CSV data: {e}")
+                    error_msg = f"Exception during IV calculation for {symbol}: {str(e)}"
+                    print(f"❌ {error_msg}")
+                    import traceback
+                    traceback.print_exc()
+                    add_log('ERROR', error_msg, {
+                        'symbol': symbol,
+                        'future_symbol': future_symbol,
+                        'error': str(e),
+                        'traceback': traceback.format_exc()
+                    })
+                    df_with_iv = None
+                if stop_event.is_set():
+                    break  # Cancelled while calculate_iv fetched the future history
                 
-                time.sleep(5)
-                continue
+                if df_with_iv is not None and 'iv' in df_with_iv.columns:
+                    print(f"✓ IV calculation successful for {symbol}: {len(df_with_iv)} rows with IV data")
+                    
+                    # Ensure dates are in IST timezone before formatting
+                    if df_with_iv['date'].dt.tz is None:
+                        df_with_iv['date'] = df_with_iv['date'].dt.tz_localize('Asia/Kolkata')
+                    else:
+                        df_with_iv['date'] = df_with_iv['date'].dt.tz_convert('Asia/Kolkata')
+                    
+                    df_with_iv = df_with_iv.sort_values('date')
+                    
+                    with store_write_lock:
+                        if stop_event.is_set():
+                            break  # Cancelled after the last fetch - the next tracker may already have cleared the store
+                        if full_pass:
+                            # Save this strike's IV to its own CSV file (merged with any earlier history on disk)
+                            save_iv_to_csv(
+                                symbol=symbol,
+                                df_with_iv=df_with_iv,
+                                timeframe=timeframe,
+                                strike=atm_strike,
+                                expiry=expiry_date.isoformat(),
+                                option_type=leg_type
+                            )
+                            # The chart reads the continuous series; the per-strike history lives in its CSV
+                            # (in memory it would only hold the partial segment fetched since the roll)
+                            drop_iv_data(symbol)
+                        
+                        # Stitch the current strike's segment (or the refreshed forming candle) into this leg's continuous ATM series
+                        leg_rows = stitch_continuous_atm(leg_continuous_symbols[leg_type], df_with_iv, segment_start=merge_from,
+                                                         timeframe=timeframe, persist=full_pass)
+                    print(f"✓ Stitched {leg_rows} rows of {symbol} into {leg_continuous_symbols[leg_type]}")
+                    leg_frames[leg_type] = df_with_iv
+                    leg_rows_applied[leg_type] = leg_rows
+                else:
+                    error_msg = f"Could not calculate IV for {symbol}"
+                    if df_with_iv is None:
+                        error_msg += " - calculate_iv returned None"
+                    elif 'iv' not in df_with_iv.columns:
+                        error_msg += f" - dataframe missing 'iv' column. Available columns: {list(df_with_iv.columns)}"
+                    print(f"❌ {error_msg}")
+                    leg_failed = True
+                    add_log('ERROR', error_msg, {
+                        'symbol': symbol,
+                        'df_is_none': df_with_iv is None,
+                        'columns': list(df_with_iv.columns) if df_with_iv is not None else None
+                    })
+                    
+                    # Even if IV calculation failed, try to store the raw data for debugging
+                    if df_with_iv is not None and len(df_with_iv) > 0:
+                        print(f"  Attempting to store raw data even without IV column...")
+                        try:
+                            if df_with_iv['date'].dt.tz is None:
+                                df_with_iv['date'] = df_with_iv['date'].dt.tz_localize('Asia/Kolkata')
+                            else:
+                                df_with_iv['date'] = df_with_iv['date'].dt.tz_convert('Asia/Kolkata')
+                            
+                            timestamps_for_chart = df_with_iv['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
+                            # Create zero IV values as placeholder
+                            iv_values_for_chart = [0] * len(timestamps_for_chart)
+                            
+                            with store_write_lock:
+                                if stop_event.is_set():
+                                    break
+                                set_iv_data(symbol, {
+                                    "timestamps": timestamps_for_chart,
+                                    "iv_values": iv_values_for_chart,
+                                    "close_prices": df_with_iv['close'].tolist() if 'close' in df_with_iv.columns else [],
+                                    "fclose_prices": df_with_iv['fclose'].tolist() if 'fclose' in df_with_iv.columns else [],
+                                    "last_update": datetime.now().isoformat()
+                                })
+                            print(f"  ✓ Stored raw data (without IV) for debugging: {symbol}")
+                        except Exception as e:
+                            print(f"  ❌ Failed to store raw data: {e}")
             
-            print(f"✓ Fetched {len(df)} candles for {symbol}")
+            if stop_event.is_set():
+                break  # The leg loop was cancelled part-way
             
-            # Calculate IV - pass the correct future_symbol from SymbolSetting.csv
-            # Option expiry is used for time_to_expiry calculation
-            print(f"Starting IV calculation for {symbol} with future_symbol={future_symbol}...")
-            try:
-                df_with_iv = calculate_iv(
-                    df.copy(),
-                    window=20,
-                    timeframe=timeframe,
-                    symbol=symbol,
-                    risk_free_rate=risk_free_rate,
-                    manual_strike=atm_strike,
-                    manual_expiry=expiry_date.isoformat(),  # Option expiry (used for option symbol and time_to_expiry calculation)
-                    manual_option_type=option_type,
-                    manual_future_symbol=future_symbol  # Pass the correct future symbol from SymbolSetting.csv
-                )
-                print(f"IV calculation completed. Result: {'None' if df_with_iv is None else f'{len(df_with_iv)} rows'}")
-            except Exception as e:
-                error_msg = f"Exception during IV calculation for {symbol}: {str(e)}"
-                print(f"❌ {error_msg}")
-                import traceback
-                traceback.print_exc()
-                add_log('ERROR', error_msg, {
-                    'symbol': symbol,
-                    'future_symbol': future_symbol,
-                    'error': str(e),
-                    'traceback': traceback.format_exc()
-                })
-                df_with_iv = None
+            if paired and len(leg_frames) == 2:
+                # Combine the legs into the straddle series: put-call averaged IV, straddle premium as close
+                df_straddle = build_straddle_iv(leg_frames['c'], leg_frames['p'])
+                with store_write_lock:
+                    if stop_event.is_set():
+                        break
+                    rows_applied = stitch_continuous_atm(continuous_symbol, df_straddle, segment_start=merge_from,
+                                                         timeframe=timeframe, persist=full_pass)
+            elif not paired and leg_frames:
+                rows_applied = leg_rows_applied[option_type]
+            else:
+                rows_applied = None
             
-            if df_with_iv is not None and 'iv' in df_with_iv.columns:
-                print(f"✓ IV calculation successful for {symbol}: {len(df_with_iv)} rows with IV data")
-                
-                # Ensure dates are in IST timezone before formatting
-                if df_with_iv['date'].dt.tz is None:
-                    df_with_iv['date'] = df_with_iv['date'].dt.tz_localize('Asia/Kolkata')
-                else:
-                    df_with_iv['date'] = df_with_iv['date'].dt.tz_convert('Asia/Kolkata')
+            if rows_applied is not None:
+                continuous_data = iv_data_store.get(continuous_symbol, {})
                 
-                # Sort by date and get latest 500 records for chart display
-                df_with_iv = df_with_iv.sort_values('date')
-                df_chart = df_with_iv  # Show all rows, no limit
-                
-                # Format timestamps with IST timezone info (+05:30) - only latest 500
-                timestamps_for_chart = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                iv_values_for_chart = df_chart['iv'].fillna(0).tolist()
-                
-                # Store IV data with timestamps - only latest 500 records for chart
-                iv_data_store[symbol] = {
-                    "timestamps": timestamps_for_chart,
-                    "iv_values": iv_values_for_chart,
-                    "close_prices": df_chart['close'].tolist(),
-                    "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
-                    "last_update": datetime.now().isoformat()
-                }
-                
-                print(f"✓ Stored IV data in iv_data_store for symbol: {symbol} ({len(timestamps_for_chart)} data points - all records)")
-                print(f"  Debug: iv_data_store keys = {list(iv_data_store.keys())}")
-                print(f"  Debug: Current fetching_status.symbol = {fetching_status.get('symbol')}")
-                print(f"  Debug: Data stored with {len(timestamps_for_chart)} timestamps and {len(iv_values_for_chart)} IV values")
-                
-                # Verify data is actually stored and accessible
-                if symbol in iv_data_store:
-                    stored_data = iv_data_store[symbol]
-                    print(f"  ✓ Verification: Data accessible in iv_data_store with {len(stored_data.get('timestamps', []))} timestamps")
-                else:
-                    print(f"  ❌ ERROR: Data was not stored correctly in iv_data_store!")
+                if pending_roll is not None:
+                    # Log the roll with what it cost: history calls, candles fetched and wall time
+                    roll_cost = {
+                        'continuous_symbol': continuous_symbol,
+                        'option_symbol': ', '.join(leg_symbols.values()),
+                        'history_calls': history_calls,  # Option + future histories fetched for the new segment
+                        'option_rows_fetched': option_rows_fetched,
+                        'rows_stitched': rows_applied,
+                        'cost_seconds': round(time.monotonic() - pending_roll.pop('started'), 2)
+                    }
+                    roll_cost.update(pending_roll)
+                    add_log('INFO', f"ATM strike rolled from {roll_cost['from_strike']} to {roll_cost['to_strike']}", roll_cost)
+                    pending_roll = None
+                iv_values_for_chart = continuous_data.get('iv_values', [])
+                print(f"✓ {continuous_symbol}: {rows_applied} rows applied ({len(iv_values_for_chart)} data points - all records)")
                 
                 # Log IV statistics
                 non_zero_ivs = [iv for iv in iv_values_for_chart if iv > 0]
                 if non_zero_ivs:
                     print(f"IV data stored: {len(non_zero_ivs)} non-zero values (range: {min(non_zero_ivs):.2f}% - {max(non_zero_ivs):.2f}%)")
                 else:
-                    print(f"⚠ Warning: All IV values are zero/NaN for {symbol}, but data is stored for display")
-                
-                # Save IV calculation to CSV file
-                save_iv_to_csv(
-                    symbol=symbol,
-                    df_with_iv=df_with_iv,
-                    timeframe=timeframe,
-                    strike=atm_strike,
-                    expiry=expiry_date.isoformat(),
-                    option_type=option_type
-                )
-            else:
-                error_msg = f"Could not calculate IV for {symbol}"
-                if df_with_iv is None:
-                    error_msg += " - calculate_iv returned None"
-                elif 'iv' not in df_with_iv.columns:
-                    error_msg += f" - dataframe missing 'iv' column. Available columns: {list(df_with_iv.columns)}"
-                print(f"❌ {error_msg}")
-                add_log('ERROR', error_msg, {
-                    'symbol': symbol,
-                    'df_is_none': df_with_iv is None,
-                    'columns': list(df_with_iv.columns) if df_with_iv is not None else None
-                })
-                
-                # Even if IV calculation failed, try to store the raw data for debugging
-                if df_with_iv is not None and len(df_with_iv) > 0:
-                    print(f"  Attempting to store raw data even without IV column...")
-                    try:
-                        if df_with_iv['date'].dt.tz is None:
-                            df_with_iv['date'] = df_with_iv['date'].dt.tz_localize('Asia/Kolkata')
-                        else:
-                            df_with_iv['date'] = df_with_iv['date'].dt.tz_convert('Asia/Kolkata')
-                        
-                        timestamps_for_chart = df_with_iv['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                        # Create zero IV values as placeholder
-                        iv_values_for_chart = [0] * len(timestamps_for_chart)
-                        
-                        iv_data_store[symbol] = {
-                            "timestamps": timestamps_for_chart,
-                            "iv_values": iv_values_for_chart,
-                            "close_prices": df_with_iv['close'].tolist() if 'close' in df_with_iv.columns else [],
-                            "fclose_prices": df_with_iv['fclose'].tolist() if 'fclose' in df_with_iv.columns else [],
-                            "last_update": datetime.now().isoformat()
-                        }
-                        print(f"  ✓ Stored raw data (without IV) for debugging: {symbol}")
-                    except Exception as e:
-                        print(f"  ❌ Failed to store raw data: {e}")
+                    print(f"⚠ Warning: All IV values are zero/NaN for {continuous_symbol}, but data is stored for display")
             
-            # Wait 1 second before next iteration
-            print(f"Waiting 1 second before next update...")
-            time.sleep(1)
+            if leg_failed:
+                print(f"Retrying failed leg(s) in 5 seconds...")
+                if stop_event.wait(5):
+                    break
+                continue
+            if full_pass:
+                processed_candle = candle_key
+            
+            # Sleep until the next forming-candle refresh, or until just after the candle closes (stop wakes it)
+            if stop_event.wait(seconds_until_next_poll(timeframe, exchange, poll_cadence)):
+                break
             
         except Exception as e:
             error_msg = f"Error in automatic fetch loop: {str(e)}"
@@ -1939,31 +2887,52 @@ def fetch_data_loop_automatic(future_symbol, expiry_date, expiry_type, option_ty
             import traceback
             traceback.print_exc()
             print(f"  Waiting 5 seconds before retrying...")
-            time.sleep(5)  # Wait before retrying on error
+            if stop_event.wait(5):  # Wait before retrying on error
+                break
 
-def fetch_data_loop(symbol, timeframe, manual_strike=None, manual_expiry=None, manual_option_type=None, manual_future_symbol=None, risk_free_rate=0.07):
+def fetch_data_loop(symbol, timeframe, manual_strike=None, manual_expiry=None, manual_option_type=None, manual_future_symbol=None, risk_free_rate=0.07, time_basis='calendar', stop_event=None):
     """
     Continuously fetch historical data and calculate IV
-    Only fetches data during market hours (NSE: 9:15-15:30, MCX: 9:00-23:30)
+    Only fetches data during market hours (NSE: 9:15-15:30, MCX: 9:00-23:30); while the market is closed the loop
+    sleeps until the next session opens, or until stop_event is set
+    Polling is aligned to the timeframe's candles: the full history is fetched and saved once per candle close,
+    and the forming candle is refreshed in memory every forming_candle_cadence seconds in between
     """
     global iv_data_store, fetching_status
     
-    while fetching_status["active"] and fetching_status["symbol"] == symbol and fetching_status["timeframe"] == timeframe:
+    stop_event = stop_event or threading.Event()
+    exchange = market_exchange(symbol)
+    poll_cadence = forming_candle_cadence(timeframe)
+    processed_candle = None  # Start of the last candle whose full pass completed
+    
+    while not stop_event.is_set() and fetching_status["active"] and fetching_status["symbol"] == symbol and fetching_status["timeframe"] == timeframe:
         try:
             # Check if market is open before fetching data
             if not is_market_open(symbol=symbol):
-                print(f"Market is closed for {symbol}. Waiting 60 seconds before checking again...")
-                time.sleep(60)  # Wait 60 seconds before checking again
+                # Sleep until the next session opens (stop_fetching wakes it)
+                if not wait_for_market_open(market_exchange(symbol), stop_event):
+                    break
                 continue
             
             # Check if fyers is available
             if FyresIntegration.fyers is None:
                 print("Fyers not initialized. Waiting...")
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
             
+            # Full history once per candle close, otherwise the forming candle and the one before it (plus warm-up rows)
+            candle_key = closed_candle_key(timeframe, exchange)
+            full_pass = candle_key != processed_candle or symbol not in iv_data_store
+            if full_pass:
+                fetch_from, merge_from = None, None
+            else:
+                fetch_from, merge_from = forming_fetch_window(candle_key, timeframe, iv_data_store[symbol].get('timestamps'))
+            
             # Fetch historical data using safe wrapper
-            df = safe_fetch_ohlc(symbol, timeframe)
+            df = safe_fetch_ohlc(symbol, timeframe, range_from=fetch_from, stop_event=stop_event)
+            if stop_event.is_set():
+                break
             
             if df is None:
                 error_msg = f"Failed to fetch data for {symbol}"
@@ -1977,7 +2946,8 @@ def fetch_data_loop(symbol, timeframe, manual_strike=None, manual_expiry=None, m
                     'timeframe': timeframe,
                     'possible_reasons': ['Invalid symbol format', 'Insufficient historical data', 'API rate limiting', 'Symbol not supported']
                 })
-                time.sleep(5)
+                if stop_event.wait(5):
+                    break
                 continue
             
             if df is not None and len(df) > 0:
@@ -1998,8 +2968,13 @@ def fetch_data_loop(symbol, timeframe, manual_strike=None, manual_expiry=None, m
                         manual_strike=manual_strike,
                         manual_expiry=manual_expiry,
                         manual_option_type=manual_option_type,
-                        manual_future_symbol=manual_future_symbol  # Use the future symbol selected by user from dropdown
+                        manual_future_symbol=manual_future_symbol,  # Use the future symbol selected by user from dropdown
+                        history_from=fetch_from,
+                        time_basis=time_basis,
+                        stop_event=stop_event
                     )
+                    if stop_event.is_set():
+                        break  # Stopped while the future history was fetched - leave the store alone
                     
                     if df_with_iv is not None and 'iv' in df_with_iv.columns:
                         # Ensure dates are in IST timezone before formatting
@@ -2012,48 +2987,59 @@ def fetch_data_loop(symbol, timeframe, manual_strike=None, manual_expiry=None, m
                         df_with_iv = df_with_iv.sort_values('date')
                         df_chart = df_with_iv  # Show all rows, no limit
                         
-                        # Format timestamps with IST timezone info (+05:30) - only latest 500
-                        timestamps_for_chart = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                        iv_values_for_chart = df_chart['iv'].fillna(0).tolist()
-                        
-                        # Store IV data with timestamps - all records for chart
-                        iv_data_store[symbol] = {
-                            "timestamps": timestamps_for_chart,
-                            "iv_values": iv_values_for_chart,
-                            "close_prices": df_chart['close'].tolist(),
-                            "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
-                            "last_update": datetime.now().isoformat()
-                        }
-                        
-                        # Log IV statistics
-                        non_zero_ivs = [iv for iv in iv_values_for_chart if iv > 0]
-                        if non_zero_ivs:
-                            print(f"IV data stored: {len(non_zero_ivs)} non-zero values (range: {min(non_zero_ivs):.2f}% - {max(non_zero_ivs):.2f}%) - all records")
-                        else:
-                            print(f"Warning: All IV values are zero for {symbol}")
-                        
-                        # Save IV calculation to CSV file
-                        save_iv_to_csv(
-                            symbol=symbol,
-                            df_with_iv=df_with_iv,
-                            timeframe=timeframe,
-                            strike=manual_strike,
-                            expiry=manual_expiry,
-                            option_type=manual_option_type
-                        )
+                        with store_write_lock:
+                            if stop_event.is_set():
+                                break  # Cancelled after the last fetch - the next tracker may already have cleared the store
+                            if not full_pass:
+                                # Forming candle: update the in-memory tail only (saved by the next full pass); the
+                                # warm-up rows before merge_from were only fetched for the rolling windows
+                                merge_iv_tail(symbol, df_chart[df_chart['date'].dt.tz_localize(None) >= pd.Timestamp(merge_from)])
+                            else:
+                                # Format timestamps with IST timezone info (+05:30) - only latest 500
+                                timestamps_for_chart = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
+                                iv_values_for_chart = df_chart['iv'].fillna(0).tolist()
+                            
+                                # Store IV data with timestamps - all records for chart
+                                set_iv_data(symbol, {
+                                    "timestamps": timestamps_for_chart,
+                                    "iv_values": iv_values_for_chart,
+                                    "close_prices": df_chart['close'].tolist(),
+                                    "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
+                                    "last_update": datetime.now().isoformat()
+                                })
+                            
+                                # Log IV statistics
+                                non_zero_ivs = [iv for iv in iv_values_for_chart if iv > 0]
+                                if non_zero_ivs:
+                                    print(f"IV data stored: {len(non_zero_ivs)} non-zero values (range: {min(non_zero_ivs):.2f}% - {max(non_zero_ivs):.2f}%) - all records")
+                                else:
+                                    print(f"Warning: All IV values are zero for {symbol}")
+                            
+                                # Save IV calculation to CSV file
+                                save_iv_to_csv(
+                                    symbol=symbol,
+                                    df_with_iv=df_with_iv,
+                                    timeframe=timeframe,
+                                    strike=manual_strike,
+                                    expiry=manual_expiry,
+                                    option_type=manual_option_type
+                                )
+                                processed_candle = candle_key
                 except Exception as e:
                     print(f"Error calculating IV for {symbol}: {e}")
             else:
                 print(f"No data received for {symbol}. Retrying...")
             
-            # Wait before next fetch (adjust interval as needed)
-            time.sleep(1)  # Fetch every 1 second
+            # Sleep until the next forming-candle refresh, or until just after the candle closes (stop wakes it)
+            if stop_event.wait(seconds_until_next_poll(timeframe, exchange, poll_cadence)):
+                break
             
         except Exception as e:
             print(f"Unexpected error in fetch loop: {e}")
             import traceback
             traceback.print_exc()
-            time.sleep(1)  # Wait 1 second before retrying on error
+            if stop_event.wait(1):  # Wait 1 second before retrying on error
+                break
 
 @app.route('/')
 def index():
@@ -2167,7 +3153,10 @@ def check_login():
 @app.route('/api/start_fetching', methods=['POST'])
 def start_fetching():
     """Start fetching historical data and calculating IV"""
-    global fetching_status, iv_data_store, fetch_thread, fetch_lock
+    global fetching_status, iv_data_store, fetch_thread, fetch_lock, fetch_cancel_token
+    
+    if VIEWER_ONLY:
+        return attach_to_collector(request.json or {})
     
     # Acquire lock to prevent race conditions
     if not fetch_lock.acquire(blocking=False):
@@ -2196,6 +3185,12 @@ def start_fetching():
         except (ValueError, TypeError):
             return jsonify({"success": False, "message": "Invalid risk-free rate format"}), 400
         
+        # Time-to-expiry basis for IV: 'calendar' (365-day year) or 'trading' (session minutes, holidays excluded)
+        time_basis = str(data.get('time_basis', 'calendar')).lower()
+        if time_basis not in TIME_BASES:
+            fetch_lock.release()
+            return jsonify({"success": False, "message": f"Time basis must be one of: {', '.join(TIME_BASES)}"}), 400
+        
         if not FyresIntegration.fyers:
             return jsonify({"success": False, "message": "Please login first"}), 401
         
@@ -2209,46 +3204,37 @@ def start_fetching():
             old_mode = fetching_status.get("mode")
             print(f"Stopping previous fetch: symbol={old_symbol}, mode={old_mode}")
             
-            # Stop the thread
+            # Cancel the old loop - no join: it exits on its own after any in-flight API call,
+            # and the new loop waits for it on the web tracker lock
             fetching_status["active"] = False
             fetching_status["mode"] = None
-            
-            # Wait for thread to finish (with timeout)
-            if fetch_thread is not None and fetch_thread.is_alive():
-                print(f"Waiting for thread {fetch_thread.ident} to stop...")
-                fetch_thread.join(timeout=3)  # Wait up to 3 seconds
-                if fetch_thread.is_alive():
-                    print(f"Warning: Thread {fetch_thread.ident} did not stop within timeout, but continuing...")
-                else:
-                    print(f"Thread {fetch_thread.ident} stopped successfully")
-            
-            fetch_thread = None
-            print("Previous fetch stopped")
-        
-        # Clear in-memory data (CSV files preserved)
-        iv_data_store.clear()
+        with store_write_lock:
+            # Under the write lock: once the token is set the old loop writes nothing more, so the clear sticks
+            fetch_cancel_token.set()
+            # Clear in-memory data (CSV files preserved)
+            drop_iv_data()
+            continuous_atm_frames.clear()
+        if fetch_thread is not None and fetch_thread.is_alive():
+            print(f"Cancelled thread {fetch_thread.ident}")
+        fetch_thread = None
         print("Cleared in-memory data (CSV files preserved)")
         
-        # Small delay to ensure cleanup is complete
-        time.sleep(0.5)
+        # Cancellation token for the loop started below
+        fetch_cancel_token = threading.Event()
         
         # Helper function to load CSV data into iv_data_store if it exists
         def load_csv_to_store(symbol):
             """Load CSV data into iv_data_store if file exists"""
             try:
-                safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-                safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-                filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
+                print(f"Loading stored IV history for {symbol}...")
+                df = iv_storage.read(symbol)
                 
-                if not os.path.exists(filename):
-                    print(f"CSV file not found for {symbol}: {filename}")
+                if df is None:
+                    print(f"No stored IV history found for {symbol}")
                     return False
                 
-                print(f"Loading CSV data from {filename}...")
-                df = pd.read_csv(filename)
-                
                 if 'date' not in df.columns or 'iv' not in df.columns:
-                    print(f"CSV file missing required columns. Available: {list(df.columns)}")
+                    print(f"Stored history missing required columns. Available: {list(df.columns)}")
                     return False
                 
                 # Validate symbol matches (but be lenient - use the symbol from request)
@@ -2262,13 +3248,7 @@ def start_fetching():
                             print(f"Symbol mismatch: CSV has '{csv_symbol}' but requested '{symbol}'. Using requested symbol.")
                             # Continue anyway - use the requested symbol
                 
-                # Convert dates - preserve CSV timestamp exactly as-is
-                # CSV timestamps are already correct IST times, so we just parse and format them
-                df['date'] = pd.to_datetime(df['date'])
-                # Don't apply timezone conversion - CSV timestamps are already correct IST times
-                # Just format them with IST timezone indicator for frontend
-                df = df.sort_values('date')
-                
+                # Dates come back as naive IST times (sorted) - preserve them exactly as-is
                 # Format for chart - preserve exact CSV timestamp with IST timezone indicator
                 # Format as ISO string with IST timezone offset (+05:30) so JavaScript can parse it correctly
                 timestamps = df['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
@@ -2277,13 +3257,13 @@ def start_fetching():
                 fclose_prices = df['fclose'].tolist() if 'fclose' in df.columns else []
                 
                 # Store in iv_data_store
-                iv_data_store[symbol] = {
+                set_iv_data(symbol, {
                     "timestamps": timestamps,
                     "iv_values": iv_values,
                     "close_prices": close_prices,
                     "fclose_prices": fclose_prices,
                     "last_update": datetime.now().isoformat()
-                }
+                })
                 print(f"✓ Loaded CSV data into iv_data_store for {symbol}: {len(timestamps)} data points")
                 print(f"  IV range: {min([v for v in iv_values if v > 0]) if any(v > 0 for v in iv_values) else 0:.2f}% - {max(iv_values):.2f}%")
                 return True
@@ -2301,7 +3281,28 @@ def start_fetching():
             future_symbol = data.get('future_symbol')
             expiry_type = data.get('expiry_type', 'weekly')  # 'weekly' or 'monthly'
             expiry_date_str = data.get('expiry_date')  # This is OPTION expiry, not future expiry
-            option_type = data.get('option_type', 'c')  # 'c' for Call, 'p' for Put
+            option_type = data.get('option_type', 'c')  # 'c' for Call, 'p' for Put, 'cp' for paired CE+PE (straddle)
+            # Paired mode seeds with the call leg here; the loop adds the put leg and the straddle series
+            leg_option_type = 'c' if is_paired_option_type(option_type) else option_type
+            
+            # Forward source (optional): 'future' history or 'parity' (implied from the ATM CE/PE pair)
+            forward_source = str(data.get('forward_source', 'future')).lower()
+            if forward_source not in FORWARD_SOURCES:
+                fetch_lock.release()
+                return jsonify({"success": False, "message": f"Forward source must be one of: {', '.join(FORWARD_SOURCES)}"}), 400
+            
+            # ATM roll hysteresis (optional): band as a fraction of strike step, min dwell in seconds
+            try:
+                atm_hysteresis = float(data.get('atm_hysteresis', ATM_HYSTERESIS_BAND))
+                atm_min_dwell = float(data.get('atm_min_dwell', ATM_MIN_DWELL_SECONDS))
+                # isfinite: NaN passes the range checks, and a NaN band (or infinite dwell) would never roll
+                if not (math.isfinite(atm_hysteresis) and math.isfinite(atm_min_dwell)):
+                    raise ValueError
+                if atm_hysteresis < 0 or atm_hysteresis >= 0.5 or atm_min_dwell < 0:
+                    raise ValueError
+            except (ValueError, TypeError):
+                fetch_lock.release()
+                return jsonify({"success": False, "message": "ATM hysteresis must be between 0 and 0.5 and min dwell must be >= 0"}), 400
             
             print(f"[start_fetching] Automatic mode params: future_symbol={future_symbol}, expiry_date={expiry_date_str}, expiry_type={expiry_type}, option_type={option_type}")
             
@@ -2481,7 +3482,7 @@ def start_fetching():
             print(f"Generating option symbol: underlying={underlying}, expiry={option_expiry_date}, strike={atm_strike}, type={option_type}, expiry_type={expiry_type}, is_mcx={is_mcx}")
             # Debug: Print the underlying before generating symbol
             print(f"DEBUG: Underlying before symbol generation: '{underlying}' (type: {type(underlying)}, length: {len(underlying) if underlying else 0})")
-            symbol = generate_option_symbol(underlying, option_expiry_date, atm_strike, option_type, expiry_type, is_mcx=is_mcx)
+            symbol = generate_option_symbol(underlying, option_expiry_date, atm_strike, leg_option_type, expiry_type, is_mcx=is_mcx)
             print(f"DEBUG: Generated symbol: '{symbol}'")
             
             if not symbol:
@@ -2532,8 +3533,9 @@ def start_fetching():
                     risk_free_rate=risk_free_rate,
                     manual_strike=atm_strike,
                     manual_expiry=option_expiry_date.isoformat(),
-                    manual_option_type=option_type,
-                    manual_future_symbol=future_symbol
+                    manual_option_type=leg_option_type,
+                    manual_future_symbol=future_symbol,
+                    time_basis=time_basis
                 )
                 
                 if df_with_iv is None or 'iv' not in df_with_iv.columns:
@@ -2565,7 +3567,7 @@ def start_fetching():
                 timeframe=timeframe,
                 strike=atm_strike,
                 expiry=option_expiry_date.isoformat(),
-                option_type=option_type
+                option_type=leg_option_type
             )
             
             # STEP 6: Store in iv_data_store for chart display (all records)
@@ -2587,15 +3589,29 @@ def start_fetching():
             timestamps_for_chart = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
             iv_values_for_chart = df_chart['iv'].fillna(0).tolist()
             
-            iv_data_store[symbol] = {
+            set_iv_data(symbol, {
                 "timestamps": timestamps_for_chart,
                 "iv_values": iv_values_for_chart,
                 "close_prices": df_chart['close'].tolist(),
                 "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
                 "last_update": datetime.now().isoformat()
-            }
+            })
             
             print(f"✓ Stored {len(timestamps_for_chart)} data points in iv_data_store (all records)")
+            
+            # Seed the continuous ATM series with the initial strike (only rows after its last stored point)
+            # In paired mode the chart follows the straddle series and the call leg's series is seeded here
+            continuous_symbol = get_continuous_atm_symbol(underlying, option_expiry_date, option_type, is_mcx=is_mcx)
+            leg_continuous_symbol = get_continuous_atm_symbol(underlying, option_expiry_date, leg_option_type, is_mcx=is_mcx)
+            continuous_atm_frames.pop(continuous_symbol, None)  # Re-read from disk on a fresh start
+            continuous_atm_frames.pop(leg_continuous_symbol, None)
+            rows_applied = stitch_continuous_atm(
+                leg_continuous_symbol,
+                df_with_iv,
+                segment_start=get_continuous_atm_last_timestamp(leg_continuous_symbol),
+                timeframe=timeframe
+            )
+            print(f"✓ Continuous ATM series {leg_continuous_symbol}: stitched {rows_applied} rows from {symbol}")
             print(f"  Debug: iv_data_store keys after initial fetch: {list(iv_data_store.keys())}")
             print(f"  Debug: Symbol stored: {symbol}")
             print(f"  Debug: Data verification - timestamps: {len(timestamps_for_chart)}, IV values: {len(iv_values_for_chart)}")
@@ -2620,7 +3636,12 @@ def start_fetching():
                 "expiry_date": expiry_date_str,  # Option expiry from web input
                 "option_type": option_type,
                 "strike": atm_strike,
-                "expiry": option_expiry_date.isoformat()  # Option expiry from web input
+                "expiry": option_expiry_date.isoformat(),  # Option expiry from web input
+                "continuous_symbol": continuous_symbol,  # Stitched ATM series the chart follows across strike rolls
+                "atm_hysteresis": atm_hysteresis,
+                "atm_min_dwell": atm_min_dwell,
+                "forward_source": forward_source,
+                "time_basis": time_basis
             })
             print(f"Updated fetching_status: symbol={symbol}, mode=automatic, future_symbol={future_symbol}")
             print(f"Full fetching_status: {fetching_status}")
@@ -2629,7 +3650,7 @@ def start_fetching():
             print(f"Starting automatic fetch thread: future_symbol={future_symbol}, option_expiry={option_expiry_date}, option_symbol={symbol}")
             try:
                 # Create and start thread
-                fetch_thread = threading.Thread(target=fetch_data_loop_automatic, args=(future_symbol, option_expiry_date, expiry_type, option_type, timeframe, strike_distance, risk_free_rate), daemon=True)
+                fetch_thread = threading.Thread(target=run_tracker, args=(WEB_TRACKER_KEY, fetch_cancel_token, fetch_data_loop_automatic, future_symbol, option_expiry_date, expiry_type, option_type, timeframe, strike_distance, risk_free_rate, atm_hysteresis, atm_min_dwell, forward_source, time_basis), daemon=True)
                 fetch_thread.start()
                 print(f"Automatic fetch thread started successfully. Thread ID: {fetch_thread.ident}")
                 add_log('INFO', 'Automatic data fetching started', {
@@ -2657,6 +3678,7 @@ def start_fetching():
                 "success": True, 
                 "message": "Automatic data fetching started",
                 "generated_symbol": symbol,
+                "continuous_symbol": continuous_symbol,
                 "future_ltp": future_ltp,
                 "atm_strike": atm_strike,
                 "strike_step": strike_distance
@@ -2729,7 +3751,8 @@ def start_fetching():
                 manual_strike=None,  # Strike is extracted from symbol, no need for manual input
                 manual_expiry=expiry,
                 manual_option_type=option_type,
-                manual_future_symbol=future_symbol  # Use the future symbol selected by user from dropdown
+                manual_future_symbol=future_symbol,  # Use the future symbol selected by user from dropdown
+                time_basis=time_basis
             )
             
             if df_with_iv is None or 'iv' not in df_with_iv.columns:
@@ -2783,13 +3806,13 @@ def start_fetching():
         timestamps_for_chart = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
         iv_values_for_chart = df_chart['iv'].fillna(0).tolist()
         
-        iv_data_store[symbol] = {
+        set_iv_data(symbol, {
             "timestamps": timestamps_for_chart,
             "iv_values": iv_values_for_chart,
             "close_prices": df_chart['close'].tolist(),
             "fclose_prices": df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else [],
             "last_update": datetime.now().isoformat()
-        }
+        })
         
         print(f"✓ Stored {len(timestamps_for_chart)} data points in iv_data_store (latest 500 records)")
         print("=" * 60)
@@ -2808,12 +3831,13 @@ def start_fetching():
             "mode": "manual",
             "expiry": expiry,
             "option_type": option_type,
-            "future_symbol": future_symbol  # Store future symbol for reference
+            "future_symbol": future_symbol,  # Store future symbol for reference
+            "time_basis": time_basis
         })
         
         # Start fetching in background thread
         try:
-            fetch_thread = threading.Thread(target=fetch_data_loop, args=(symbol, timeframe, None, expiry, option_type, future_symbol, risk_free_rate), daemon=True)
+            fetch_thread = threading.Thread(target=run_tracker, args=(WEB_TRACKER_KEY, fetch_cancel_token, fetch_data_loop, symbol, timeframe, None, expiry, option_type, future_symbol, risk_free_rate, time_basis), daemon=True)
             fetch_thread.start()
             print(f"Manual fetch thread started successfully. Thread ID: {fetch_thread.ident}")
         except Exception as e:
@@ -2845,6 +3869,9 @@ def stop_fetching():
     """Stop fetching historical data (CSV files are preserved)"""
     global fetching_status, iv_data_store, fetch_thread, fetch_lock
     
+    if VIEWER_ONLY:
+        return jsonify({"success": True, "viewer": True, "message": "Read-only viewer: data collection keeps running in the collector process."})
+    
     print("=" * 60)
     print("STOPPING FETCH OPERATION...")
     print("=" * 60)
@@ -2856,24 +3883,20 @@ def stop_fetching():
         # Stop fetching first
         fetching_status["active"] = False
         fetching_status["mode"] = None
-        
-        # Wait for thread to finish (with timeout)
+        # Cancel the loop's token: its sleeps wake at once and it exits after any in-flight API call.
+        # Under the write lock, so the loop can't write again after the clear below
+        with store_write_lock:
+            fetch_cancel_token.set()
+            # Clear all in-memory data only (CSV files remain on disk)
+            drop_iv_data()
+            continuous_atm_frames.clear()
         if fetch_thread is not None and fetch_thread.is_alive():
-            print(f"Waiting for thread {fetch_thread.ident} to stop...")
-            fetch_thread.join(timeout=3)  # Wait up to 3 seconds
-            if fetch_thread.is_alive():
-                print(f"Warning: Thread {fetch_thread.ident} did not stop within timeout")
-            else:
-                print(f"Thread {fetch_thread.ident} stopped successfully")
-        
+            print(f"Cancelled thread {fetch_thread.ident}")
         fetch_thread = None
         
         # CSV files are NOT deleted - they are preserved in data folder for future reference
         print("Stopping fetch - CSV files will be preserved in data folder")
         add_log('INFO', 'Data fetching stopped - CSV files preserved', {})
-        
-        # Clear all in-memory data only (CSV files remain on disk)
-        iv_data_store.clear()
         print("Stopped fetching - in-memory data cleared, CSV files preserved")
         
         return jsonify({"success": True, "message": "Data fetching stopped. CSV files preserved in data folder."})
@@ -2883,14 +3906,40 @@ def stop_fetching():
 
 @app.route('/api/get_iv_data', methods=['GET'])
 def get_iv_data():
-    """Get current IV data for charting - loads from CSV if not in memory"""
+    """
+    Get current IV data for charting - loads from stored IV history if not in memory
+    
+    Optional query parameters:
+    - from / to: Only rows in this range (IST datetimes or epoch seconds in chart time)
+    - last: Only the latest N rows of the range (the chart's initial window)
+    - max_points: Reduce the range to at most this many points
+    - downsample: 'lttb' (default) or 'minmax'
+    - resolution: 'auto' (pyramid level that fits max_points), '1m' (raw) or '5m', '15m', '1h', '1D'
+    """
     symbol = request.args.get('symbol')
+    try:
+        start, end, max_points, method, resolution, last = parse_chart_window_args(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Invalid range parameter: {e}"}), 400
+    
+    if symbol and shared_series_reader is not None:
+        sync_shared_series(symbol)  # Viewer: latest candles from the collector's shared memory
+    
+    if symbol and resolution and resolution != '1m':
+        try:
+            data = load_chart_level(symbol, start, end, max_points, resolution)
+            if data is not None:
+                return chart_response(select_chart_window(data, None, None, max_points, method, last))
+        except Exception as e:
+            print(f"Error reading {resolution} resolution for {symbol}: {e}")
     
     if symbol and symbol in iv_data_store:
-        data = iv_data_store[symbol]
-        # Log data being sent for debugging
-        print(f"Returning IV data for {symbol}: {len(data.get('timestamps', []))} timestamps, {len(data.get('iv_values', []))} IV values")
-        return jsonify(data)
+        def build_payload():
+            data = iv_data_store.get(symbol) or build_iv_payload(pd.DataFrame({'date': pd.to_datetime([]), 'iv': []}))
+            # Log data being sent for debugging (only when the cached response is rebuilt)
+            print(f"Returning IV data for {symbol}: {len(data.get('timestamps', []))} timestamps, {len(data.get('iv_values', []))} IV values")
+            return select_chart_window(data, start, end, max_points, method, last)
+        return cached_chart_response(symbol, build_payload)
     else:
         # Debug: Print what symbols are available in iv_data_store
         available_symbols = list(iv_data_store.keys())
@@ -2904,101 +3953,26 @@ def get_iv_data():
                 if stored_symbol.upper() == symbol_upper:
                     print(f"Found case-insensitive match: {stored_symbol} (requested: {symbol})")
                     data = iv_data_store[stored_symbol]
-                    return jsonify(data)
+                    return chart_response(select_chart_window(data, start, end, max_points, method, last))
             
-            # If not in memory, try loading from CSV file
-            print(f"Attempting to load IV data from CSV for symbol: {symbol}")
+            # If not in memory, try loading from stored IV history
+            print(f"Attempting to load IV data from storage for symbol: {symbol}")
             try:
-                safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-                safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-                filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
-                
-                if os.path.exists(filename):
-                    print(f"CSV file found: {filename}, loading data...")
-                    df = pd.read_csv(filename)
-                    
-                    if 'date' not in df.columns or 'iv' not in df.columns:
-                        print(f"CSV file missing required columns. Available: {list(df.columns)}")
-                        return jsonify({"timestamps": [], "iv_values": [], "close_prices": [], "fclose_prices": [], "last_update": None})
-                    
-                    # Convert dates
-                    df['date'] = pd.to_datetime(df['date'])
-                    if df['date'].dt.tz is None:
-                        df['date'] = df['date'].dt.tz_localize('Asia/Kolkata')
-                    else:
-                        df['date'] = df['date'].dt.tz_convert('Asia/Kolkata')
-                    
-                    # Sort by date - show all records for chart
-                    df = df.sort_values('date')
-                    df_chart = df  # Show all rows, no limit
-                    
-                    timestamps = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                    iv_values = df_chart['iv'].fillna(0).tolist()
-                    close_prices = df_chart['close'].tolist() if 'close' in df_chart.columns else []
-                    fclose_prices = df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else []
-                    
-                    # Store in iv_data_store for future requests
-                    iv_data_store[symbol] = {
-                        "timestamps": timestamps,
-                        "iv_values": iv_values,
-                        "close_prices": close_prices,
-                        "fclose_prices": fclose_prices,
-                        "last_update": datetime.now().isoformat()
-                    }
-                    
-                    print(f"✓ Loaded {len(timestamps)} data points from CSV for {symbol} (all records)")
-                    print(f"  Debug: Stored in iv_data_store with key: {symbol}")
+                if start is not None or end is not None:
+                    # Range request: read just the window, don't cache a partial series
+                    df = load_iv_series(symbol, start, end)
+                    if df is not None:
+                        data = build_iv_payload(df)
+                        print(f"✓ Loaded {len(data['timestamps'])} data points from storage for {symbol} ({start} - {end})")
+                        return chart_response(select_chart_window(data, None, None, max_points, method, last))
+                df = load_iv_series(symbol)
+                if df is not None:
+                    # Store in iv_data_store for future requests (all records)
+                    data = store_iv_data(symbol, df)
+                    print(f"✓ Loaded {len(data['timestamps'])} data points from storage for {symbol} (all records)")
                     print(f"  Debug: iv_data_store now has keys: {list(iv_data_store.keys())}")
-                    return jsonify({
-                        "timestamps": timestamps,
-                        "iv_values": iv_values,
-                        "close_prices": close_prices,
-                        "fclose_prices": fclose_prices,
-                        "last_update": datetime.now().isoformat()
-                    })
-                else:
-                    print(f"CSV file not found: {filename}")
-                    # Try to find similar CSV files (in case symbol format differs slightly)
-                    if os.path.exists(DATA_FOLDER):
-                        csv_files = [f for f in os.listdir(DATA_FOLDER) if f.endswith('.csv')]
-                        print(f"  Available CSV files in data folder: {csv_files[:10]}...")  # Show first 10
-                        # Try to find a match by checking if symbol (without colons) matches filename
-                        symbol_no_colon = symbol.replace(':', '_')
-                        for csv_file in csv_files:
-                            csv_name_no_ext = csv_file.replace('.csv', '')
-                            if symbol_no_colon.upper() == csv_name_no_ext.upper():
-                                print(f"  Found matching CSV file: {csv_file} (case-insensitive match)")
-                                # Try loading this file
-                                filename = os.path.join(DATA_FOLDER, csv_file)
-                                df = pd.read_csv(filename)
-                                if 'date' in df.columns and 'iv' in df.columns:
-                                    df['date'] = pd.to_datetime(df['date'])
-                                    if df['date'].dt.tz is None:
-                                        df['date'] = df['date'].dt.tz_localize('Asia/Kolkata')
-                                    else:
-                                        df['date'] = df['date'].dt.tz_convert('Asia/Kolkata')
-                                    df = df.sort_values('date')
-                                    df_chart = df  # Show all rows, no limit
-                                    timestamps = df_chart['date'].dt.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
-                                    iv_values = df_chart['iv'].fillna(0).tolist()
-                                    close_prices = df_chart['close'].tolist() if 'close' in df_chart.columns else []
-                                    fclose_prices = df_chart['fclose'].tolist() if 'fclose' in df_chart.columns else []
-                                    iv_data_store[symbol] = {
-                                        "timestamps": timestamps,
-                                        "iv_values": iv_values,
-                                        "close_prices": close_prices,
-                                        "fclose_prices": fclose_prices,
-                                        "last_update": datetime.now().isoformat()
-                                    }
-                                    print(f"  ✓ Loaded {len(timestamps)} data points from matched CSV file")
-                                    return jsonify({
-                                        "timestamps": timestamps,
-                                        "iv_values": iv_values,
-                                        "close_prices": close_prices,
-                                        "fclose_prices": fclose_prices,
-                                        "last_update": datetime.now().isoformat()
-                                    })
-                                break
+                    return chart_response(select_chart_window(data, start, end, max_points, method, last))
+                print(f"No stored IV history found for {symbol} ({iv_storage.name} storage)")
             except Exception as e:
                 print(f"Error loading CSV data for {symbol}: {e}")
                 import traceback
@@ -3010,31 +3984,324 @@ def get_iv_data():
         })
         return jsonify({"timestamps": [], "iv_values": [], "close_prices": [], "fclose_prices": [], "last_update": None})
 
+@app.route('/api/get_iv_page', methods=['GET'])
+def get_iv_page():
+    """
+    Page backwards through a symbol's IV history (chart scroll-back)
+    
+    Query parameters:
+    - symbol: Symbol to read
+    - before: Return points strictly before this time (IST datetime or epoch seconds in chart time); latest page if omitted
+    - limit: Points per page (default CHART_PAGE_POINTS)
+    
+    The response is a chart payload plus has_more (older points exist) and oldest (cursor for the next page)
+    """
+    symbol = request.args.get('symbol')
+    if not symbol:
+        return jsonify({"success": False, "message": "symbol parameter is required"}), 400
+    try:
+        before = parse_time_bound(request.args.get('before'))
+        limit = int(request.args.get('limit') or CHART_PAGE_POINTS)
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        limit = min(limit, CHART_PAGE_MAX_POINTS)
+    except (ValueError, TypeError) as e:
+        return jsonify({"success": False, "message": f"Invalid page parameter: {e}"}), 400
+    
+    try:
+        page, has_more = read_chart_page(symbol, before, limit)
+        if page is None:
+            return jsonify({"success": False, "message": f"No IV history found for symbol: {symbol}"}), 404
+        page.update({
+            "success": True,
+            "symbol": symbol,
+            "data_points": len(page['timestamps']),
+            "has_more": has_more,
+            "oldest": page['timestamps'][0] if page['timestamps'] else None
+        })
+        return chart_response(page)
+    except Exception as e:
+        print(f"Error reading IV page for {symbol}: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/get_status', methods=['GET'])
 def get_status():
-    """Get current fetching status"""
-    return jsonify(fetching_status)
+    """Get current fetching status (the collector's, in the read-only viewer)"""
+    return jsonify(viewer_status() if VIEWER_ONLY else fetching_status)
+
+def write_collector_status(trackers, started=None):
+    """Publish the collector's tracker status and series write times for viewers (atomic replace)"""
+    status = {
+        "pid": os.getpid(),
+        "started": started,
+        "updated": datetime.now().isoformat(),
+        "trackers": [dict(tracker) for tracker in trackers],
+        "persisted": dict(iv_data_persisted)
+    }
+    tmp_path = COLLECTOR_STATUS_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f, default=str)
+    os.replace(tmp_path, COLLECTOR_STATUS_FILE)
+
+def read_collector_status():
+    """The collector's last published status, or None if no collector has written one"""
+    try:
+        with open(COLLECTOR_STATUS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def viewer_status():
+    """fetching_status-shaped view of the collector for the viewer: the first active tracker plus all trackers"""
+    status = read_collector_status() or {}
+    trackers = status.get('trackers') or []
+    active = [tracker for tracker in trackers if tracker.get('active')]
+    view = dict(active[0]) if active else {"active": False}
+    view.update({"viewer": True, "trackers": trackers, "collector_updated": status.get('updated')})
+    return view
+
+def attach_to_collector(data):
+    """Viewer /api/start_fetching: point the chart at the collector's series instead of starting a fetch loop"""
+    status = read_collector_status()
+    if status is None:
+        return jsonify({"success": False, "message": "Read-only viewer: no collector is running. Start it with: python -m collector"}), 503
+    mode = str(data.get('mode') or 'manual').lower().strip()
+    if mode != 'automatic':
+        return jsonify({"success": True, "viewer": True, "message": f"Read-only viewer: showing stored data for {data.get('symbol')}"})
+    for tracker in status.get('trackers') or []:
+        if tracker.get('future_symbol') == data.get('future_symbol'):
+            return jsonify({
+                "success": True,
+                "viewer": True,
+                "message": f"Read-only viewer: following the collector's {tracker.get('continuous_symbol')}",
+                "generated_symbol": tracker.get('symbol'),
+                "continuous_symbol": tracker.get('continuous_symbol'),
+                "future_ltp": tracker.get('future_ltp'),
+                "atm_strike": tracker.get('strike'),
+                "strike_step": tracker.get('strike_step')
+            })
+    return jsonify({"success": False, "message": f"Read-only viewer: the collector is not tracking {data.get('future_symbol')}"}), 404
+
+def watch_collector_store():
+    """
+    Viewer thread: keep viewed series current - from the collector's shared memory where it has a segment
+    (checked every SHARED_SERIES_POLL_SECONDS), otherwise by reloading from storage what the collector has
+    written since (checked every VIEWER_REFRESH_SECONDS). Each update bumps the version, so polls wake.
+    """
+    seen = {}
+    last_mtime = None
+    collector_started = None
+    next_status_check = 0
+    while True:
+        time.sleep(SHARED_SERIES_POLL_SECONDS if shared_series_reader is not None else VIEWER_REFRESH_SECONDS)
+        shared = set()
+        if shared_series_reader is not None:
+            for symbol in list(iv_data_store):
+                try:
+                    if sync_shared_series(symbol):
+                        shared.add(symbol)
+                except Exception as e:
+                    print(f"Viewer shared memory refresh failed for {symbol}: {e}")
+        if time.monotonic() < next_status_check:
+            continue
+        next_status_check = time.monotonic() + VIEWER_REFRESH_SECONDS
+        try:
+            mtime = os.path.getmtime(COLLECTOR_STATUS_FILE)
+            if mtime == last_mtime:
+                continue
+            last_mtime = mtime
+            status = read_collector_status() or {}
+            if shared_series_reader is not None and status.get('started') != collector_started:
+                # A new collector process publishes new segments - drop the old one's mappings
+                collector_started = status.get('started')
+                shared_series_reader.close()
+            for symbol, written in (status.get('persisted') or {}).items():
+                if seen.get(symbol) == written:
+                    continue
+                seen[symbol] = written
+                if symbol not in iv_data_store or symbol in shared:
+                    continue  # Not viewed yet (loaded on its first request), or already current from shared memory
+                df = load_iv_series(symbol)
+                if df is not None:
+                    store_iv_data(symbol, df)
+                    print(f"✓ Viewer reloaded {symbol}: {len(df)} data points")
+        except OSError:
+            continue
+        except Exception as e:
+            print(f"Viewer store refresh failed: {e}")
+
+# Long-poll limits for /api/poll (seconds). Each waiting poll holds a request thread (serving.DEFAULT_THREADS)
+# for up to POLL_MAX_TIMEOUT, so the cap stays just above the chart's own 25 s timeout.
+POLL_DEFAULT_TIMEOUT = 25
+POLL_MAX_TIMEOUT = 30
+
+def active_chart_symbol(requested=None):
+    """Symbol the chart should show: the continuous/current symbol being fetched, else the requested one"""
+    if VIEWER_ONLY:
+        # Any collector series can be viewed; default to the first active tracker's
+        return requested or viewer_status().get('continuous_symbol')
+    if fetching_status.get('active'):
+        if fetching_status.get('mode') == 'automatic' and (fetching_status.get('continuous_symbol') or fetching_status.get('symbol')):
+            return fetching_status.get('continuous_symbol') or fetching_status.get('symbol')
+        if fetching_status.get('symbol'):
+            return fetching_status['symbol']
+    return requested
+
+@app.route('/api/poll', methods=['GET'])
+def poll():
+    """
+    Combined status + chart data long-poll (replaces polling /api/get_status and /api/get_iv_data every second)
+    
+    Query parameters:
+    - symbol: Symbol the client is showing (optional)
+    - version: Store version the client has for it (omit on first call)
+    - epoch: Server epoch that version came from (a version from before a restart is ignored)
+    - since: Client's latest point (epoch seconds in chart time or IST datetime) - enables delta responses
+    - active: 1/0, whether the client thinks fetching is active
+    - last: Points in a full (non-delta) response (default CHART_PAGE_POINTS)
+    - timeout: Seconds to hold the request waiting for a change (default 25, max 30)
+    
+    Returns immediately when the active symbol, fetching state or store version differs from the client's,
+    otherwise waits for the next version bump (or the timeout). Response:
+    status, symbol, version, epoch, changed, delta (data holds only rows from `since`) and data (chart payload or null)
+    """
+    try:
+        requested = request.args.get('symbol') or None
+        client_version = int(request.args['version']) if request.args.get('version') else None
+        if request.args.get('epoch') not in (None, iv_data_epoch):
+            client_version = None
+        since = parse_time_bound(request.args.get('since'))
+        client_active = request.args.get('active')
+        last = int(request.args.get('last') or CHART_PAGE_POINTS)
+        timeout = min(max(float(request.args.get('timeout') or POLL_DEFAULT_TIMEOUT), 0), POLL_MAX_TIMEOUT)
+    except (ValueError, TypeError) as e:
+        return jsonify({"success": False, "message": f"Invalid poll parameter: {e}"}), 400
+    
+    def current_state():
+        # The viewer reports the collector's trackers, like /api/get_status (its own fetching_status never changes)
+        status = viewer_status() if VIEWER_ONLY else fetching_status
+        symbol = active_chart_symbol(requested)
+        return symbol, iv_data_versions.get(symbol, 0) if symbol else 0, status
+    
+    def is_changed(state):
+        symbol, version, status = state
+        return (symbol != requested or client_version is None or version != client_version
+                or (client_active is not None and bool(status.get('active')) != (client_active == '1')))
+    
+    deadline = time.time() + max(0.0, timeout)
+    state = current_state()
+    with iv_data_changed:
+        # Wake on version bumps; re-check every second for status-only changes (start/stop, symbol switch)
+        while not is_changed(state) and time.time() < deadline:
+            iv_data_changed.wait(min(1.0, deadline - time.time()))
+            state = current_state()
+    
+    symbol, version, status = state
+    response = {
+        "success": True,
+        "status": status,
+        "symbol": symbol,
+        "version": version,
+        "epoch": iv_data_epoch,
+        "changed": is_changed(state),
+        "delta": False,
+        "data": None
+    }
+    data = iv_data_store.get(symbol) if symbol else None
+    if response["changed"] and data is not None:
+        can_delta = (symbol == requested and client_version is not None and since is not None
+                     and iv_data_resync_versions.get(symbol, 0) <= client_version)
+        if can_delta:
+            response["data"] = select_chart_window(data, since, None)
+            response["delta"] = True
+        else:
+            response["data"] = select_chart_window(data, last=last)
+    return jsonify(response)
+
+def memory_iv_data(symbol):
+    """A symbol's chart data from iv_data_store, loading its stored history into memory first if needed (None if it has none)"""
+    if shared_series_reader is not None and sync_shared_series(symbol):
+        return iv_data_store.get(symbol)
+    if symbol not in iv_data_store:
+        df = load_iv_series(symbol)
+        if df is None:
+            return None
+        store_iv_data(symbol, df)
+    return iv_data_store.get(symbol)
+
+@app.route('/api/get_iv_delta', methods=['GET'])
+def get_iv_delta():
+    """
+    Rows a client-side cache of a symbol is missing (the chart's IndexedDB cache)
+    
+    Query parameters:
+    - symbol: Symbol to read
+    - since: Client's latest cached point (epoch seconds in chart time or IST datetime)
+    - version / epoch: Store version and epoch the cached rows came with (from /api/poll or this endpoint)
+    - last: Points in a full (non-delta) response (default CHART_PAGE_POINTS)
+    
+    Response is a chart payload plus symbol, version, epoch and delta:
+    - delta true: only the rows from `since` on; the client's older rows haven't changed since its version
+    - delta false: the latest `last` rows; the cache is from another server process or older rows were rewritten
+      (stitch, reload), so it has to be replaced
+    """
+    symbol = request.args.get('symbol')
+    if not symbol:
+        return jsonify({"success": False, "message": "symbol parameter is required"}), 400
+    try:
+        since = parse_time_bound(request.args.get('since'))
+        client_version = int(request.args['version']) if request.args.get('version') else None
+        last = int(request.args.get('last') or CHART_PAGE_POINTS)
+    except (ValueError, TypeError) as e:
+        return jsonify({"success": False, "message": f"Invalid delta parameter: {e}"}), 400
+    
+    try:
+        data = memory_iv_data(symbol)
+    except Exception as e:
+        print(f"Error loading IV data for {symbol}: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+    if data is None:
+        return jsonify({"success": False, "message": f"No IV history found for symbol: {symbol}"}), 404
+    
+    version = iv_data_versions.get(symbol, 0)
+    can_delta = (since is not None and client_version is not None
+                 and request.args.get('epoch') == iv_data_epoch
+                 and iv_data_resync_versions.get(symbol, 0) <= client_version)
+    payload = dict(select_chart_window(data, since, None) if can_delta else select_chart_window(data, last=last))
+    payload.update({
+        "success": True,
+        "symbol": symbol,
+        "version": version,
+        "epoch": iv_data_epoch,
+        "delta": can_delta
+    })
+    return chart_response(payload)
 
 @app.route('/api/load_csv_data', methods=['GET'])
 def load_csv_data():
-    """Load IV data from CSV files in data folder with strict symbol validation"""
+    """
+    Load stored IV history (CSV files or the configured storage backend) with strict symbol validation
+    Accepts the same from / to / last / max_points / downsample / resolution parameters as /api/get_iv_data
+    """
     try:
         # Symbol is REQUIRED - no auto-loading of most recent file
         symbol = request.args.get('symbol')
         if not symbol:
             return jsonify({"success": False, "message": "Symbol parameter is required. Cannot auto-load CSV without explicit symbol."}), 400
+        try:
+            start, end, max_points, method, resolution, last = parse_chart_window_args(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "message": f"Invalid range parameter: {e}"}), 400
         
-        # Sanitize symbol for filename matching
-        safe_symbol = re.sub(r'[<>:"/\\|?*]', '_', symbol)
-        safe_symbol = safe_symbol.replace(':', '_').replace(' ', '_')
-        filename = os.path.join(DATA_FOLDER, f"{safe_symbol}.csv")
+        # Read stored IV history (dates come back as naive IST times, sorted)
+        df = iv_storage.read(symbol, start, end)
+        if df is None and (start is not None or end is not None) and iv_storage.exists(symbol):
+            # Symbol has history, just nothing in the requested range
+            df = pd.DataFrame({'date': pd.to_datetime([]), 'iv': []})
         
-        if not os.path.exists(filename):
+        if df is None:
             return jsonify({"success": False, "message": f"CSV file not found for symbol: {symbol}"}), 404
         
-        # Read CSV file
-        df = pd.read_csv(filename)
-        
         # Ensure required columns exist
         if 'date' not in df.columns or 'iv' not in df.columns:
             return jsonify({"success": False, "message": "CSV file missing required columns (date, iv)"}), 400
@@ -3055,21 +4322,12 @@ def load_csv_data():
                     print(f"ERROR: {error_msg}")
                     return jsonify({"success": False, "message": error_msg}), 400
         
-        # Also verify filename matches (double-check)
-        filename_symbol = os.path.basename(filename).replace('.csv', '')
-        if filename_symbol != safe_symbol:
-            error_msg = f"Filename mismatch: Expected '{safe_symbol}' but found '{filename_symbol}'"
-            print(f"ERROR: {error_msg}")
-            return jsonify({"success": False, "message": error_msg}), 400
-        
-        # Convert date column to datetime - preserve CSV timestamp exactly as-is
-        # CSV timestamps are already correct IST times, so we just parse and format them
-        df['date'] = pd.to_datetime(df['date'])
-        # Don't apply timezone conversion - CSV timestamps are already correct IST times
-        # Just format them with IST timezone indicator for frontend
-        
-        # Sort by date
-        df = df.sort_values('date')
+        if resolution and resolution != '1m':
+            level_payload = load_chart_level(symbol, start, end, max_points, resolution)
+            if level_payload is not None:
+                payload = select_chart_window(level_payload, None, None, max_points, method, last)
+                payload.update({"success": True, "symbol": symbol, "data_points": len(payload["timestamps"])})
+                return chart_response(payload)
         
         # Convert to format expected by frontend
         # Format as ISO string with IST timezone offset (+05:30) so JavaScript can parse it correctly
@@ -3082,16 +4340,17 @@ def load_csv_data():
         # Return the original symbol (not sanitized filename) for consistency
         print(f"Successfully loaded CSV data for symbol: {symbol} ({len(timestamps)} data points)")
         
-        return jsonify({
+        payload = select_chart_window({
             "success": True,
             "timestamps": timestamps,
             "iv_values": iv_values,
             "close_prices": close_prices,
             "fclose_prices": fclose_prices,
             "symbol": symbol,  # Return original symbol, not filename
-            "data_points": len(timestamps),
             "last_update": timestamps[-1] if timestamps else None
-        })
+        }, None, None, max_points, method, last)
+        payload["data_points"] = len(payload["timestamps"])
+        return chart_response(payload)
     except Exception as e:
         print(f"Error loading CSV data: {e}")
         import traceback
@@ -3100,13 +4359,78 @@ def load_csv_data():
 
 @app.route('/api/list_csv_files', methods=['GET'])
 def list_csv_files():
-    """List all available CSV files in data folder"""
+    """List all symbols with stored IV history (CSV file names without extension)"""
     try:
-        csv_files = [f.replace('.csv', '') for f in os.listdir(DATA_FOLDER) if f.endswith('.csv')]
+        csv_files = iv_storage.list_symbols()
         return jsonify({"success": True, "files": csv_files})
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/query_iv_history', methods=['GET'])
+def query_iv_history():
+    """
+    Query stored IV history without loading whole files (indexed with the sqlite backend)
+    
+    Query parameters:
+    - symbol=<symbol> or symbols=<symbol1>,<symbol2>,... (cross-symbol query)
+    - from / to: Optional IST datetimes (e.g. 2026-01-05T09:15:00)
+    - minutes: Optional window ending now, e.g. minutes=120 for the last 2 hours (overrides from)
+    - last: Optional number of latest rows (single symbol only)
+    """
+    try:
+        symbols = [s.strip() for s in (request.args.get('symbols') or request.args.get('symbol') or '').split(',') if s.strip()]
+        if not symbols:
+            return jsonify({"success": False, "message": "symbol or symbols parameter is required"}), 400
+        
+        start = request.args.get('from')
+        end = request.args.get('to')
+        try:
+            if request.args.get('minutes'):
+                start = get_ist_now() - timedelta(minutes=float(request.args.get('minutes')))
+            last = int(request.args.get('last')) if request.args.get('last') else None
+            start = pd.Timestamp(start) if start is not None else None
+            end = pd.Timestamp(end) if end is not None else None
+        except (ValueError, TypeError):
+            return jsonify({"success": False, "message": "Invalid from/to/minutes/last parameter"}), 400
+        
+        if len(symbols) == 1:
+            if last is not None:
+                df = iv_storage.latest(symbols[0], last)
+            else:
+                df = iv_storage.read(symbols[0], start, end)
+            payload = build_iv_payload(df) if df is not None else build_iv_payload(pd.DataFrame(columns=['date', 'iv']))
+            payload.update({"success": True, "symbol": symbols[0], "data_points": len(payload['timestamps'])})
+            return jsonify(payload)
+        
+        df = iv_storage.read_many(symbols, start, end)
+        series = {}
+        if df is not None:
+            for name, rows in df.groupby('symbol', sort=False):
+                series[name] = build_iv_payload(rows)
+        return jsonify({"success": True, "series": series, "storage": iv_storage.name})
+    except Exception as e:
+        print(f"Error querying IV history: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/api/export_csv', methods=['GET'])
+def export_csv():
+    """Export a symbol's stored IV history as a CSV download (works with every storage backend)"""
+    try:
+        symbol = request.args.get('symbol')
+        if not symbol:
+            return jsonify({"success": False, "message": "Symbol parameter is required"}), 400
+        
+        csv_text = iv_storage.export_csv(symbol, request.args.get('from'), request.args.get('to'))
+        if csv_text is None:
+            return jsonify({"success": False, "message": f"No stored IV history for symbol: {symbol}"}), 404
+        
+        filename = symbol.replace(':', '_').replace(' ', '_')
+        return Response(csv_text, mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename="{filename}.csv"'})
+    except Exception as e:
+        print(f"Error exporting CSV for {request.args.get('symbol')}: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
 @app.route('/api/get_symbol_settings', methods=['GET'])
 def get_symbol_settings():
     """Get symbol settings from CSV file for dropdown"""
@@ -3372,11 +4696,53 @@ def create_master_symbols():
         traceback.print_exc()
         return jsonify({"success": False, "message": error_msg}), 500
 
+viewer_watcher_pid = None  # Process that started the watcher (gunicorn workers fork without its thread)
+
+def start_viewer_watcher():
+    """Start the viewer's store watcher in this process (no-op if it is running here or not in viewer mode)"""
+    global viewer_watcher_pid
+    if not VIEWER_ONLY or viewer_watcher_pid == os.getpid():
+        return
+    viewer_watcher_pid = os.getpid()
+    threading.Thread(target=watch_collector_store, name='collector-store-watcher', daemon=True).start()
+
+if VIEWER_ONLY:
+    start_viewer_watcher()
+    print(f"Read-only viewer: fetch loops disabled, following {COLLECTOR_STATUS_FILE}")
+
+def parse_serve_args(argv=None):
+    """
+    Web server options; each flag defaults to its environment variable
+    - dev (default): Flask development server with the debugger, as before
+    - production: waitress (threads) or gunicorn (workers x threads), debugger off - see serving.py
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="IV Charts web application")
+    parser.add_argument('--serve', choices=SERVE_MODES, default=os.environ.get('IV_SERVE_MODE') or 'dev',
+                        help="dev or production (IV_SERVE_MODE)")
+    parser.add_argument('--host', default=os.environ.get('IV_HOST') or '127.0.0.1', help="Bind address (IV_HOST)")
+    parser.add_argument('--port', type=int, default=int(os.environ.get('IV_PORT') or 3000), help="Port (IV_PORT)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('IV_THREADS') or DEFAULT_THREADS),
+                        help="Request threads per process in production mode (IV_THREADS)")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('IV_WORKERS') or DEFAULT_WORKERS),
+                        help="Worker processes in production mode, gunicorn only; >1 needs IV_VIEWER_ONLY=1 (IV_WORKERS)")
+    parser.add_argument('--no-browser', action='store_true', default=os.environ.get('IV_NO_BROWSER', '0') == '1',
+                        help="Do not open a browser window (IV_NO_BROWSER=1)")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and not VIEWER_ONLY:
+        # Each process would have its own in-memory store and its own fetch loops
+        print(f"⚠ {args.workers} workers need IV_VIEWER_ONLY=1 (run collector.py for fetching) - using 1 worker")
+        args.workers = 1
+    return args
+
 if __name__ == '__main__':
     import webbrowser
     import threading
     import sys
     
+    serve_args = parse_serve_args()
+    url = f"http://{serve_args.host}:{serve_args.port}"
+    
     # Prevent Cursor from auto-detecting and opening preview
     # Set environment variable to disable auto-preview
     os.environ['BROWSER'] = 'none'  # Disable auto-browser in some IDEs
@@ -3386,28 +4752,34 @@ if __name__ == '__main__':
         time.sleep(1.5)  # Wait for server to start
         try:
             # Open in default system browser
-            webbrowser.open('http://127.0.0.1:3000')
+            webbrowser.open(url)
         except Exception as e:
             print(f"Could not open browser automatically: {e}")
-            print("Please manually open: http://127.0.0.1:3000")
+            print(f"Please manually open: {url}")
     
     # Start browser in a separate thread
-    browser_thread = threading.Thread(target=open_browser)
-    browser_thread.daemon = True
-    browser_thread.start()
+    if not serve_args.no_browser:
+        browser_thread = threading.Thread(target=open_browser)
+        browser_thread.daemon = True
+        browser_thread.start()
     
     print("\n" + "="*60)
     print("IV Charts Web Application")
     print("="*60)
-    print(f"Server starting on http://127.0.0.1:3000")
-    print(f"Opening in your default browser...")
-    print("\nTo disable Cursor's auto-preview:")
-    print("1. Go to Cursor Settings (Ctrl+,)")
-    print("2. Search for 'preview' or 'browser'")
-    print("3. Disable 'Auto Open Preview' or similar setting")
+    print(f"Server starting on {url} ({serve_args.serve} mode)")
+    if not serve_args.no_browser:
+        print(f"Opening in your default browser...")
+    if serve_args.serve == 'dev':
+        print("\nTo disable Cursor's auto-preview:")
+        print("1. Go to Cursor Settings (Ctrl+,)")
+        print("2. Search for 'preview' or 'browser'")
+        print("3. Disable 'Auto Open Preview' or similar setting")
     print("="*60 + "\n")
     
-    # Run with use_reloader=False to prevent multiple browser opens
-    # and to reduce Cursor's auto-detection
-    app.run(debug=True, host='127.0.0.1', port=3000, use_reloader=False)
-
+    if serve_args.serve == 'production':
+        serve_production(app, serve_args.host, serve_args.port, threads=serve_args.threads,
+                         workers=serve_args.workers, post_fork=start_viewer_watcher)
+    else:
+        # Run with use_reloader=False to prevent multiple browser opens
+        # and to reduce Cursor's auto-detection
+        app.run(debug=True, host=serve_args.host, port=serve_args.port, use_reloader=False)
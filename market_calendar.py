@@ -0,0 +1,327 @@
+"""
+Market calendar for IV Charts application
+Exchange session hours, holidays, special sessions, the next open/close instant (and waiting for it),
+and time-to-expiry helpers (calendar and trading-time basis)
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+
+# Market hours configuration
+# NSE: 9:15 AM to 3:30 PM IST
+# MCX: 9:00 AM to 11:30 PM IST (23:30)
+MARKET_HOURS = {
+    'NSE': {'open': (9, 15), 'close': (15, 30)},  # 9:15 AM to 3:30 PM IST
+    'MCX': {'open': (9, 0), 'close': (23, 30)}     # 9:00 AM to 11:30 PM IST
+}
+
+# Exchange holidays (optional file): Exchange,Date,Description with Date as DD-MM-YYYY (same as SymbolSetting.csv)
+HOLIDAYS_FILE = 'MarketHolidays.csv'
+# Special sessions (optional file): Exchange,Date,Open,Close,Description with Open/Close as HH:MM (IST)
+# A special session replaces the regular hours of its date, even on a weekend or holiday
+# (e.g. Muhurat trading on Diwali, a Saturday session on Budget day)
+SPECIAL_SESSIONS_FILE = 'MarketSpecialSessions.csv'
+
+IST = timezone(timedelta(hours=5, minutes=30))
+# A session counts as open until this long after its close, so the final candle is still collected
+SESSION_CLOSE_GRACE = timedelta(minutes=1)
+# How far ahead to look for the next session (covers long holiday stretches)
+SESSION_SEARCH_DAYS = 30
+# Longest single wait in wait_for_market_open; the wall clock is re-read after each (e.g. after a system suspend)
+MAX_SCHEDULER_SLEEP = 3600
+
+# Time-to-expiry basis
+# - calendar: seconds to expiry / seconds in a 365-day year (standard for most Indian brokers)
+# - trading:  session minutes to expiry (weekends, holidays and off-session time excluded) / session minutes in a 252-day year
+TIME_BASES = ('calendar', 'trading')
+TRADING_DAYS_PER_YEAR = 252
+
+_holiday_cache = {}
+_special_session_cache = {}
+_trading_lookup_cache = {}
+
+
+def load_market_holidays(exchange='NSE'):
+    """
+    Load the holiday dates for an exchange from HOLIDAYS_FILE
+    Returns a set of datetime.date (empty if the file doesn't exist)
+    """
+    exchange = (exchange or 'NSE').upper()
+    if exchange in _holiday_cache:
+        return _holiday_cache[exchange]
+
+    holidays = set()
+    if os.path.exists(HOLIDAYS_FILE):
+        try:
+            df = pd.read_csv(HOLIDAYS_FILE)
+            df = df[df['Exchange'].astype(str).str.strip().str.upper() == exchange]
+            for value in df['Date'].astype(str):
+                try:
+                    holidays.add(datetime.strptime(value.strip(), '%d-%m-%Y').date())
+                except ValueError:
+                    print(f"Warning: Invalid holiday date in {HOLIDAYS_FILE}: {value}")
+        except Exception as e:
+            print(f"Warning: Could not load {HOLIDAYS_FILE}: {e}")
+
+    _holiday_cache[exchange] = holidays
+    return holidays
+
+
+def load_special_sessions(exchange='NSE'):
+    """
+    Load the special sessions for an exchange from SPECIAL_SESSIONS_FILE
+    Returns a dict datetime.date -> (open_minute, close_minute) (empty if the file doesn't exist)
+    """
+    exchange = (exchange or 'NSE').upper()
+    if exchange in _special_session_cache:
+        return _special_session_cache[exchange]
+
+    sessions = {}
+    if os.path.exists(SPECIAL_SESSIONS_FILE):
+        try:
+            df = pd.read_csv(SPECIAL_SESSIONS_FILE, dtype=str)
+            df = df[df['Exchange'].str.strip().str.upper() == exchange]
+            for _, row in df.iterrows():
+                try:
+                    day = datetime.strptime(row['Date'].strip(), '%d-%m-%Y').date()
+                    open_time = datetime.strptime(row['Open'].strip(), '%H:%M')
+                    close_time = datetime.strptime(row['Close'].strip(), '%H:%M')
+                    sessions[day] = (open_time.hour * 60 + open_time.minute, close_time.hour * 60 + close_time.minute)
+                except (ValueError, AttributeError):
+                    print(f"Warning: Invalid special session in {SPECIAL_SESSIONS_FILE}: {row.to_dict()}")
+        except Exception as e:
+            print(f"Warning: Could not load {SPECIAL_SESSIONS_FILE}: {e}")
+
+    _special_session_cache[exchange] = sessions
+    return sessions
+
+
+def reload_market_holidays():
+    """Drop cached holidays, special sessions and trading-time lookups (after editing HOLIDAYS_FILE / SPECIAL_SESSIONS_FILE)"""
+    _holiday_cache.clear()
+    _special_session_cache.clear()
+    _trading_lookup_cache.clear()
+
+
+def is_trading_day(day, exchange='NSE'):
+    """True if the exchange has a session on this date (weekday and not a holiday, or a special session)"""
+    return get_session(day, exchange) is not None
+
+
+def get_session_minutes(exchange='NSE'):
+    """Return (open_minute, close_minute) of the exchange session as minutes from midnight"""
+    hours = MARKET_HOURS.get((exchange or 'NSE').upper(), MARKET_HOURS['NSE'])
+    open_hour, open_minute = hours['open']
+    close_hour, close_minute = hours['close']
+    return open_hour * 60 + open_minute, close_hour * 60 + close_minute
+
+
+def now_ist():
+    """Current IST time as a naive datetime (IST has no DST, so a fixed offset is exact)"""
+    return datetime.now(IST).replace(tzinfo=None)
+
+
+def get_session(day, exchange='NSE'):
+    """
+    Session of an exchange on a date as (open, close) naive IST datetimes, or None if there is no session
+    A special session overrides the regular weekday hours and holidays
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    special = load_special_sessions(exchange).get(day)
+    if special is not None:
+        open_minute, close_minute = special
+    elif day.weekday() < 5 and day not in load_market_holidays(exchange):
+        open_minute, close_minute = get_session_minutes(exchange)
+    else:
+        return None
+    midnight = datetime(day.year, day.month, day.day)
+    return midnight + timedelta(minutes=open_minute), midnight + timedelta(minutes=close_minute)
+
+
+def market_status(exchange='NSE', now=None):
+    """
+    Whether the exchange is open at `now` (naive IST, default current time) and when that next changes
+    Returns (is_open, change_at): the session close (plus SESSION_CLOSE_GRACE) while open, otherwise the
+    next session open - None if there is none within SESSION_SEARCH_DAYS
+    """
+    now = now or now_ist()
+    for offset in range(SESSION_SEARCH_DAYS + 1):
+        session = get_session(now.date() + timedelta(days=offset), exchange)
+        if session is None:
+            continue
+        session_open, session_close = session
+        if now < session_open:
+            return False, session_open
+        if now < session_close + SESSION_CLOSE_GRACE:
+            return True, session_close + SESSION_CLOSE_GRACE
+    return False, None
+
+
+def is_session_open(exchange='NSE', now=None):
+    """True if the exchange has a session in progress at `now` (naive IST, default current time)"""
+    return market_status(exchange, now)[0]
+
+
+def next_market_open(exchange='NSE', now=None):
+    """Start of the next session after `now` (now itself if a session is in progress; None if none is scheduled)"""
+    now = now or now_ist()
+    is_open, change_at = market_status(exchange, now)
+    return now if is_open else change_at
+
+
+def next_market_close(exchange='NSE', now=None):
+    """End of the session in progress at `now`, or of the next session (None if none is scheduled)"""
+    now = now or now_ist()
+    is_open, change_at = market_status(exchange, now)
+    if is_open or change_at is None:
+        return change_at
+    return market_status(exchange, change_at)[1]
+
+
+def candle_bounds(candle_seconds, exchange='NSE', now=None):
+    """
+    (start, end) of the candle forming at `now` (naive IST, default current time)
+    During a session candles are counted from the session open, as the broker builds them (a 30-minute NSE
+    candle starts at 9:15, 9:45, ...), and the last one ends at the close; outside a session the clock is used.
+    """
+    now = now or now_ist()
+    step = timedelta(seconds=candle_seconds)
+    session = get_session(now, exchange)
+    if session is not None and session[0] <= now < session[1]:
+        start = session[0] + step * ((now - session[0]) // step)
+        return start, min(start + step, session[1])
+    midnight = datetime(now.year, now.month, now.day)
+    start = midnight + step * ((now - midnight) // step)
+    return start, start + step
+
+
+def wait_for_market_open(exchange='NSE', stop_event=None):
+    """
+    Block until the exchange's next session opens, waking only when it does (or when stop_event is set)
+    Returns True once the market is open, False if stop_event was set first
+    """
+    stop_event = stop_event or threading.Event()
+    opens_at = next_market_open(exchange)
+    if opens_at is None:
+        print(f"{exchange}: no session in the next {SESSION_SEARCH_DAYS} days - checking again in {MAX_SCHEDULER_SLEEP // 60} minutes")
+    else:
+        print(f"{exchange} market closed - sleeping until the next open at {opens_at:%Y-%m-%d %H:%M} IST "
+              f"({max(0.0, (opens_at - now_ist()).total_seconds()) / 3600:.1f}h)")
+    while True:
+        if opens_at is not None:
+            remaining = (opens_at - now_ist()).total_seconds()
+            if remaining <= 0:
+                return True
+        else:
+            remaining = MAX_SCHEDULER_SLEEP
+        if stop_event.wait(min(remaining, MAX_SCHEDULER_SLEEP)):
+            return False
+        if opens_at is None:
+            opens_at = next_market_open(exchange)
+
+
+def build_trading_minutes_lookup(exchange, start_date, end_date):
+    """
+    Cumulative trading minutes at the start of each day, covering at least start_date..end_date
+
+    One lookup is cached per exchange. A call for dates outside it rebuilds it over the union of both
+    ranges, so the cache stays one entry per exchange however many ranges are asked for.
+
+    Returns a dict:
+    - base: first date of the lookup (numpy datetime64[D])
+    - day_start: cumulative session minutes before each day (int64 array, one entry per calendar day)
+    - is_trading: whether each day has a session (bool array)
+    - open / close: each day's session bounds in minutes from midnight (int64 arrays, 0/0 without a session)
+
+    Sessions come from get_session, so holidays and special sessions (which override a date's hours, even on
+    a weekend or holiday) count exactly as the scheduler sees them. Cumulative minutes at any timestamp are
+    then day_start[day] + clip(minute_of_day - open[day], 0, close[day] - open[day]): a couple of array
+    indexes per row.
+    """
+    start = np.datetime64(pd.Timestamp(start_date).date(), 'D')
+    end = np.datetime64(pd.Timestamp(end_date).date(), 'D')
+    cached = _trading_lookup_cache.get(exchange)
+    if cached is not None:
+        cached_end = cached['base'] + len(cached['day_start']) - 1
+        if cached['base'] <= start and end <= cached_end:
+            return cached
+        start, end = min(start, cached['base']), max(end, cached_end)
+
+    days = pd.date_range(str(start), str(end), freq='D')
+    opens = np.zeros(len(days), dtype=np.int64)
+    closes = np.zeros(len(days), dtype=np.int64)
+    for i, day in enumerate(days):
+        session = get_session(day.date(), exchange)
+        if session is not None:
+            opens[i] = session[0].hour * 60 + session[0].minute
+            closes[i] = session[1].hour * 60 + session[1].minute
+    minutes_per_day = closes - opens
+    day_start = np.concatenate(([0], np.cumsum(minutes_per_day)[:-1]))
+
+    lookup = {
+        'base': start,
+        'day_start': day_start,
+        'is_trading': minutes_per_day > 0,
+        'open': opens,
+        'close': closes
+    }
+    _trading_lookup_cache[exchange] = lookup
+    return lookup
+
+
+def _cumulative_trading_minutes(lookup, timestamps):
+    """Cumulative trading minutes (from the lookup base) at each naive datetime64 timestamp"""
+    day = timestamps.astype('datetime64[D]')
+    day_index = (day - lookup['base']).astype(np.int64)
+    minute_of_day = (timestamps - day).astype('timedelta64[s]').astype(np.float64) / 60.0
+    open_minute, close_minute = lookup['open'][day_index], lookup['close'][day_index]
+    # Days without a session have open == close == 0, so they add nothing
+    return lookup['day_start'][day_index] + np.clip(minute_of_day - open_minute, 0, close_minute - open_minute)
+
+
+def _naive_ist_dates(dates):
+    """Convert a date column/array to naive IST datetime64[ns] values"""
+    dates = pd.to_datetime(pd.Series(dates))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('Asia/Kolkata').dt.tz_localize(None)
+    return dates.to_numpy(dtype='datetime64[ns]')
+
+
+def compute_time_to_expiry(dates, expiry_date, basis='calendar', exchange='NSE'):
+    """
+    Time to expiry in years for every timestamp in dates (vectorized)
+
+    Parameters:
+    - dates: Series/array of timestamps (naive = IST, or timezone-aware)
+    - expiry_date: Option expiry datetime (naive IST)
+    - basis: 'calendar' (365-day year) or 'trading' (exchange session minutes, 252-day year)
+    - exchange: 'NSE' or 'MCX' (session hours and holidays for the trading basis)
+
+    Returns a float64 numpy array; timestamps at or after expiry give values <= 0.
+    """
+    timestamps = _naive_ist_dates(dates)
+    expiry = pd.Timestamp(expiry_date)
+    if expiry.tzinfo is not None:
+        expiry = expiry.tz_convert('Asia/Kolkata').tz_localize(None)
+    expiry = expiry.to_datetime64().astype('datetime64[ns]')
+
+    if basis != 'trading' or len(timestamps) == 0:
+        return (expiry - timestamps).astype('timedelta64[s]').astype(np.float64) / (365.0 * 24 * 3600)
+
+    exchange = (exchange or 'NSE').upper()
+    # Lookup covers every candle day through expiry (cached, so repeated calls per loop iteration are cheap)
+    start = min(timestamps.min(), expiry).astype('datetime64[D]')
+    end = max(timestamps.max(), expiry).astype('datetime64[D]')
+    lookup = build_trading_minutes_lookup(exchange, str(start), str(end))
+
+    open_minute, close_minute = get_session_minutes(exchange)
+    minutes_per_year = TRADING_DAYS_PER_YEAR * (close_minute - open_minute)
+    expiry_minutes = _cumulative_trading_minutes(lookup, np.array([expiry]))[0]
+    remaining = expiry_minutes - _cumulative_trading_minutes(lookup, timestamps)
+    # Keep expired rows negative like the calendar basis (trading minutes stop counting at expiry)
+    remaining = np.where(timestamps >= expiry, -1.0, remaining)
+    return remaining / minutes_per_year
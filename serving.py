@@ -0,0 +1,82 @@
+"""
+Production WSGI serving for IV Charts application
+Runs the Flask app under waitress (multi-threaded, any OS) or gunicorn (worker processes x threads, Unix)
+with the debugger off, instead of the Werkzeug development server
+"""
+
+# Both servers are optional (pip install waitress / pip install gunicorn)
+try:
+    import waitress
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    GUNICORN_AVAILABLE = False
+
+SERVE_MODES = ('dev', 'production')
+# Every open chart holds one thread in an /api/poll long-poll (up to main.POLL_MAX_TIMEOUT = 30 s), so
+# the thread count bounds the number of live charts per process; 32 leaves room for ~24 charts plus
+# their history and status requests
+DEFAULT_THREADS = 32
+DEFAULT_WORKERS = 1
+
+
+if GUNICORN_AVAILABLE:
+    class GunicornServer(BaseApplication):
+        """Embedded gunicorn: serves an already-imported app with the given settings"""
+
+        def __init__(self, app, options):
+            self.application = app
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+
+def pick_server(workers):
+    """'gunicorn' or 'waitress' for the requested worker count, or None if neither is installed"""
+    if workers > 1 and GUNICORN_AVAILABLE:
+        return 'gunicorn'
+    if WAITRESS_AVAILABLE:
+        return 'waitress'
+    if GUNICORN_AVAILABLE:
+        return 'gunicorn'
+    return None
+
+
+def serve_production(app, host, port, threads=DEFAULT_THREADS, workers=DEFAULT_WORKERS, post_fork=None):
+    """
+    Serve app on host:port until interrupted
+    - waitress: one process with `threads` request threads (workers > 1 needs gunicorn)
+    - gunicorn: `workers` processes with `threads` threads each (gthread worker); post_fork(), if given,
+      runs in each worker after the fork (threads started at import do not survive it)
+    Falls back to the Werkzeug server (threaded, debugger off) when neither is installed
+    """
+    server = pick_server(workers)
+    if workers > 1 and server != 'gunicorn':
+        print(f"⚠ {workers} workers need gunicorn (pip install gunicorn, Unix only) - serving with 1 process")
+    if server == 'gunicorn':
+        print(f"✓ Production server: gunicorn, {workers} worker(s) x {threads} threads on http://{host}:{port}")
+        GunicornServer(app, {
+            'bind': f"{host}:{port}",
+            'workers': workers,
+            'threads': threads,
+            'worker_class': 'gthread',
+            'timeout': 120,  # /api/poll long-polls hold a thread for up to 30 s
+            'post_fork': (lambda server, worker: post_fork()) if post_fork else (lambda server, worker: None)
+        }).run()
+    elif server == 'waitress':
+        print(f"✓ Production server: waitress, {threads} threads on http://{host}:{port}")
+        waitress.serve(app, host=host, port=port, threads=threads)
+    else:
+        print("⚠ Neither waitress nor gunicorn is installed (pip install waitress) - using the Werkzeug server without debug")
+        app.run(debug=False, host=host, port=port, threaded=True, use_reloader=False)
@@ -0,0 +1,281 @@
+"""
+Shared-memory IV series for IV Charts application
+The collector process publishes each in-memory chart series into a multiprocessing.shared_memory segment;
+web worker processes map the segments and serve the latest points without disk I/O or IPC copies
+
+Segment layout (little-endian, one segment per symbol, named SEGMENT_PREFIX + a hash of the symbol):
+- Header, 40 bytes: magic 'IVS1', layout version (uint16), state (uint16, 1 = retired: re-open by name),
+  capacity (uint64 rows), length (uint64 rows), sequence (uint64), generation (uint64, random per segment)
+- ts: int64[capacity] chart-time epoch seconds (IST wallclock read as UTC, as in chart_encoding)
+- One float64[capacity] block per COLUMNS entry; missing values are NaN
+
+The sequence is a seqlock: the writer makes it odd before changing rows and even again after, so a reader
+that sees the same even sequence before and after copying has a consistent snapshot; sequence / 2 is the
+series version. A segment that has to grow is retired and replaced by a larger one under the same name; its
+sequence starts again from 0, so readers identify a series state by (generation, version), never version alone.
+
+shared_memory has no read-only attach, so readers only ever wrap the buffer in non-writeable numpy views.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import numpy as np
+from chart_encoding import chart_times
+
+# multiprocessing.shared_memory needs Python 3.8+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+SEGMENT_PREFIX = 'ivs_'
+SEGMENT_MAGIC = b'IVS1'
+SEGMENT_VERSION = 2
+SEGMENT_HEADER = struct.Struct('<4sHHQQQQ')
+STATE_LIVE = 0
+STATE_RETIRED = 1
+MIN_CAPACITY = 4096  # Rows; capacity doubles as a series grows
+
+# Chart payload lists stored next to the timestamps, in block order
+COLUMNS = ('iv_values', 'close_prices', 'fclose_prices', 'strikes')
+READ_RETRIES = 100  # Seqlock retries before a read gives up (a write is a few memcpys)
+
+
+def segment_name(symbol):
+    """Shared memory name for a symbol (short: some platforms limit names to ~30 characters)"""
+    return SEGMENT_PREFIX + hashlib.sha1(symbol.encode('utf-8')).hexdigest()[:20]
+
+
+def segment_size(capacity):
+    return SEGMENT_HEADER.size + 8 * capacity * (1 + len(COLUMNS))
+
+
+def _views(buf, capacity, readonly=False):
+    """(ts, {column: values}) numpy views over a segment's row blocks"""
+    offset = SEGMENT_HEADER.size
+    ts = np.ndarray(capacity, dtype='<i8', buffer=buf, offset=offset)
+    columns = {}
+    for index, key in enumerate(COLUMNS):
+        columns[key] = np.ndarray(capacity, dtype='<f8', buffer=buf, offset=offset + 8 * capacity * (index + 1))
+    if readonly:
+        for view in (ts, *columns.values()):
+            view.flags.writeable = False
+    return ts, columns
+
+
+def _attach(name):
+    """Attach to an existing segment without handing it to this process's resource tracker"""
+    try:
+        segment = shared_memory.SharedMemory(name=name, create=False, track=False)  # Python 3.13+
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name, create=False)
+        # Older versions register attached segments too and would unlink the collector's segment on exit
+        try:
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+    return segment
+
+
+def _float_column(values, count):
+    """Payload list -> float64 array of count values (None -> NaN, missing/short list -> NaN)"""
+    if not isinstance(values, list) or len(values) != count:
+        return np.full(count, np.nan)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class SharedSeriesWriter:
+    """Collector side: publishes chart payloads into per-symbol segments"""
+
+    def __init__(self):
+        self.segments = {}  # symbol -> SharedMemory
+        self.lengths = {}   # symbol -> rows published
+        self.lock = threading.Lock()  # Trackers publish from their own threads
+
+    def _create(self, symbol, rows):
+        capacity = MIN_CAPACITY
+        while capacity < rows:
+            capacity *= 2
+        self._retire(symbol)
+        name = segment_name(symbol)
+        try:
+            segment = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+        except FileExistsError:
+            # Left behind by a collector that did not exit cleanly
+            stale = shared_memory.SharedMemory(name=name, create=False)
+            stale.close()
+            stale.unlink()
+            segment = shared_memory.SharedMemory(name=name, create=True, size=segment_size(capacity))
+        generation = int.from_bytes(os.urandom(8), 'little')
+        SEGMENT_HEADER.pack_into(segment.buf, 0, SEGMENT_MAGIC, SEGMENT_VERSION, STATE_LIVE, capacity, 0, 0, generation)
+        self.segments[symbol] = segment
+        self.lengths[symbol] = 0
+        return segment
+
+    def _retire(self, symbol):
+        segment = self.segments.pop(symbol, None)
+        self.lengths.pop(symbol, None)
+        if segment is None:
+            return
+        magic, version, _, capacity, length, sequence, generation = SEGMENT_HEADER.unpack_from(segment.buf, 0)
+        SEGMENT_HEADER.pack_into(segment.buf, 0, magic, version, STATE_RETIRED, capacity, length, sequence, generation)
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def publish(self, symbol, payload, from_index=0):
+        """
+        Write a chart payload's rows into the symbol's segment
+        from_index: first row that may have changed (rows before it are already published and unchanged)
+        """
+        with self.lock:
+            self._publish(symbol, payload, from_index)
+
+    def _publish(self, symbol, payload, from_index):
+        timestamps = payload.get('timestamps') or []
+        count = len(timestamps)
+        segment = self.segments.get(symbol)
+        if segment is None or SEGMENT_HEADER.unpack_from(segment.buf, 0)[3] < count:
+            segment = self._create(symbol, count)
+            from_index = 0
+        start = max(0, min(from_index, self.lengths[symbol], count))
+
+        _, _, _, capacity, _, sequence, generation = SEGMENT_HEADER.unpack_from(segment.buf, 0)
+        ts, columns = _views(segment.buf, capacity)
+        # Odd sequence while rows change (readers retry), even again once length and rows agree
+        SEGMENT_HEADER.pack_into(segment.buf, 0, SEGMENT_MAGIC, SEGMENT_VERSION, STATE_LIVE, capacity, self.lengths[symbol],
+                                 sequence + 1, generation)
+        ts[start:count] = chart_times(timestamps[start:])
+        for key in COLUMNS:
+            values = payload.get(key)
+            columns[key][start:count] = _float_column(values[start:] if isinstance(values, list) and len(values) == count else None,
+                                                      count - start)
+        SEGMENT_HEADER.pack_into(segment.buf, 0, SEGMENT_MAGIC, SEGMENT_VERSION, STATE_LIVE, capacity, count, sequence + 2, generation)
+        self.lengths[symbol] = count
+
+    def drop(self, symbol=None):
+        """Remove one symbol's segment (or all of them)"""
+        with self.lock:
+            for stored_symbol in ([symbol] if symbol is not None else list(self.segments)):
+                self._retire(stored_symbol)
+
+    def close(self):
+        self.drop()
+
+
+class SharedSeriesReader:
+    """Web worker side: maps the collector's segments and builds chart payloads from them"""
+
+    def __init__(self):
+        self.segments = {}  # symbol -> SharedMemory
+        self.cache = {}     # symbol -> ((generation, version), ts, columns, payload) of the last payload built
+        self.lock = threading.Lock()  # Request threads and the viewer's watcher share the cache
+
+    def _segment(self, symbol):
+        segment = self.segments.get(symbol)
+        if segment is not None and SEGMENT_HEADER.unpack_from(segment.buf, 0)[2] == STATE_RETIRED:
+            self._release(symbol)
+            segment = None
+        if segment is None:
+            try:
+                segment = _attach(segment_name(symbol))
+            except FileNotFoundError:
+                return None
+            magic, layout = SEGMENT_HEADER.unpack_from(segment.buf, 0)[:2]
+            if magic != SEGMENT_MAGIC or layout != SEGMENT_VERSION:
+                segment.close()
+                return None
+            self.segments[symbol] = segment
+        return segment
+
+    def _release(self, symbol):
+        self.cache.pop(symbol, None)  # Versions restart in a replacement segment
+        segment = self.segments.pop(symbol, None)
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:
+                pass  # A view is still alive; the mapping goes when it does
+
+    def version(self, symbol):
+        """
+        Published (generation, version) of a symbol's series, or None if the collector has no segment for it
+        The generation changes whenever the segment is replaced (and its version restarts)
+        """
+        segment = self._segment(symbol)
+        if segment is None:
+            return None
+        header = SEGMENT_HEADER.unpack_from(segment.buf, 0)
+        return header[6], header[5] // 2
+
+    def snapshot(self, symbol):
+        """Consistent ((generation, version), ts, {column: values}) copy of a symbol's rows, or None"""
+        for _ in range(READ_RETRIES):
+            segment = self._segment(symbol)
+            if segment is None:
+                return None
+            _, _, state, capacity, length, before, generation = SEGMENT_HEADER.unpack_from(segment.buf, 0)
+            if before % 2 or state == STATE_RETIRED:
+                continue
+            ts, columns = _views(segment.buf, capacity, readonly=True)
+            ts = ts[:length].copy()
+            columns = {key: values[:length].copy() for key, values in columns.items()}
+            if SEGMENT_HEADER.unpack_from(segment.buf, 0)[5] == before:
+                return (generation, before // 2), ts, columns
+        return None
+
+    def payload(self, symbol):
+        """
+        Chart payload for a symbol from shared memory, or (None, False) if there is no segment
+        Returns (payload, changed); only rows that differ from the last payload built are reformatted
+        """
+        with self.lock:
+            return self._payload(symbol)
+
+    def _payload(self, symbol):
+        version = self.version(symbol)  # First: it may find the segment retired and drop the cache
+        if version is None:
+            return None, False
+        cached = self.cache.get(symbol)
+        if cached is not None and cached[0] == version:
+            return cached[3], False
+        snapshot = self.snapshot(symbol)
+        if snapshot is None:
+            return (cached[3], False) if cached else (None, False)
+        version, ts, columns = snapshot
+
+        # First row that changed since the cached payload (appends and a rewritten last candle are the usual case)
+        keep = 0
+        if cached is not None:
+            _, old_ts, old_columns, _ = cached
+            common = min(len(old_ts), len(ts))
+            same = old_ts[:common] == ts[:common]
+            for key in COLUMNS:
+                old, new = old_columns[key][:common], columns[key][:common]
+                same &= (old == new) | (np.isnan(old) & np.isnan(new))
+            keep = common if same.all() else int(np.argmin(same))
+
+        previous = cached[3] if cached is not None else {}
+        tail_times = np.datetime_as_string(ts[keep:].astype('datetime64[s]'), unit='s')
+        payload = {
+            'timestamps': previous.get('timestamps', [])[:keep] + [t + '+05:30' for t in tail_times],
+            'iv_values': previous.get('iv_values', [])[:keep] + np.nan_to_num(columns['iv_values'][keep:], nan=0.0).tolist()
+        }
+        for key in ('close_prices', 'fclose_prices', 'strikes'):
+            payload[key] = previous.get(key, [None] * keep)[:keep] + [None if v != v else v for v in columns[key][keep:].tolist()]
+        if np.isnan(columns['strikes']).all():
+            payload.pop('strikes')
+        self.cache[symbol] = (version, ts, columns, payload)
+        return payload, True
+
+    def close(self):
+        """Unmap every segment (e.g. when a new collector process has started)"""
+        with self.lock:
+            for symbol in list(self.segments):
+                self._release(symbol)
+            self.cache.clear()
@@ -0,0 +1,278 @@
+// Chart payload parsing shared by the page (tradingview-chart.js) and the chart data worker (chart-worker.js)
+// Everything here is pure data work with no DOM access, so the worker can importScripts() it
+
+// Series order of the binary payload's series mask (same as SERIES in chart_encoding.py)
+const CHART_BINARY_SERIES = ['iv_values', 'close_prices', 'fclose_prices', 'strikes', 'iv_open', 'iv_high', 'iv_low'];
+
+// Helper function to convert timestamp string to Unix timestamp
+// Timestamps from backend are in IST format: "2025-11-13T15:29:00+05:30" or "2025-11-13 15:29:00"
+// CSV timestamps are correct IST times - we need to display them as IST on the chart
+// LightweightCharts displays times in browser's local timezone, so we adjust the Unix timestamp
+// so that when displayed, it shows the IST time from CSV
+function convertToIST(timestamp) {
+    try {
+        if (typeof timestamp === 'string') {
+            // Extract IST time components from CSV timestamp
+            // Backend sends: "2025-12-01T17:30:00+05:30" (IST time with timezone indicator)
+            let csvYear, csvMonth, csvDay, csvHour, csvMinute, csvSecond;
+            
+            // Parse timestamp string to extract date/time components (before timezone)
+            // Remove timezone info first to get clean timestamp
+            let cleanTimestamp = timestamp.replace(/[+-]\d{2}:\d{2}$/, '').trim();
+            const match = cleanTimestamp.match(/(\d{4})-(\d{2})-(\d{2})[\sT](\d{2}):(\d{2}):(\d{2})/);
+            
+            if (!match) {
+                return null;
+            }
+            
+            [, csvYear, csvMonth, csvDay, csvHour, csvMinute, csvSecond] = match;
+            
+            const yearInt = parseInt(csvYear);
+            const monthInt = parseInt(csvMonth) - 1; // Month is 0-indexed
+            const dayInt = parseInt(csvDay);
+            const hourInt = parseInt(csvHour);
+            const minuteInt = parseInt(csvMinute);
+            const secondInt = parseInt(csvSecond || 0);
+            
+            // CSV has IST time (e.g., 17:30:00 IST)
+            // We want chart to display: 17:30:00 (matching CSV)
+            // Chart library displays Unix timestamps in browser's local timezone
+            
+            // Simple strategy: Treat CSV IST time as UTC time for the Unix timestamp
+            // This makes the chart display the CSV time directly, regardless of browser timezone
+            // Example: CSV "17:30:00 IST" -> Create Unix timestamp for "17:30:00 UTC"
+            // - Browser in UTC: displays "17:30:00" ✓ (matches CSV)
+            // - Browser in IST: displays "23:00:00" (17:30 + 5:30) - but we want 17:30
+            //
+            // To handle IST browsers: We need to subtract 5:30 so it displays as IST time
+            // But we want to show IST time, so if browser is IST, we use actual UTC (which displays as IST)
+            
+            // Always treat CSV IST time as UTC for the Unix timestamp
+            // This makes chart display CSV time directly in UTC browsers
+            // For IST browsers, we'll adjust below
+            const istAsUTC = new Date(Date.UTC(yearInt, monthInt, dayInt, hourInt, minuteInt, secondInt));
+            
+            // Get browser's timezone offset (in minutes, positive = behind UTC)
+            // IST is UTC+5:30, so IST offset is -330 minutes
+            const browserOffsetMinutes = new Date().getTimezoneOffset();
+            const istOffsetMinutes = -330;
+            
+            // Check if browser is in IST (within 10 minutes tolerance for DST, etc.)
+            const isISTBrowser = Math.abs(browserOffsetMinutes - istOffsetMinutes) < 10;
+            
+            // Debug logging for first few conversions
+            const shouldLog = yearInt === 2025 && monthInt === 11 && dayInt === 1 && hourInt >= 17;
+            
+            if (shouldLog) {
+                console.log(`[convertToIST] Input: ${timestamp}, Extracted: ${yearInt}-${monthInt+1}-${dayInt} ${hourInt}:${minuteInt}:${secondInt}`);
+                console.log(`[convertToIST] Browser offset: ${browserOffsetMinutes}, IST offset: ${istOffsetMinutes}, Is IST browser: ${isISTBrowser}`);
+            }
+            
+            // The chart appears to display Unix timestamps in UTC (based on evidence: showing 12:07 instead of 17:35)
+            // We want to display the CSV IST time directly
+            // Strategy: Always use CSV IST time as UTC timestamp
+            // CSV 17:30 IST -> timestamp for 17:30 UTC -> chart displays as 17:30 ✓
+            // This works regardless of browser timezone if chart displays in UTC
+            
+            const unixTs = Math.floor(istAsUTC.getTime() / 1000);
+            if (shouldLog) {
+                const displayDate = new Date(unixTs * 1000);
+                console.log(`[convertToIST] Using CSV IST time as UTC: ${unixTs} (${displayDate.toUTCString()}), chart should display: ${displayDate.toUTCString().match(/\d{2}:\d{2}:\d{2}/)?.[0]}`);
+            }
+            return unixTs;
+            
+        } else if (typeof timestamp === 'number') {
+            // If it's already a Unix timestamp, return as-is (Unix timestamps are timezone-agnostic)
+            return timestamp > 10000000000 ? Math.floor(timestamp / 1000) : timestamp;
+        }
+        return null;
+    } catch (e) {
+        console.warn('Error converting timestamp:', timestamp, e);
+        return null;
+    }
+}
+
+/**
+ * Decode a binary chart payload (layout in chart_encoding.py) into the same shape as the JSON payload
+ * timestamps are chart-time epoch seconds (what convertToIST returns for the ISO strings), series are typed arrays
+ * @param {ArrayBuffer} buffer - Response body
+ * @param {string|null} metaHeader - X-IV-Meta response header (JSON of the non-list payload keys)
+ */
+function decodeChartPayload(buffer, metaHeader) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+    if (magic !== 'IVB1') {
+        throw new Error(`Unknown chart payload format: ${magic}`);
+    }
+    const flags = view.getUint16(6, true);
+    const count = view.getUint32(8, true);
+    const mask = view.getUint32(12, true);
+    const base = Number(view.getBigInt64(16, true));
+    const align8 = (length) => Math.ceil(length / 8) * 8;
+    let offset = 24;
+    
+    const deltas = new Int32Array(buffer, offset, count);
+    offset += align8(count * 4);
+    const timestamps = new Float64Array(count);
+    let time = base;
+    for (let i = 0; i < count; i++) {
+        time += deltas[i];
+        timestamps[i] = time;
+    }
+    
+    const ValueArray = (flags & 1) ? Float32Array : Float64Array;
+    const data = metaHeader ? JSON.parse(metaHeader) : {};
+    data.timestamps = timestamps;
+    CHART_BINARY_SERIES.forEach((key, bit) => {
+        if (mask & (1 << bit)) {
+            data[key] = new ValueArray(buffer, offset, count);
+            offset += align8(count * ValueArray.BYTES_PER_ELEMENT);
+        } else if (!(key in data)) {
+            data[key] = [];
+        }
+    });
+    return data;
+}
+
+/**
+ * Convert a JSON payload's ISO timestamps to chart-time epoch seconds (what the binary payload carries),
+ * so windows, pages and deltas from either encoding can be compared and merged
+ */
+function normalizeChartTimes(data) {
+    if (data && Array.isArray(data.timestamps) && data.timestamps.length > 0 && typeof data.timestamps[0] === 'string') {
+        data.timestamps = data.timestamps.map(convertToIST);
+    }
+    return data;
+}
+
+// Parse a numeric series value (null/undefined/unparseable -> NaN)
+function toChartNumber(value) {
+    if (typeof value === 'number') {
+        return value;
+    }
+    return value === null || value === undefined ? NaN : parseFloat(value);
+}
+
+/**
+ * Validate a chart payload and turn it into ready-to-plot typed arrays
+ * Converts timestamps, drops invalid/duplicate points, sorts by time, keeps the latest maxRecords points
+ * and trims a flat trailing segment - the checks ChartUpdateManager used to run point by point on the UI thread
+ * @param {Object} data - Payload (timestamps, iv_values, close_prices, fclose_prices; plain or typed arrays)
+ * @param {number} maxRecords - Display limit (Max Candles)
+ * @returns {Object} { time, iv, close, fclose } Float64Arrays (missing prices are NaN) plus inputPoints
+ */
+function prepareChartArrays(data, maxRecords) {
+    if (!data || !data.timestamps || !data.iv_values) {
+        throw new Error('Invalid data structure: missing timestamps or iv_values');
+    }
+    const count = data.timestamps.length;
+    if (count !== data.iv_values.length) {
+        throw new Error(`Data length mismatch: ${count} timestamps vs ${data.iv_values.length} IV values`);
+    }
+    
+    const times = new Float64Array(count);
+    let rows = [];
+    const seenTimes = new Set(); // Track duplicates (the first point for a time is kept)
+    for (let index = 0; index < count; index++) {
+        const timestamp = data.timestamps[index];
+        if (!timestamp && timestamp !== 0) {
+            continue;
+        }
+        const time = convertToIST(timestamp);
+        if (!time || isNaN(time) || time <= 0 || seenTimes.has(time)) {
+            continue;
+        }
+        // Allow 0 and positive IV values
+        const iv = toChartNumber(data.iv_values[index]);
+        if (isNaN(iv) || iv < 0) {
+            continue;
+        }
+        seenTimes.add(time);
+        times[index] = time;
+        rows.push(index);
+    }
+    
+    // Sort by time and keep only the latest records for display
+    rows.sort((a, b) => times[a] - times[b]);
+    if (maxRecords > 0 && rows.length > maxRecords) {
+        rows = rows.slice(rows.length - maxRecords);
+    }
+    
+    // Remove flat trailing segments (consecutive same values at end)
+    let length = rows.length;
+    if (length > 2) {
+        const lastValue = toChartNumber(data.iv_values[rows[length - 1]]);
+        let trailingFlatCount = 0;
+        for (let i = length - 2; i >= 0; i--) {
+            if (Math.abs(toChartNumber(data.iv_values[rows[i]]) - lastValue) < 0.0001) {
+                trailingFlatCount++;
+            } else {
+                break;
+            }
+        }
+        if (trailingFlatCount > 0 && trailingFlatCount < length) {
+            length -= trailingFlatCount;
+        }
+    }
+    if (length === 0) {
+        throw new Error(`No valid data points after validation (${count} input points)`);
+    }
+    
+    const closes = data.close_prices && data.close_prices.length === count ? data.close_prices : null;
+    const fcloses = data.fclose_prices && data.fclose_prices.length === count ? data.fclose_prices : null;
+    const prepared = {
+        time: new Float64Array(length),
+        iv: new Float64Array(length),
+        close: new Float64Array(length),
+        fclose: new Float64Array(length),
+        inputPoints: count
+    };
+    for (let i = 0; i < length; i++) {
+        const index = rows[i];
+        prepared.time[i] = times[index];
+        prepared.iv[i] = toChartNumber(data.iv_values[index]);
+        prepared.close[i] = closes ? toChartNumber(closes[index]) : NaN;
+        prepared.fclose[i] = fcloses ? toChartNumber(fcloses[index]) : NaN;
+    }
+    return prepared;
+}
+
+// Parse a JSON response body (ArrayBuffer)
+function parseChartJson(buffer) {
+    return JSON.parse(new TextDecoder().decode(buffer));
+}
+
+// Typed array buffers in a task result, so the worker can transfer them instead of copying
+function chartTransferables(value, buffers = new Set()) {
+    if (ArrayBuffer.isView(value)) {
+        buffers.add(value.buffer);
+    } else if (value && typeof value === 'object') {
+        Object.values(value).forEach(item => chartTransferables(item, buffers));
+    }
+    return Array.from(buffers);
+}
+
+/**
+ * Run one chart data task - in the worker, or on the main thread when workers are unavailable
+ * - decode:  { buffer, binary, meta } response body -> chart payload (timestamps as chart-time epoch seconds)
+ * - poll:    { buffer } /api/poll response body -> poll result with result.data converted like decode
+ * - prepare: { payload, maxRecords } -> prepareChartArrays() typed arrays
+ */
+function runChartTask(type, message) {
+    if (type === 'decode') {
+        return message.binary
+            ? decodeChartPayload(message.buffer, message.meta)
+            : normalizeChartTimes(parseChartJson(message.buffer));
+    }
+    if (type === 'poll') {
+        const result = parseChartJson(message.buffer);
+        if (result && result.data) {
+            normalizeChartTimes(result.data);
+        }
+        return result;
+    }
+    if (type === 'prepare') {
+        return prepareChartArrays(message.payload, message.maxRecords);
+    }
+    throw new Error(`Unknown chart task: ${type}`);
+}
@@ -0,0 +1,14 @@
+// Chart data worker: parses chart responses and prepares plot arrays off the UI thread
+// Messages are { id, type, message } (task types in runChartTask), replies { id, result } or { id, error }
+// Typed arrays in a result are transferred, not copied
+importScripts('chart-data.js');
+
+self.onmessage = (event) => {
+    const { id, type, message } = event.data;
+    try {
+        const result = runChartTask(type, message);
+        self.postMessage({ id, result }, chartTransferables(result));
+    } catch (error) {
+        self.postMessage({ id, error: error.message || String(error) });
+    }
+};
@@ -1,11 +1,35 @@
 // TradingView Lightweight Charts implementation
 let chart = null;
 let series = null;
-let fetchInterval = null;
+let pollState = null; // Long-poll loop state (see startPollingIVData)
 // Store full data for crosshair tooltip (IV, option price, underlying price by timestamp)
 let chartDataMap = new Map(); // Maps timestamp (Unix seconds) to {iv, optionPrice, underlyingPrice}
 // Track current symbol to detect symbol changes
 let currentSymbol = null;
+// Lazy history loading: polls fetch only the latest CHART_INITIAL_POINTS points, older history is
+// fetched CHART_PAGE_POINTS at a time from /api/get_iv_page when the user scrolls past the left edge
+const CHART_INITIAL_POINTS = 2000;
+const CHART_PAGE_POINTS = 2000;
+const CHART_SCROLLBACK_THRESHOLD = 20; // Load the next page when fewer bars than this are left of the view
+const CHART_SERIES_KEYS = ['timestamps', 'iv_values', 'close_prices', 'fclose_prices'];
+let chartHistory = { symbol: null, older: null, latest: null, merged: null, latestEtag: null, oldest: null, hasMore: true, loading: false, version: null, epoch: null };
+// IndexedDB cache of each symbol's history with the server store version/epoch it matches (see CLIENT HISTORY CACHE)
+const CHART_CACHE_DB = 'iv-charts';
+const CHART_CACHE_STORE = 'series';
+const CHART_CACHE_MAX_POINTS = 50000; // Latest points kept per symbol
+const CHART_CACHE_SAVE_MS = 10000; // Minimum time between saves
+let chartCache = { db: null, saveTimer: null, lastSave: 0 };
+// Request chart series in the binary encoding (typed arrays, no timestamp string parsing); JSON if false
+const CHART_BINARY_PAYLOAD = true;
+const CHART_BINARY_MIMETYPE = 'application/octet-stream';
+// Long-poll: how long the server may hold /api/poll open, and the wait before retrying after an error
+const POLL_TIMEOUT_SECONDS = 25;
+const POLL_RETRY_MS = 1000;
+// Web Worker that parses responses and prepares plot arrays (chart-worker.js); falls back to the main thread
+const CHART_WORKER_URL = '/static/js/chart-worker.js';
+let chartWorker = null; // Worker instance, false once it failed (or workers are unsupported)
+const chartWorkerTasks = new Map(); // Pending task id -> { type, message, resolve, reject }
+let chartWorkerNextId = 1;
 
 // ============================================================================
 // CENTRALIZED CHART UPDATE MANAGER - Prevents race conditions and breaks
@@ -18,6 +42,8 @@ class ChartUpdateManager {
         this.currentSymbol = null;
         this.lastValidData = null; // Keep last valid data as fallback
         this.updateLock = false;
+        this.renderedData = []; // Local copy of the points currently in the series (for incremental updates)
+        this.renderScheduled = false;
     }
     
     /**
@@ -36,17 +62,33 @@ class ChartUpdateManager {
             await this.wait(300); // Wait for reset to complete
         }
         
-        // Add to queue
+        // Add to queue and render on the next animation frame
         this.updateQueue.push({ symbol, data, source, timestamp: Date.now() });
-        
-        // Process queue if not already processing
-        if (!this.isProcessing) {
+        this.scheduleRender();
+    }
+    
+    /**
+     * Process the queue on the next animation frame, so updates arriving within one frame are rendered once
+     */
+    scheduleRender() {
+        if (this.renderScheduled) {
+            return;
+        }
+        this.renderScheduled = true;
+        const run = () => {
+            this.renderScheduled = false;
             this.processQueue();
+        };
+        if (typeof requestAnimationFrame === 'function') {
+            requestAnimationFrame(run);
+        } else {
+            setTimeout(run, 16);
         }
     }
     
     /**
-     * Process the update queue sequentially
+     * Process the update queue
+     * Every queued update carries the full window to show, so only the newest one is rendered
      */
     async processQueue() {
         if (this.isProcessing || this.updateQueue.length === 0) {
@@ -57,7 +99,11 @@ class ChartUpdateManager {
         console.log(`[ChartManager] Processing queue with ${this.updateQueue.length} updates`);
         
         while (this.updateQueue.length > 0) {
-            const update = this.updateQueue.shift();
+            const update = this.updateQueue[this.updateQueue.length - 1];
+            if (this.updateQueue.length > 1) {
+                console.log(`[ChartManager] Coalesced ${this.updateQueue.length - 1} queued update(s) into one render`);
+            }
+            this.updateQueue = [];
             
             try {
                 // Skip if symbol changed while in queue (but allow if currentSymbol is null - first load)
@@ -86,146 +132,68 @@ class ChartUpdateManager {
         
         this.isProcessing = false;
         console.log(`[ChartManager] Queue processing complete`);
+        
+        // Updates queued while rendering go out with the next frame
+        if (this.updateQueue.length > 0) {
+            this.scheduleRender();
+        }
     }
     
     /**
-     * Validate and prepare chart data
+     * Index of the first point that differs between the rendered series and new chart data
+     * (the length of the shorter one if one is a prefix of the other)
      */
-    validateAndPrepareData(data) {
-        if (!data || !data.timestamps || !data.iv_values) {
-            throw new Error('Invalid data structure: missing timestamps or iv_values');
-        }
-        
-        if (data.timestamps.length !== data.iv_values.length) {
-            throw new Error(`Data length mismatch: ${data.timestamps.length} timestamps vs ${data.iv_values.length} IV values`);
-        }
-        
-        const chartData = [];
-        const dataMap = new Map();
-        const seenTimes = new Set(); // Track duplicates
-        
-        for (let index = 0; index < data.timestamps.length; index++) {
-            const timestamp = data.timestamps[index];
-            const ivValue = data.iv_values[index];
-            
-            // Validate timestamp
-            if (!timestamp && timestamp !== 0) {
-                continue;
-            }
-            
-            // Convert timestamp
-            let time;
-            try {
-                // Log first and last few timestamps for debugging
-                if (index < 3 || index >= data.timestamps.length - 3) {
-                    console.log(`[ChartManager] Converting timestamp ${index}: "${timestamp}"`);
-                }
-                time = convertToIST(timestamp);
-                if (!time || isNaN(time) || time <= 0) {
-                    if (index < 3 || index >= data.timestamps.length - 3) {
-                        console.warn(`[ChartManager] Invalid converted time at index ${index}: ${time}`);
-                    }
-                    continue;
-                }
-                // Log converted time for first and last few
-                if (index < 3 || index >= data.timestamps.length - 3) {
-                    const convertedDate = new Date(time * 1000);
-                    console.log(`[ChartManager] Converted to Unix: ${time}, displays as: ${convertedDate.toLocaleString()}`);
-                }
-            } catch (e) {
-                console.error(`[ChartManager] Error converting timestamp at index ${index}:`, e);
-                continue;
-            }
-            
-            // Skip duplicates (keep last one)
-            if (seenTimes.has(time)) {
-                continue;
-            }
-            seenTimes.add(time);
-            
-            // Validate IV value (allow 0 and positive values)
-            const parsedIv = parseFloat(ivValue);
-            if (isNaN(parsedIv) || parsedIv < 0) {
-                console.warn(`[ChartManager] Skipping invalid IV value at index ${index}: ${ivValue}`);
-                continue;
-            }
-            
-            // Log first few valid IV values for debugging
-            if (index < 3) {
-                console.log(`[ChartManager] Valid IV value at index ${index}: ${parsedIv}%`);
+    firstChangedIndex(rendered, chartData) {
+        const length = Math.min(rendered.length, chartData.length);
+        for (let i = 0; i < length; i++) {
+            if (rendered[i].time !== chartData[i].time || rendered[i].value !== chartData[i].value) {
+                return i;
             }
-            
-            // Get option and underlying prices
-            const optionPrice = data.close_prices && data.close_prices[index] !== undefined 
-                ? parseFloat(data.close_prices[index]) : null;
-            const underlyingPrice = data.fclose_prices && data.fclose_prices[index] !== undefined 
-                ? parseFloat(data.fclose_prices[index]) : null;
-            
-            // Store in data map for crosshair
-            dataMap.set(time, {
-                iv: parsedIv,
-                optionPrice: optionPrice,
-                underlyingPrice: underlyingPrice
-            });
-            
-            chartData.push({
-                time: time,
-                value: parsedIv
-            });
         }
-        
-        // Sort by time
-        chartData.sort((a, b) => a.time - b.time);
-        
-        // Limit to latest records for chart display (read from UI)
-        const maxCandlesInput = document.getElementById('maxCandles');
-        const MAX_CHART_RECORDS = maxCandlesInput ? parseInt(maxCandlesInput.value) || 50000 : 50000;
-        
-        if (chartData.length > MAX_CHART_RECORDS) {
-            // Keep only the latest records
-            const startIndex = chartData.length - MAX_CHART_RECORDS;
-            chartData = chartData.slice(startIndex);
-            
-            // Also update dataMap to only include the latest records
-            const latestTimes = new Set(chartData.map(d => d.time));
-            const filteredDataMap = new Map();
-            for (const [time, value] of dataMap.entries()) {
-                if (latestTimes.has(time)) {
-                    filteredDataMap.set(time, value);
-                }
-            }
-            dataMap = filteredDataMap;
-            
-            console.log(`[ChartManager] Limited chart display to latest ${MAX_CHART_RECORDS} records (from ${data.timestamps.length} total)`);
+        return length;
+    }
+    
+    /**
+     * Index to series.update() from when chartData only changes the last rendered point's value and/or
+     * appends newer points (what series.update supports), otherwise -1 (full setData needed)
+     */
+    incrementalStartIndex(chartData) {
+        const rendered = this.renderedData;
+        if (rendered.length === 0 || chartData.length < rendered.length) {
+            return -1;
         }
-        
-        // Remove flat trailing segments (consecutive same values at end)
-        if (chartData.length > 2) {
-            const lastValue = chartData[chartData.length - 1].value;
-            let trailingFlatCount = 0;
-            for (let i = chartData.length - 2; i >= 0; i--) {
-                if (Math.abs(chartData[i].value - lastValue) < 0.0001) {
-                    trailingFlatCount++;
-                } else {
-                    break;
-                }
-            }
-            if (trailingFlatCount > 0 && trailingFlatCount < chartData.length) {
-                chartData.splice(-trailingFlatCount);
-            }
+        const changedFrom = this.firstChangedIndex(rendered, chartData);
+        if (changedFrom < rendered.length - 1) {
+            return -1;
+        }
+        if (changedFrom === rendered.length - 1 && chartData[changedFrom].time !== rendered[changedFrom].time) {
+            return -1; // Last point replaced by a different time
         }
+        return changedFrom;
+    }
+    
+    /**
+     * Validate and prepare chart data
+     * Parsing, timestamp conversion and filtering run in the chart worker (prepareChartArrays in chart-data.js);
+     * this only wraps the returned typed arrays as series points and the crosshair data map
+     */
+    async validateAndPrepareData(data) {
+        const maxCandlesInput = document.getElementById('maxCandles');
+        const maxRecords = maxCandlesInput ? parseInt(maxCandlesInput.value) || 50000 : 50000;
+        const { time, iv, close, fclose, inputPoints } = await runInChartWorker('prepare', { payload: data, maxRecords: maxRecords });
         
-        if (chartData.length === 0) {
-            console.error('[ChartManager] No valid data points after validation. Input data:', {
-                timestamps: data.timestamps?.length || 0,
-                iv_values: data.iv_values?.length || 0,
-                sampleTimestamps: data.timestamps?.slice(0, 5),
-                sampleIVs: data.iv_values?.slice(0, 5)
+        const chartData = new Array(time.length);
+        const dataMap = new Map();
+        for (let i = 0; i < time.length; i++) {
+            chartData[i] = { time: time[i], value: iv[i] };
+            dataMap.set(time[i], {
+                iv: iv[i],
+                optionPrice: isNaN(close[i]) ? null : close[i],
+                underlyingPrice: isNaN(fclose[i]) ? null : fclose[i]
             });
-            throw new Error('No valid data points after validation');
         }
         
-        console.log(`[ChartManager] Validated ${chartData.length} data points from ${data.timestamps.length} input points`);
+        console.log(`[ChartManager] Validated ${chartData.length} data points from ${inputPoints} input points`);
         return { chartData, dataMap };
     }
     
@@ -245,13 +213,13 @@ class ChartUpdateManager {
         // Validate and prepare data
         let validatedData;
         try {
-            validatedData = this.validateAndPrepareData(data);
+            validatedData = await this.validateAndPrepareData(data);
         } catch (error) {
             console.error(`[ChartManager] Data validation failed:`, error);
             // If we have last valid data, use it instead of failing
             if (this.lastValidData) {
                 console.log('[ChartManager] Using last valid data due to validation failure');
-                validatedData = this.validateAndPrepareData(this.lastValidData.data);
+                validatedData = await this.validateAndPrepareData(this.lastValidData.data);
                 symbol = this.currentSymbol;
             } else {
                 throw error;
@@ -272,6 +240,7 @@ class ChartUpdateManager {
         this.currentSymbol = symbol;
         
         console.log(`[ChartManager] Updating chart: symbol=${symbol}, isNewSymbol=${isNewSymbol}, existingDataLength=${existingData.length}, previousSymbol=${previousSymbol}`);
+        const incrementalFrom = isNewSymbol ? -1 : this.incrementalStartIndex(chartData);
         
         try {
             if (isNewSymbol || existingData.length === 0) {
@@ -305,8 +274,20 @@ class ChartUpdateManager {
                 this.autoScalePriceScale(chartData);
                 
                 console.log(`[ChartManager] Successfully set ${chartData.length} data points for ${symbol}`);
+            } else if (incrementalFrom >= 0) {
+                // Same symbol, only the last point changed and/or points were appended:
+                // series.update() the changed points instead of rebuilding the whole series
+                const changedFrom = incrementalFrom;
+                for (let i = changedFrom; i < chartData.length; i++) {
+                    series.update(chartData[i]);
+                    chartDataMap.set(chartData[i].time, dataMap.get(chartData[i].time));
+                }
+                if (changedFrom < chartData.length) {
+                    console.log(`[ChartManager] Applied ${chartData.length - changedFrom} point update(s) for ${symbol}`);
+                }
             } else {
-                // Same symbol: Incremental update (preserve zoom if user has panned)
+                // Same symbol, older points changed (scroll-back page, stitched series, resync): full setData
+                // (preserve zoom if user has panned)
                 const currentVisibleRange = chart.timeScale().getVisibleRange();
                 const dataLength = existingData.length;
                 
@@ -346,7 +327,8 @@ class ChartUpdateManager {
                 console.log(`[ChartManager] Incrementally updated ${chartData.length} data points for ${symbol}`);
             }
             
-            // Save as last valid data
+            // Save as last valid data and keep the rendered points for the next incremental update
+            this.renderedData = chartData;
             this.lastValidData = { symbol, data, source };
             
         } catch (error) {
@@ -355,8 +337,9 @@ class ChartUpdateManager {
             if (this.lastValidData && this.lastValidData.data) {
                 console.log('[ChartManager] Attempting to restore last valid data...');
                 try {
-                    const restored = this.validateAndPrepareData(this.lastValidData.data);
+                    const restored = await this.validateAndPrepareData(this.lastValidData.data);
                     series.setData(restored.chartData);
+                    this.renderedData = restored.chartData;
                     chartDataMap.clear();
                     restored.dataMap.forEach((value, key) => chartDataMap.set(key, value));
                 } catch (e) {
@@ -389,6 +372,7 @@ class ChartUpdateManager {
      */
     resetChart() {
         console.log('[ChartManager] Resetting chart...');
+        this.renderedData = [];
         
         // Clear data map
         if (chartDataMap) {
@@ -427,92 +411,351 @@ class ChartUpdateManager {
 // Create global chart update manager instance
 const chartUpdateManager = new ChartUpdateManager();
 
-// Helper function to convert timestamp string to Unix timestamp
-// Timestamps from backend are in IST format: "2025-11-13T15:29:00+05:30" or "2025-11-13 15:29:00"
-// CSV timestamps are correct IST times - we need to display them as IST on the chart
-// LightweightCharts displays times in browser's local timezone, so we adjust the Unix timestamp
-// so that when displayed, it shows the IST time from CSV
-function convertToIST(timestamp) {
-    try {
-        if (typeof timestamp === 'string') {
-            // Extract IST time components from CSV timestamp
-            // Backend sends: "2025-12-01T17:30:00+05:30" (IST time with timezone indicator)
-            let csvYear, csvMonth, csvDay, csvHour, csvMinute, csvSecond;
-            
-            // Parse timestamp string to extract date/time components (before timezone)
-            // Remove timezone info first to get clean timestamp
-            let cleanTimestamp = timestamp.replace(/[+-]\d{2}:\d{2}$/, '').trim();
-            const match = cleanTimestamp.match(/(\d{4})-(\d{2})-(\d{2})[\sT](\d{2}):(\d{2}):(\d{2})/);
-            
-            if (!match) {
-                return null;
-            }
-            
-            [, csvYear, csvMonth, csvDay, csvHour, csvMinute, csvSecond] = match;
-            
-            const yearInt = parseInt(csvYear);
-            const monthInt = parseInt(csvMonth) - 1; // Month is 0-indexed
-            const dayInt = parseInt(csvDay);
-            const hourInt = parseInt(csvHour);
-            const minuteInt = parseInt(csvMinute);
-            const secondInt = parseInt(csvSecond || 0);
-            
-            // CSV has IST time (e.g., 17:30:00 IST)
-            // We want chart to display: 17:30:00 (matching CSV)
-            // Chart library displays Unix timestamps in browser's local timezone
-            
-            // Simple strategy: Treat CSV IST time as UTC time for the Unix timestamp
-            // This makes the chart display the CSV time directly, regardless of browser timezone
-            // Example: CSV "17:30:00 IST" -> Create Unix timestamp for "17:30:00 UTC"
-            // - Browser in UTC: displays "17:30:00" ✓ (matches CSV)
-            // - Browser in IST: displays "23:00:00" (17:30 + 5:30) - but we want 17:30
-            //
-            // To handle IST browsers: We need to subtract 5:30 so it displays as IST time
-            // But we want to show IST time, so if browser is IST, we use actual UTC (which displays as IST)
-            
-            // Always treat CSV IST time as UTC for the Unix timestamp
-            // This makes chart display CSV time directly in UTC browsers
-            // For IST browsers, we'll adjust below
-            const istAsUTC = new Date(Date.UTC(yearInt, monthInt, dayInt, hourInt, minuteInt, secondInt));
-            
-            // Get browser's timezone offset (in minutes, positive = behind UTC)
-            // IST is UTC+5:30, so IST offset is -330 minutes
-            const browserOffsetMinutes = new Date().getTimezoneOffset();
-            const istOffsetMinutes = -330;
-            
-            // Check if browser is in IST (within 10 minutes tolerance for DST, etc.)
-            const isISTBrowser = Math.abs(browserOffsetMinutes - istOffsetMinutes) < 10;
-            
-            // Debug logging for first few conversions
-            const shouldLog = yearInt === 2025 && monthInt === 11 && dayInt === 1 && hourInt >= 17;
-            
-            if (shouldLog) {
-                console.log(`[convertToIST] Input: ${timestamp}, Extracted: ${yearInt}-${monthInt+1}-${dayInt} ${hourInt}:${minuteInt}:${secondInt}`);
-                console.log(`[convertToIST] Browser offset: ${browserOffsetMinutes}, IST offset: ${istOffsetMinutes}, Is IST browser: ${isISTBrowser}`);
-            }
-            
-            // The chart appears to display Unix timestamps in UTC (based on evidence: showing 12:07 instead of 17:35)
-            // We want to display the CSV IST time directly
-            // Strategy: Always use CSV IST time as UTC timestamp
-            // CSV 17:30 IST -> timestamp for 17:30 UTC -> chart displays as 17:30 ✓
-            // This works regardless of browser timezone if chart displays in UTC
-            
-            const unixTs = Math.floor(istAsUTC.getTime() / 1000);
-            if (shouldLog) {
-                const displayDate = new Date(unixTs * 1000);
-                console.log(`[convertToIST] Using CSV IST time as UTC: ${unixTs} (${displayDate.toUTCString()}), chart should display: ${displayDate.toUTCString().match(/\d{2}:\d{2}:\d{2}/)?.[0]}`);
-            }
-            return unixTs;
-            
-        } else if (typeof timestamp === 'number') {
-            // If it's already a Unix timestamp, return as-is (Unix timestamps are timezone-agnostic)
-            return timestamp > 10000000000 ? Math.floor(timestamp / 1000) : timestamp;
+// ============================================================================
+// CHART DATA WORKER
+// ============================================================================
+
+// Start the chart worker on first use (null if workers are unavailable)
+function getChartWorker() {
+    if (chartWorker === null) {
+        try {
+            chartWorker = typeof Worker !== 'undefined' ? new Worker(CHART_WORKER_URL) : false;
+        } catch (error) {
+            console.warn('[ChartWorker] Could not start worker, parsing on the main thread:', error);
+            chartWorker = false;
+        }
+        if (chartWorker) {
+            chartWorker.onmessage = onChartWorkerMessage;
+            chartWorker.onerror = onChartWorkerError;
+        }
+    }
+    return chartWorker || null;
+}
+
+/**
+ * Run a chart data task (runChartTask in chart-data.js) in the worker
+ * Inputs are copied to the worker, typed arrays in the result are transferred back
+ * @returns {Promise} Task result
+ */
+function runInChartWorker(type, message) {
+    const worker = getChartWorker();
+    if (!worker) {
+        return Promise.resolve().then(() => runChartTask(type, message));
+    }
+    return new Promise((resolve, reject) => {
+        const id = chartWorkerNextId++;
+        chartWorkerTasks.set(id, { type, message, resolve, reject });
+        worker.postMessage({ id, type, message });
+    });
+}
+
+function onChartWorkerMessage(event) {
+    const { id, result, error } = event.data;
+    const task = chartWorkerTasks.get(id);
+    if (!task) {
+        return;
+    }
+    chartWorkerTasks.delete(id);
+    if (error) {
+        task.reject(new Error(error));
+    } else {
+        task.resolve(result);
+    }
+}
+
+// The worker itself failed (e.g. script failed to load): finish pending tasks and keep going on the main thread
+function onChartWorkerError(event) {
+    console.warn('[ChartWorker] Worker failed, parsing on the main thread:', event.message);
+    if (chartWorker) {
+        chartWorker.terminate();
+    }
+    chartWorker = false;
+    const pending = Array.from(chartWorkerTasks.values());
+    chartWorkerTasks.clear();
+    pending.forEach(task => {
+        try {
+            task.resolve(runChartTask(task.type, task.message));
+        } catch (error) {
+            task.reject(error);
         }
+    });
+}
+
+// ============================================================================
+// CHART PAYLOAD FETCH
+// ============================================================================
+
+/**
+ * GET a chart payload endpoint, asking for the binary encoding when CHART_BINARY_PAYLOAD is set
+ * Returns { response, data, notModified } - data is null for error responses (read them from response)
+ * and when the server answers 304 / the same ETag as previousEtag (nothing changed since the last poll)
+ */
+async function fetchChartPayload(url, previousEtag = null) {
+    const headers = CHART_BINARY_PAYLOAD ? { 'Accept': `${CHART_BINARY_MIMETYPE}, application/json;q=0.5` } : {};
+    if (previousEtag) {
+        headers['If-None-Match'] = previousEtag;
+    }
+    const response = await fetch(url, { headers });
+    if (response.status === 304 || (previousEtag && response.headers.get('ETag') === previousEtag)) {
+        return { response, data: null, notModified: true };
+    }
+    if (!response.ok) {
+        return { response, data: null };
+    }
+    const contentType = response.headers.get('Content-Type') || '';
+    const data = await runInChartWorker('decode', {
+        buffer: await response.arrayBuffer(),
+        binary: contentType.includes(CHART_BINARY_MIMETYPE),
+        meta: response.headers.get('X-IV-Meta')
+    });
+    return { response, data };
+}
+
+// Concatenate two series (plain or typed arrays)
+function concatValues(first, second) {
+    if (Array.isArray(first) && Array.isArray(second)) {
+        return first.concat(second);
+    }
+    return Array.from(first).concat(Array.from(second));
+}
+
+// ============================================================================
+// CLIENT HISTORY CACHE (IndexedDB)
+// ============================================================================
+
+// Open the cache database once (resolves null if IndexedDB is unavailable, e.g. private browsing)
+function openChartCache() {
+    if (!chartCache.db) {
+        chartCache.db = new Promise(resolve => {
+            if (typeof indexedDB === 'undefined') {
+                resolve(null);
+                return;
+            }
+            const request = indexedDB.open(CHART_CACHE_DB, 1);
+            request.onupgradeneeded = () => request.result.createObjectStore(CHART_CACHE_STORE, { keyPath: 'symbol' });
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => {
+                console.warn('[ChartCache] IndexedDB unavailable, history will not be cached:', request.error);
+                resolve(null);
+            };
+        });
+    }
+    return chartCache.db;
+}
+
+/**
+ * Read a symbol's cached history
+ * @returns {Promise<Object|null>} { symbol, version, epoch, savedAt, timestamps, iv_values, close_prices, fclose_prices }
+ */
+async function readChartCache(symbol) {
+    const db = await openChartCache();
+    if (!db) {
         return null;
-    } catch (e) {
-        console.warn('Error converting timestamp:', timestamp, e);
+    }
+    return new Promise(resolve => {
+        const request = db.transaction(CHART_CACHE_STORE, 'readonly').objectStore(CHART_CACHE_STORE).get(symbol);
+        request.onsuccess = () => resolve(request.result || null);
+        request.onerror = () => resolve(null);
+    });
+}
+
+async function writeChartCache(entry) {
+    const db = await openChartCache();
+    if (!db) {
+        return;
+    }
+    const transaction = db.transaction(CHART_CACHE_STORE, 'readwrite');
+    transaction.objectStore(CHART_CACHE_STORE).put(entry);
+    transaction.onerror = () => console.warn(`[ChartCache] Could not cache history for ${entry.symbol}:`, transaction.error);
+}
+
+// Save the chart's history at most every CHART_CACHE_SAVE_MS
+function scheduleChartCacheSave() {
+    if (chartCache.saveTimer) {
+        return;
+    }
+    const delay = Math.max(0, chartCache.lastSave + CHART_CACHE_SAVE_MS - Date.now());
+    chartCache.saveTimer = setTimeout(saveChartCache, delay);
+}
+
+// Run a pending save now (before the history is reset or the page is hidden)
+function flushChartCacheSave() {
+    if (chartCache.saveTimer) {
+        clearTimeout(chartCache.saveTimer);
+        saveChartCache();
+    }
+}
+
+/**
+ * Cache the latest CHART_CACHE_MAX_POINTS points of the chart's history (loaded pages plus polled window)
+ * Only history with a known store version is cached - the version is what lets the next load ask for just the tail
+ */
+function saveChartCache() {
+    chartCache.saveTimer = null;
+    const { symbol, merged, version, epoch } = chartHistory;
+    if (!symbol || !merged || !merged.timestamps || merged.timestamps.length === 0 || version === null || !epoch) {
+        return;
+    }
+    chartCache.lastSave = Date.now();
+    const count = merged.timestamps.length;
+    const start = Math.max(0, count - CHART_CACHE_MAX_POINTS);
+    const entry = { symbol, version, epoch, savedAt: Date.now() };
+    CHART_SERIES_KEYS.forEach(key => {
+        const values = merged[key] && merged[key].length === count ? merged[key] : [];
+        entry[key] = Float64Array.from(values.slice(start), value => value === null || value === undefined ? NaN : value);
+    });
+    writeChartCache(entry);
+}
+
+/**
+ * Load a symbol's history from the cache plus only what the server added since (/api/get_iv_delta)
+ * Without a usable cache the server sends the latest CHART_INITIAL_POINTS window instead
+ * @returns {Promise<Object|null>} Chart data to show (also becomes chartHistory's window), null if the server has none
+ */
+async function restoreChartHistory(symbol) {
+    const cached = await readChartCache(symbol);
+    const params = new URLSearchParams({ symbol: symbol, last: CHART_INITIAL_POINTS });
+    if (cached && cached.timestamps && cached.timestamps.length > 0) {
+        params.set('since', cached.timestamps[cached.timestamps.length - 1]);
+        params.set('version', cached.version);
+        params.set('epoch', cached.epoch);
+    }
+    const { response, data } = await fetchChartPayload(`/api/get_iv_delta?${params.toString()}`);
+    if (!response.ok || !data) {
         return null;
     }
+    
+    resetChartHistory(symbol);
+    let restored;
+    if (data.delta && cached) {
+        // Cached rows become the older history and the delta (from the last cached point) the latest window,
+        // so polls keep extending the delta and scroll-back continues before the cached rows
+        const cachedRows = { timestamps: cached.timestamps, iv_values: cached.iv_values, close_prices: cached.close_prices,
+                             fclose_prices: cached.fclose_prices, has_more: true };
+        if (data.timestamps && data.timestamps.length > 0) {
+            chartHistory.older = cachedRows;
+            chartHistory.hasMore = true;
+            restored = mergeWithHistory(symbol, data);
+        } else {
+            restored = mergeWithHistory(symbol, cachedRows);
+        }
+        console.log(`[ChartCache] ${symbol}: ${cached.timestamps.length} cached points + ${data.timestamps ? data.timestamps.length : 0} from the server`);
+    } else {
+        if (cached) {
+            console.log(`[ChartCache] ${symbol}: cache out of date (server restarted or history rewritten), loaded the latest window`);
+        }
+        restored = mergeWithHistory(symbol, data);
+    }
+    chartHistory.version = data.version;
+    chartHistory.epoch = data.epoch;
+    return restored;
+}
+
+// ============================================================================
+// LAZY SCROLL-BACK HISTORY
+// ============================================================================
+
+function resetChartHistory(symbol = null) {
+    flushChartCacheSave();
+    chartHistory = { symbol: symbol, older: null, latest: null, merged: null, latestEtag: null, oldest: null, hasMore: true, loading: false, version: null, epoch: null };
+}
+
+/**
+ * Prepend the older pages loaded so far to the latest window from a poll
+ * @param {string} symbol - Symbol the window belongs to
+ * @param {Object} data - Latest window (timestamps, iv_values, close_prices, fclose_prices, has_more)
+ * @returns {Object} Data covering the older pages plus the latest window
+ */
+function mergeWithHistory(symbol, data) {
+    if (chartHistory.symbol !== symbol) {
+        resetChartHistory(symbol);
+    }
+    if (!data || !data.timestamps || data.timestamps.length === 0) {
+        return data;
+    }
+    chartHistory.latest = data;
+    scheduleChartCacheSave();
+    if (!chartHistory.older) {
+        chartHistory.hasMore = data.has_more !== false;
+        chartHistory.oldest = data.timestamps[0];
+        chartHistory.merged = data;
+        return data;
+    }
+    
+    // Older rows that the latest window doesn't cover (timestamps share one format, so string order is time order)
+    const older = chartHistory.older;
+    const firstLatest = data.timestamps[0];
+    let count = 0;
+    while (count < older.timestamps.length && older.timestamps[count] < firstLatest) {
+        count++;
+    }
+    const merged = Object.assign({}, data);
+    CHART_SERIES_KEYS.forEach(key => {
+        const olderValues = older[key] || [];
+        const latestValues = data[key] || [];
+        merged[key] = olderValues.length >= count && latestValues.length === data.timestamps.length
+            ? concatValues(olderValues.slice(0, count), latestValues)
+            : latestValues;
+    });
+    chartHistory.oldest = merged.timestamps[0];
+    chartHistory.merged = merged;
+    return merged;
+}
+
+/**
+ * Fetch the page of history before the oldest loaded point and prepend it to the chart
+ */
+async function loadOlderHistory() {
+    const symbol = chartUpdateManager.currentSymbol;
+    if (!symbol || chartHistory.symbol !== symbol || chartHistory.loading || !chartHistory.hasMore || !chartHistory.oldest) {
+        return;
+    }
+    
+    // Stop at the display limit from the UI
+    const maxCandlesInput = document.getElementById('maxCandles');
+    const maxCandles = maxCandlesInput ? parseInt(maxCandlesInput.value) || 50000 : 50000;
+    if (series && series.data().length >= maxCandles) {
+        return;
+    }
+    
+    chartHistory.loading = true;
+    try {
+        const url = `/api/get_iv_page?symbol=${encodeURIComponent(symbol)}&before=${encodeURIComponent(chartHistory.oldest)}&limit=${CHART_PAGE_POINTS}`;
+        const { response, data: page } = await fetchChartPayload(url);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        if (chartHistory.symbol !== symbol) {
+            return; // Symbol changed while loading
+        }
+        chartHistory.hasMore = !!page.has_more;
+        if (!page.timestamps || page.timestamps.length === 0) {
+            return;
+        }
+        
+        const older = {};
+        CHART_SERIES_KEYS.forEach(key => {
+            const pageValues = page[key] && page[key].length === page.timestamps.length ? page[key] : new Array(page.timestamps.length).fill(null);
+            older[key] = chartHistory.older ? concatValues(pageValues, chartHistory.older[key]) : pageValues;
+        });
+        chartHistory.older = older;
+        console.log(`[ScrollBack] Loaded ${page.timestamps.length} older points for ${symbol} (more: ${chartHistory.hasMore})`);
+        
+        if (chartHistory.latest) {
+            await chartUpdateManager.queueUpdate(symbol, mergeWithHistory(symbol, chartHistory.latest), 'history');
+        }
+    } catch (error) {
+        console.error('[ScrollBack] Error loading older history:', error);
+    } finally {
+        chartHistory.loading = false;
+    }
+}
+
+// Load older history when the view reaches the left edge of the loaded data
+function onVisibleLogicalRangeChange(range) {
+    if (range && range.from < CHART_SCROLLBACK_THRESHOLD) {
+        loadOlderHistory();
+    }
 }
 
 // Export loginToAPI to window for onclick handler (will be set after function definition)
@@ -697,6 +940,9 @@ function initChart() {
             console.warn('Could not configure price scale:', e);
         }
     
+        // Lazy scroll-back: fetch older pages when the user scrolls past the loaded range
+        chart.timeScale().subscribeVisibleLogicalRangeChange(onVisibleLogicalRangeChange);
+        
         // Enable crosshair tracking for tooltip
         chart.subscribeCrosshairMove((param) => {
             const tooltip = document.getElementById('crosshairTooltip');
@@ -810,6 +1056,9 @@ function findClosestDataPoint(timestamp) {
 function resetChart() {
     console.log('Resetting chart completely...');
     
+    // Drop scroll-back pages of the previous symbol
+    resetChartHistory();
+    
     // Clear all data
     if (chartDataMap) {
         chartDataMap.clear();
@@ -886,14 +1135,29 @@ async function fetchIVData(symbol) {
         }
         
         console.log('[fetchIVData] Fetching IV data for symbol:', symbol);
-        const response = await fetch(`/api/get_iv_data?symbol=${encodeURIComponent(symbol)}`);
+        if (chartHistory.symbol !== symbol || !chartHistory.latest) {
+            // First load of this symbol: cached history plus the missing tail
+            const restored = await restoreChartHistory(symbol);
+            if (restored && restored.timestamps && restored.timestamps.length > 0) {
+                await chartUpdateManager.queueUpdate(symbol, restored, 'api');
+                currentSymbol = symbol;
+                return;
+            }
+        }
+        const previousEtag = chartHistory.symbol === symbol ? chartHistory.latestEtag : null;
+        const { response, data: payload, notModified } = await fetchChartPayload(`/api/get_iv_data?symbol=${encodeURIComponent(symbol)}&last=${CHART_INITIAL_POINTS}`, previousEtag);
         
+        if (notModified) {
+            // Server store version unchanged since the last poll - nothing to redraw
+            return;
+        }
         if (!response.ok) {
             console.error(`[fetchIVData] HTTP error ${response.status}: ${response.statusText}`);
             throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         }
         
-        const data = await response.json();
+        const data = mergeWithHistory(symbol, payload);
+        chartHistory.latestEtag = response.headers.get('ETag');
         
         console.log('[fetchIVData] Raw response data:', {
             hasData: !!data,
@@ -1378,8 +1642,12 @@ async function startFetching() {
     const riskFreeRateInput = document.getElementById('riskFreeRate');
     const riskFreeRate = riskFreeRateInput && riskFreeRateInput.value ? parseFloat(riskFreeRateInput.value) / 100 : 0.07;
     
+    // Time-to-expiry basis ('calendar' or 'trading')
+    const timeBasisInput = document.getElementById('timeBasis');
+    const timeBasis = timeBasisInput && timeBasisInput.value ? timeBasisInput.value : 'calendar';
+    
     // Build request payload
-    const payload = { mode, timeframe, risk_free_rate: riskFreeRate };
+    const payload = { mode, timeframe, risk_free_rate: riskFreeRate, time_basis: timeBasis };
     
     if (mode === 'automatic') {
         // Automatic mode: Get future symbol, expiry type, expiry date, option type
@@ -1417,6 +1685,18 @@ async function startFetching() {
         if (strikeStep !== null && strikeStep > 0) {
             payload.strike_step = strikeStep;
         }
+        const forwardSourceInput = document.getElementById('forwardSource');
+        if (forwardSourceInput && forwardSourceInput.value) {
+            payload.forward_source = forwardSourceInput.value;
+        }
+        const atmHysteresisInput = document.getElementById('atmHysteresis');
+        if (atmHysteresisInput && atmHysteresisInput.value !== '') {
+            payload.atm_hysteresis = parseFloat(atmHysteresisInput.value);
+        }
+        const atmMinDwellInput = document.getElementById('atmMinDwell');
+        if (atmMinDwellInput && atmMinDwellInput.value !== '') {
+            payload.atm_min_dwell = parseFloat(atmMinDwellInput.value);
+        }
         
         console.log('Automatic mode parameters:', payload);
     } else {
@@ -1502,7 +1782,8 @@ async function startFetching() {
             showNotification(message, 'success');
             
             // Get the symbol we're about to fetch
-            const symbolToPoll = mode === 'automatic' ? data.generated_symbol : payload.symbol;
+            // Automatic mode follows the continuous ATM series so the chart doesn't jump on strike rolls
+            const symbolToPoll = mode === 'automatic' ? (data.continuous_symbol || data.generated_symbol) : payload.symbol;
             
             // If symbol changed, completely reset chart
             if (symbolToPoll && symbolToPoll !== currentSymbol) {
@@ -1585,10 +1866,7 @@ async function stopFetching() {
             }
             
             // Stop polling
-            if (fetchInterval) {
-                clearInterval(fetchInterval);
-                fetchInterval = null;
-            }
+            stopPollingIVData();
             
             showNotification(data.message || 'Data fetching stopped and chart reset', 'info');
         } else {
@@ -1602,89 +1880,130 @@ async function stopFetching() {
 
 // Poll for IV data updates
 function startPollingIVData(symbol) {
-    // Clear any existing interval
-    if (fetchInterval) {
-        clearInterval(fetchInterval);
-    }
+    // Stop any existing poll loop
+    stopPollingIVData();
     
-    console.log(`Starting polling for IV data: ${symbol}`);
+    console.log(`Starting long-poll for IV data: ${symbol}`);
+    const state = { symbol: symbol, version: null, active: null, running: true, controller: null };
+    pollState = state;
     
-    // Fetch immediately
-    fetchIVData(symbol);
-    
-    // Then poll every 1 second
-    // In automatic mode, get the current symbol from status (updated every second)
-    fetchInterval = setInterval(async () => {
+    // Load the chart right away (cached history plus the missing tail; also loads stored history into the
+    // server's memory), then long-poll for changes from the version it loaded
+    fetchIVData(symbol).finally(() => {
+        if (chartHistory.symbol === symbol && chartHistory.version !== null) {
+            state.version = chartHistory.version;
+        }
+        runPollLoop(state);
+    });
+    console.log('Long-poll started - chart updates as soon as new IV data is stored');
+}
+
+// Stop the long-poll loop (aborts the pending request)
+function stopPollingIVData() {
+    if (pollState) {
+        pollState.running = false;
+        if (pollState.controller) {
+            pollState.controller.abort();
+        }
+        pollState = null;
+    }
+}
+
+/**
+ * Long-poll /api/poll: one request returns the fetching status plus the active symbol's new data,
+ * held open by the server until the store version changes (or POLL_TIMEOUT_SECONDS pass)
+ */
+async function runPollLoop(state) {
+    while (state.running) {
         try {
-            // Check if we're in automatic mode and get current symbol from status
-            const statusResponse = await fetch('/api/get_status');
-            if (statusResponse.ok) {
-                const status = await statusResponse.json();
-                if (status.active && status.mode === 'automatic' && status.symbol) {
-                    // Use the current symbol from status (updated every second in automatic mode)
-                    const currentStatusSymbol = status.symbol;
-                    
-                    // If symbol changed, reset chart
-                    if (currentStatusSymbol && currentStatusSymbol !== currentSymbol) {
-                        console.log(`[Polling] Symbol changed from ${currentSymbol} to ${currentStatusSymbol} - resetting chart`);
-                        resetChart();
-                        currentSymbol = currentStatusSymbol;
-                        await new Promise(resolve => setTimeout(resolve, 300));
-                    }
-                    
-                    // Update chart title if symbol changed
-                    updateChartTitle(currentStatusSymbol);
-                    fetchIVData(currentStatusSymbol);
-                } else if (status.active && status.symbol) {
-                    // Manual mode or fallback
-                    const currentStatusSymbol = status.symbol;
-                    
-                    // If symbol changed, reset chart
-                    if (currentStatusSymbol && currentStatusSymbol !== currentSymbol) {
-                        console.log(`[Polling] Symbol changed from ${currentSymbol} to ${currentStatusSymbol} - resetting chart`);
-                        resetChart();
-                        currentSymbol = currentStatusSymbol;
-                        await new Promise(resolve => setTimeout(resolve, 300));
-                    }
-                    
-                    // Update chart title if symbol changed
-                    updateChartTitle(currentStatusSymbol);
-                    fetchIVData(currentStatusSymbol);
-                } else {
-                    // Fallback to original symbol
-                    fetchIVData(symbol);
-                }
-            } else {
-                // Fallback to original symbol
-                fetchIVData(symbol);
+            const params = new URLSearchParams({ last: CHART_INITIAL_POINTS, timeout: POLL_TIMEOUT_SECONDS });
+            if (state.symbol) params.set('symbol', state.symbol);
+            if (state.version !== null) params.set('version', state.version);
+            if (state.version !== null && chartHistory.epoch) params.set('epoch', chartHistory.epoch);
+            if (state.active !== null) params.set('active', state.active ? '1' : '0');
+            const latest = chartHistory.symbol === state.symbol ? chartHistory.latest : null;
+            if (latest && latest.timestamps && latest.timestamps.length > 0) {
+                params.set('since', latest.timestamps[latest.timestamps.length - 1]);
+            }
+            
+            state.controller = new AbortController();
+            const response = await fetch(`/api/poll?${params.toString()}`, { signal: state.controller.signal });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            const result = await runInChartWorker('poll', { buffer: await response.arrayBuffer() });
+            if (!state.running) {
+                break;
+            }
+            
+            applyPollStatus(result.status);
+            state.active = !!(result.status && result.status.active);
+            
+            const polledSymbol = result.symbol || state.symbol;
+            if (polledSymbol && polledSymbol !== currentSymbol) {
+                console.log(`[Polling] Symbol changed from ${currentSymbol} to ${polledSymbol} - resetting chart`);
+                resetChart();
+                currentSymbol = polledSymbol;
+                await new Promise(resolve => setTimeout(resolve, 300));
+            }
+            if (polledSymbol) {
+                updateChartTitle(polledSymbol);
+            }
+            
+            if (result.data && result.data.timestamps && result.data.timestamps.length > 0) {
+                const incoming = result.data;
+                const canApplyDelta = result.delta && polledSymbol === state.symbol
+                    && chartHistory.symbol === polledSymbol && chartHistory.latest;
+                const chartWindow = canApplyDelta ? applyChartDelta(chartHistory.latest, incoming) : incoming;
+                const merged = mergeWithHistory(polledSymbol, chartWindow);
+                // The window now matches this store version (saved with the IndexedDB cache)
+                chartHistory.version = result.version;
+                chartHistory.epoch = result.epoch;
+                await chartUpdateManager.queueUpdate(polledSymbol, merged, 'api');
             }
+            state.symbol = polledSymbol;
+            state.version = result.version;
         } catch (error) {
-            console.error('Error getting status for polling:', error);
-            // Fallback to original symbol
-            fetchIVData(symbol);
+            if (!state.running || error.name === 'AbortError') {
+                break;
+            }
+            console.error('[Polling] Long-poll error, retrying:', error);
+            await new Promise(resolve => setTimeout(resolve, POLL_RETRY_MS));
         }
-        checkFetchStatus();
-    }, 1000);
-    
-    console.log('Polling started - fetching IV data every 1 second');
+    }
 }
 
-// Check fetching status periodically
-async function checkFetchStatus() {
-    try {
-        const response = await fetch('/api/get_status');
-        const status = await response.json();
-        
-        if (!status.active && document.getElementById('fetchStatus').textContent === 'Fetching...') {
-            // Fetching was stopped
-            document.getElementById('fetchStatus').textContent = 'Stopped';
-            document.getElementById('fetchStatus').classList.remove('active');
-        }
-    } catch (error) {
-        console.error('Error checking status:', error);
+// Update the fetch status display from a poll response
+function applyPollStatus(status) {
+    const fetchStatus = document.getElementById('fetchStatus');
+    if (status && !status.active && fetchStatus && fetchStatus.textContent === 'Fetching...') {
+        // Fetching was stopped
+        fetchStatus.textContent = 'Stopped';
+        fetchStatus.classList.remove('active');
     }
 }
 
+/**
+ * Replace the rows of a window from the delta's first timestamp onwards with the delta
+ * (the delta starts at the client's last point, which may have been updated)
+ */
+function applyChartDelta(latest, delta) {
+    const firstDelta = delta.timestamps[0];
+    let count = 0;
+    while (count < latest.timestamps.length && latest.timestamps[count] < firstDelta) {
+        count++;
+    }
+    const merged = Object.assign({}, latest, delta);
+    CHART_SERIES_KEYS.forEach(key => {
+        const latestValues = latest[key] || [];
+        const deltaValues = delta[key] || [];
+        merged[key] = latestValues.length === latest.timestamps.length && deltaValues.length === delta.timestamps.length
+            ? concatValues(latestValues.slice(0, count), deltaValues)
+            : deltaValues;
+    });
+    return merged;
+}
+
 // Show notification
 function showNotification(message, type = 'info') {
     // Create notification element
@@ -1760,16 +2079,18 @@ async function loadCSVData(symbol) {
             await new Promise(resolve => setTimeout(resolve, 300));
         }
         
-        const url = `/api/load_csv_data?symbol=${encodeURIComponent(symbol)}`;
-        const response = await fetch(url);
+        // With this symbol's history already loaded (cache/poll), only read the stored rows from its latest point on
+        const latest = chartHistory.symbol === symbol ? chartHistory.latest : null;
+        const loadedUntil = latest && latest.timestamps && latest.timestamps.length > 0 ? latest.timestamps[latest.timestamps.length - 1] : null;
+        const range = loadedUntil !== null ? `from=${encodeURIComponent(loadedUntil)}` : `last=${CHART_INITIAL_POINTS}`;
+        const url = `/api/load_csv_data?symbol=${encodeURIComponent(symbol)}&${range}`;
+        const { response, data } = await fetchChartPayload(url);
         
         if (!response.ok) {
             const errorData = await response.json().catch(() => ({ message: response.statusText }));
             throw new Error(errorData.message || `HTTP ${response.status}: ${response.statusText}`);
         }
         
-        const data = await response.json();
-        
         if (!data.success || !data.timestamps || data.timestamps.length === 0) {
             console.warn('[loadCSVData] No data received or empty timestamps for symbol:', symbol);
             return;
@@ -1784,7 +2105,9 @@ async function loadCSVData(symbol) {
         console.log(`[loadCSVData] Loaded ${data.data_points} data points from CSV for symbol: ${symbol}`);
         
         // Queue update through ChartUpdateManager (handles all validation and updates)
-        await chartUpdateManager.queueUpdate(symbol, data, 'csv');
+        const chartWindow = loadedUntil !== null && chartHistory.symbol === symbol && chartHistory.latest
+            ? applyChartDelta(chartHistory.latest, data) : data;
+        await chartUpdateManager.queueUpdate(symbol, mergeWithHistory(symbol, chartWindow), 'csv');
         
         // Update currentSymbol tracking
         currentSymbol = symbol;
@@ -1810,6 +2133,13 @@ document.addEventListener('DOMContentLoaded', () => {
     // Auto-refresh logs every 5 seconds
     setInterval(loadLogs, 5000);
     
+    // Write pending chart history to the IndexedDB cache when the tab is hidden or closed
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') {
+            flushChartCacheSave();
+        }
+    });
+    
     try {
         // Wait for LightweightCharts library to load and DOM to be ready
         const checkLibrary = setInterval(() => {
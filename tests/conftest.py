@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    """The Flask app module, with its relative data/ folder in a scratch directory and empty in-memory stores"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join('data', 'series'), exist_ok=True)
+    import main as app_module
+    app_module.iv_data_store.clear()
+    app_module.continuous_atm_frames.clear()
+    return app_module
@@ -0,0 +1,58 @@
+"""ATM strike roll hysteresis and minimum dwell (main.apply_atm_hysteresis, main.decide_atm_roll)"""
+
+import pytest
+
+STEP = 50
+
+
+def test_first_strike_is_plain_rounding(main):
+    assert main.apply_atm_hysteresis(26024.0, None, STEP, hysteresis_band=0.2) == 26000
+    assert main.apply_atm_hysteresis(26026.0, None, STEP, hysteresis_band=0.2) == 26050
+
+
+@pytest.mark.parametrize('future_ltp, expected', [
+    (26025.5, 26000),   # Past the midpoint but inside the band
+    (26035.0, 26000),   # On the upper band edge: 0.5 + 0.2 steps from the current strike
+    (26035.01, 26050),  # Just outside it
+    (25965.0, 26000),   # Lower band edge
+    (25964.99, 25950),
+    (26110.0, 26100),   # A jump of several steps rolls straight to the rounded strike
+])
+def test_band_edges(main, future_ltp, expected):
+    assert main.apply_atm_hysteresis(future_ltp, 26000, STEP, hysteresis_band=0.2) == expected
+
+
+def test_zero_band_is_plain_rounding(main):
+    assert main.apply_atm_hysteresis(26025.5, 26000, STEP, hysteresis_band=0) == 26050
+    assert main.apply_atm_hysteresis(26024.5, 26050, STEP, hysteresis_band=0) == 26000
+
+
+def test_no_future_price(main):
+    assert main.apply_atm_hysteresis(None, 26000, STEP, hysteresis_band=0.2) is None
+    assert main.apply_atm_hysteresis(0, 26000, STEP, hysteresis_band=0.2) is None
+
+
+def test_roll_waits_for_min_dwell(main):
+    assert main.decide_atm_roll(26040.0, 26000, 26050, 10, STEP, hysteresis_band=0.2, min_dwell=30) == (26000, False)
+    assert main.decide_atm_roll(26040.0, 26000, 26050, 30, STEP, hysteresis_band=0.2, min_dwell=30) == (26050, False)
+
+
+def test_plain_rounding_with_zero_band_and_dwell(main):
+    assert main.decide_atm_roll(26025.5, 26000, 26000, 0, STEP, hysteresis_band=0, min_dwell=0) == (26050, False)
+
+
+def test_suppressed_counts_transitions_only(main):
+    """A future parked past the midpoint counts one suppressed roll, not one per tick"""
+    ticks = [26020.0, 26030.0, 26031.0, 26032.0, 26020.0, 26030.0, 26040.0]
+    previous_atm, suppressed = None, 0
+    for ltp in ticks:
+        strike, counted = main.decide_atm_roll(ltp, 26000, previous_atm, 5, STEP, hysteresis_band=0.2, min_dwell=30)
+        assert strike == 26000
+        suppressed += counted
+        previous_atm = main.calculate_atm_strike(ltp, STEP)
+    assert suppressed == 2  # 26030 (band) and 26030 again after falling back (band, then dwell at 26040)
+
+
+def test_first_strike_is_never_suppressed(main):
+    assert main.decide_atm_roll(26026.0, None, None, 0, STEP, hysteresis_band=0.2, min_dwell=30) == (26050, False)
+    assert main.decide_atm_roll(None, 26000, 26000, 60, STEP, hysteresis_band=0.2, min_dwell=30) == (None, False)
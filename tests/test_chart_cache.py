@@ -0,0 +1,68 @@
+"""Chart response cache: ETag / 304 per store version (main.cached_chart_response)"""
+
+import pandas as pd
+import pytest
+
+SYMBOL = 'NSE:NIFTY-ATM-CE-20260106'
+URL = f"/api/get_iv_data?symbol={SYMBOL}"
+
+
+def payload(main, periods, iv_offset=0.0):
+    return main.build_iv_payload(pd.DataFrame({
+        'date': pd.date_range('2026-01-05 09:15', periods=periods, freq='min'),
+        'iv': [iv_offset + 12.0 + i * 0.01 for i in range(periods)],
+        'close': 100.0,
+        'fclose': 26000.0
+    }))
+
+
+@pytest.fixture
+def client(main):
+    main.set_iv_data(SYMBOL, payload(main, 50))
+    return main.app.test_client()
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get(URL)
+    assert first.status_code == 200
+    etag = first.headers['ETag'].strip('"')
+    assert len(first.get_json()['timestamps']) == 50
+
+    repeat = client.get(URL, headers={'If-None-Match': f'"{etag}"'})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    assert repeat.headers['ETag'].strip('"') == etag
+
+
+def test_new_etag_after_set_iv_data(main, client):
+    etag = client.get(URL).headers['ETag']
+    main.set_iv_data(SYMBOL, payload(main, 51))
+
+    changed = client.get(URL, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(changed.get_json()['timestamps']) == 51
+
+
+def test_request_variants_have_their_own_etag(client):
+    full = client.get(URL)
+    window = client.get(URL + '&last=10')
+    binary = client.get(URL, headers={'Accept': 'application/octet-stream'})
+    assert len({full.headers['ETag'], window.headers['ETag'], binary.headers['ETag']}) == 3
+    assert len(window.get_json()['timestamps']) == 10
+    # A variant's ETag doesn't validate another variant
+    assert client.get(URL, headers={'If-None-Match': window.headers['ETag']}).status_code == 200
+
+
+def test_cached_body_is_reused(main, client):
+    first = client.get(URL + '&last=10').data
+    main.iv_data_store[SYMBOL] = payload(main, 50, iv_offset=1.0)  # Bypasses set_iv_data: same version
+    assert client.get(URL + '&last=10').data == first
+
+
+def test_identical_data_keeps_the_etag(main, client):
+    etag = client.get(URL).headers['ETag']
+    version = main.iv_data_versions[SYMBOL]
+    main.set_iv_data(SYMBOL, payload(main, 50))  # A forming-candle refresh that changed nothing
+    assert main.iv_data_versions[SYMBOL] == version
+    assert client.get(URL, headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,84 @@
+"""Binary IVB1 chart payloads: encode/decode round trips (chart_encoding.py)"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from chart_encoding import (BINARY_HEADER, BINARY_MAGIC, FLAG_FLOAT32, SERIES, encode_chart_payload,
+                            encode_metadata_header)
+
+
+def decode(body):
+    """Reference decoder, the same steps as decodeChartPayload in the chart JavaScript"""
+    magic, version, flags, count, mask, base = BINARY_HEADER.unpack_from(body, 0)
+    assert magic == BINARY_MAGIC
+    offset = BINARY_HEADER.size
+    deltas = np.frombuffer(body, dtype='<i4', count=count, offset=offset)
+    offset += -(-deltas.nbytes // 8) * 8
+    times = base + np.cumsum(deltas, dtype=np.int64)
+    dtype = '<f4' if flags & FLAG_FLOAT32 else '<f8'
+    series = {}
+    for bit, key in enumerate(SERIES):
+        if mask & (1 << bit):
+            values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += -(-values.nbytes // 8) * 8
+            series[key] = values
+    assert offset == len(body)
+    timestamps = [t.strftime('%Y-%m-%dT%H:%M:%S+05:30') for t in pd.to_datetime(times, unit='s')]
+    return timestamps, series
+
+
+def make_payload(count):
+    timestamps = pd.date_range('2026-01-05 09:15', periods=count, freq='min')
+    timestamps = timestamps.append(pd.DatetimeIndex([timestamps[-1] + pd.Timedelta(hours=18)]))  # Overnight gap
+    count += 1
+    return {
+        'timestamps': timestamps.strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist(),
+        'iv_values': [12.0 + i * 0.013 for i in range(count)],
+        'close_prices': [100.0 + i * 0.05 for i in range(count)],
+        'fclose_prices': [None] * (count - 1) + [26001.5],
+        'strikes': [26000] * count,
+        'symbol': 'NSE:NIFTY-ATM-CE-20260106',
+        'last_update': '2026-01-05 15:29:00'
+    }
+
+
+@pytest.mark.parametrize('float32', [True, False])
+def test_round_trip(float32):
+    payload = make_payload(375)
+    body, metadata = encode_chart_payload(payload, float32=float32)
+    timestamps, series = decode(body)
+
+    assert timestamps == payload['timestamps']
+    assert set(series) == {'iv_values', 'close_prices', 'fclose_prices', 'strikes'}
+    tolerance = 1e-6 if float32 else 0
+    for key in series:
+        expected = np.array([np.nan if v is None else v for v in payload[key]], dtype=np.float64)
+        assert series[key].astype(np.float64) == pytest.approx(expected, rel=tolerance, nan_ok=True), key
+    assert np.isnan(series['fclose_prices'][:-1]).all()
+    assert metadata == {'symbol': 'NSE:NIFTY-ATM-CE-20260106', 'last_update': '2026-01-05 15:29:00', 'data_points': 376}
+
+
+def test_blocks_are_aligned():
+    body, _ = encode_chart_payload(make_payload(6))  # 7 int32 deltas and float32 values: odd lengths need padding
+    assert len(body) % 8 == 0
+    assert decode(body)[0] == make_payload(6)['timestamps']
+
+
+def test_lists_of_another_length_are_left_out():
+    payload = make_payload(10)
+    payload['strikes'] = payload['strikes'][:-1]
+    _, series = decode(encode_chart_payload(payload)[0])
+    assert 'strikes' not in series
+
+
+def test_empty_payload():
+    body, metadata = encode_chart_payload({'timestamps': [], 'iv_values': []})
+    assert decode(body) == ([], {})
+    assert metadata['data_points'] == 0
+
+
+def test_metadata_header_is_ascii_json():
+    header = encode_metadata_header({'symbol': 'NSE:NIFTY', 'note': 'é', 'has_more': True})
+    assert header.isascii()
+    assert json.loads(header) == {'symbol': 'NSE:NIFTY', 'note': 'é', 'has_more': True}
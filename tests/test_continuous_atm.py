@@ -0,0 +1,67 @@
+"""Continuous ATM series: stitching strike segments across rolls (main.stitch_continuous_atm)"""
+
+from datetime import datetime
+import pandas as pd
+
+SYMBOL = 'NSE:NIFTY-ATM-CE-20260106'
+
+
+def segment(start, periods, strike, iv):
+    """IV rows of one strike, one per minute from start"""
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=periods, freq='min'),
+        'option_name': f"NSE:NIFTY26106{strike}CE",
+        'close': 100.0,
+        'fclose': 26000.0,
+        'strike': strike,
+        'iv': iv
+    })
+
+
+def test_first_segment(main):
+    applied = main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:15', 5, 26000, 12.0), timeframe='1')
+    assert applied == 5
+    assert main.iv_data_store[SYMBOL]['strikes'] == [26000] * 5
+    assert main.iv_data_store[SYMBOL]['iv_values'] == [12.0] * 5
+
+
+def test_roll_keeps_earlier_strike_rows(main):
+    main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:15', 10, 26000, 12.0), timeframe='1')
+
+    # ATM rolls at 09:20; the new strike's frame starts earlier but only rows from the roll on apply
+    roll = datetime(2026, 1, 5, 9, 20)
+    applied = main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:15', 10, 26050, 13.0), segment_start=roll, timeframe='1')
+    assert applied == 5
+
+    stitched = main.continuous_atm_frames[SYMBOL]
+    assert stitched['date'].tolist() == list(pd.date_range('2026-01-05 09:15', periods=10, freq='min'))
+    assert stitched['strike'].tolist() == [26000] * 5 + [26050] * 5
+    assert stitched['iv'].tolist() == [12.0] * 5 + [13.0] * 5
+    assert main.iv_data_store[SYMBOL]['strikes'] == stitched['strike'].tolist()
+
+
+def test_stitched_series_is_persisted(main):
+    main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:15', 10, 26000, 12.0), timeframe='1')
+    main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:20', 5, 26050, 13.0),
+                               segment_start=datetime(2026, 1, 5, 9, 20), timeframe='1')
+
+    # A restart loads the series back from storage
+    main.continuous_atm_frames.clear()
+    reloaded = main.load_continuous_atm_frame(SYMBOL)
+    assert reloaded['strike'].tolist() == [26000] * 5 + [26050] * 5
+    assert reloaded['iv'].tolist() == [12.0] * 5 + [13.0] * 5
+
+
+def test_roll_replaces_stored_rows_from_the_cutoff(main):
+    main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:15', 10, 26000, 12.0), timeframe='1')
+    # The new strike only has rows up to 09:22; the old strike's 09:23-09:24 rows must not survive on disk
+    main.stitch_continuous_atm(SYMBOL, segment('2026-01-05 09:20', 3, 26050, 13.0),
+                               segment_start=datetime(2026, 1, 5, 9, 20), timeframe='1')
+    in_memory = main.continuous_atm_frames[SYMBOL]
+    assert len(in_memory) == 8
+
+    main.continuous_atm_frames.clear()
+    reloaded = main.load_continuous_atm_frame(SYMBOL)
+    assert reloaded['date'].tolist() == in_memory['date'].tolist()
+    assert reloaded['strike'].tolist() == [26000] * 5 + [26050] * 3
+    assert main.iv_series.read(SYMBOL)['date'].tolist() == in_memory['date'].tolist()
@@ -0,0 +1,53 @@
+"""Chart downsampling: point budget, endpoints and extrema (downsampling.py)"""
+
+import numpy as np
+import pytest
+from downsampling import DOWNSAMPLE_METHODS, downsample_indices
+
+N = 5000
+
+
+@pytest.fixture
+def noisy():
+    rng = np.random.default_rng(7)
+    x = np.arange(N, dtype=np.float64) * 60
+    iv = 12 + np.cumsum(rng.normal(0, 0.05, N))
+    iv[1234] = iv.max() + 5  # Spike
+    iv[3456] = iv.min() - 5  # Dip
+    close = 100 + np.cumsum(rng.normal(0, 0.5, N))
+    return x, iv, close
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLE_METHODS)
+def test_budget_and_endpoints(noisy, method):
+    x, iv, close = noisy
+    indices = downsample_indices(x, [iv, close], 500, method=method)
+    assert len(indices) <= 500
+    assert indices[0] == 0 and indices[-1] == N - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLE_METHODS)
+def test_keeps_extrema(noisy, method):
+    x, iv, close = noisy
+    indices = downsample_indices(x, [iv, close], 500, method=method)
+    assert 1234 in indices and 3456 in indices
+    if method == 'minmax':
+        # Every series keeps its global minimum and maximum
+        for values in (iv, close):
+            assert int(np.argmax(values)) in indices and int(np.argmin(values)) in indices
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLE_METHODS)
+def test_series_that_fit_are_untouched(noisy, method):
+    x, iv, close = noisy
+    assert downsample_indices(x[:100], [iv[:100], close[:100]], 500, method=method).tolist() == list(range(100))
+
+
+def test_nan_values(noisy):
+    x, iv, close = noisy
+    iv = iv.copy()
+    iv[::7] = np.nan
+    for method in DOWNSAMPLE_METHODS:
+        indices = downsample_indices(x, [iv, close], 300, method=method)
+        assert len(indices) <= 300 and indices[0] == 0 and indices[-1] == N - 1
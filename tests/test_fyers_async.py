@@ -0,0 +1,76 @@
+"""Batched quotes on the async Fyers engine (fyers_async.FyersAsyncEngine.quote)"""
+
+import asyncio
+import threading
+import pytest
+
+fyers_async = pytest.importorskip('fyers_async')
+if not fyers_async.AIOHTTP_AVAILABLE:
+    pytest.skip('aiohttp is not installed', allow_module_level=True)
+
+
+@pytest.fixture
+def engine():
+    """An engine whose /quotes endpoint is faked; records the symbols of each request"""
+    engine = fyers_async.FyersAsyncEngine()
+    engine.requests = []
+    engine.latency = 0
+
+    async def fake_get(endpoint, params):
+        await asyncio.sleep(engine.latency)
+        symbols = params['symbols'].split(',')
+        engine.requests.append(symbols)
+        return {'s': 'ok', 'd': [{'n': s, 'v': {'lp': 100.0 + i}} for i, s in enumerate(symbols) if s != 'NSE:MISSING']}
+
+    engine._get = fake_get
+    yield engine
+    engine.close()
+
+
+def fetch_concurrently(engine, symbols):
+    results = {}
+    barrier = threading.Barrier(len(symbols))
+
+    def fetch(symbol):
+        barrier.wait()
+        results[symbol] = engine.fetch_ltp(symbol)
+    threads = [threading.Thread(target=fetch, args=(symbol,)) for symbol in symbols]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_quotes_share_one_request(engine):
+    symbols = [f'NSE:FUT{i}' for i in range(5)]
+    results = fetch_concurrently(engine, symbols)
+    assert len(engine.requests) == 1
+    assert sorted(engine.requests[0]) == sorted(symbols)
+    assert all(results[s] is not None for s in symbols)
+
+
+def test_batches_are_split(engine, monkeypatch):
+    monkeypatch.setattr(fyers_async, 'QUOTES_BATCH', 2)
+    fetch_concurrently(engine, [f'NSE:FUT{i}' for i in range(5)])
+    assert sorted(len(request) for request in engine.requests) == [1, 2, 2]
+
+
+def test_missing_quote_is_none(engine):
+    assert engine.fetch_ltp('NSE:MISSING') is None
+    assert engine.fetch_ltp('NSE:FUT0') == 100.0
+
+
+def test_cancelled_caller_does_not_cancel_the_batch(engine):
+    engine.latency = 0.6
+    stop = threading.Event()
+    results = {}
+    cancelled = threading.Thread(target=lambda: results.setdefault('cancelled', engine.fetch_ltp('NSE:FUT0', stop_event=stop)))
+    waiting = threading.Thread(target=lambda: results.setdefault('waiting', engine.fetch_ltp('NSE:FUT0')))
+    cancelled.start()
+    waiting.start()
+    threading.Timer(0.2, stop.set).start()
+    cancelled.join()
+    waiting.join()
+    assert results == {'cancelled': None, 'waiting': 100.0}
+    assert len(engine.requests) == 1
@@ -0,0 +1,119 @@
+"""IV history storage backends: write/read round trips, upserts and range reads (iv_storage.py)"""
+
+import pandas as pd
+import pytest
+import iv_storage
+from iv_storage import create_storage_backend
+
+SYMBOL = 'NSE:NIFTY2610626000CE'
+
+needs_pyarrow = pytest.mark.skipif(not iv_storage.PYARROW_AVAILABLE, reason="pyarrow not installed")
+BACKENDS = ['csv', pytest.param('parquet', marks=needs_pyarrow), pytest.param('feather', marks=needs_pyarrow), 'sqlite']
+
+
+@pytest.fixture(params=BACKENDS)
+def storage(request, tmp_path):
+    return create_storage_backend(request.param, str(tmp_path))
+
+
+def frame(start, periods, iv_offset=0.0):
+    """One row per minute from start, like save_iv_to_csv writes them"""
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=periods, freq='min'),
+        'option_name': SYMBOL,
+        'close': [100.0 + i for i in range(periods)],
+        'fclose': 26000.5,
+        'strike': 26000.0,
+        'iv': [iv_offset + 12.0 + i * 0.25 for i in range(periods)]
+    })
+
+
+def test_round_trip(storage):
+    written = frame('2026-01-05 09:15', 30)
+    storage.write(SYMBOL, written)
+    assert storage.exists(SYMBOL)
+
+    stored = storage.read(SYMBOL)
+    assert stored['date'].tolist() == written['date'].tolist()
+    assert stored['iv'].tolist() == pytest.approx(written['iv'].tolist(), abs=1e-4)
+    assert stored['close'].tolist() == pytest.approx(written['close'].tolist(), abs=1e-4)
+    assert stored['option_name'].tolist() == [SYMBOL] * 30
+
+
+def test_upsert_replaces_rows_with_the_same_date(storage):
+    storage.write(SYMBOL, frame('2026-01-05 09:15', 10))
+    storage.write(SYMBOL, frame('2026-01-05 09:20', 10, iv_offset=5.0))
+
+    stored = storage.read(SYMBOL)
+    assert stored['date'].tolist() == list(pd.date_range('2026-01-05 09:15', periods=15, freq='min'))
+    assert stored['iv'].tolist()[:5] == pytest.approx([12.0, 12.25, 12.5, 12.75, 13.0])
+    assert stored['iv'].tolist()[5:] == pytest.approx([17.0 + i * 0.25 for i in range(10)])
+
+
+def test_missing_text_values_read_back_missing(storage):
+    written = frame('2026-01-05 09:15', 4)
+    written['option_name'] = [SYMBOL, None, float('nan'), SYMBOL]
+    storage.write(SYMBOL, written)
+    # A later merge into the same partition keeps them missing too
+    storage.write(SYMBOL, frame('2026-01-05 09:19', 1))
+
+    stored = storage.read(SYMBOL)
+    assert stored['option_name'].isna().tolist() == [False, True, True, False, False]
+    assert stored['option_name'].tolist()[0] == SYMBOL
+
+
+def test_replace_from_drops_stored_rows_from_the_cutoff(storage):
+    storage.write(SYMBOL, pd.concat([frame('2026-01-05 15:20', 10), frame('2026-01-06 09:15', 10)], ignore_index=True))
+    # A re-stitched segment from 15:25 that ends before the old rows do
+    storage.write(SYMBOL, frame('2026-01-05 15:25', 3, iv_offset=5.0), replace_from=pd.Timestamp('2026-01-05 15:25'))
+
+    stored = storage.read(SYMBOL)
+    assert stored['date'].tolist() == list(pd.date_range('2026-01-05 15:20', periods=8, freq='min'))
+    assert stored['iv'].tolist() == pytest.approx([12.0, 12.25, 12.5, 12.75, 13.0, 17.0, 17.25, 17.5])
+
+def test_range_read_across_days(storage):
+    storage.write(SYMBOL, pd.concat([frame('2026-01-05 15:20', 10), frame('2026-01-06 09:15', 10)], ignore_index=True))
+
+    stored = storage.read(SYMBOL, start=pd.Timestamp('2026-01-05 15:25'), end=pd.Timestamp('2026-01-06 09:19'))
+    assert stored['date'].min() == pd.Timestamp('2026-01-05 15:25')
+    assert stored['date'].max() == pd.Timestamp('2026-01-06 09:19')
+    assert len(stored) == 10
+
+
+def test_latest(storage):
+    storage.write(SYMBOL, frame('2026-01-05 09:15', 20))
+    latest = storage.latest(SYMBOL, 5)
+    assert latest['date'].tolist() == list(pd.date_range('2026-01-05 09:30', periods=5, freq='min'))
+
+
+def test_read_many(storage):
+    other = 'NSE:NIFTY2610626000PE'
+    storage.write(SYMBOL, frame('2026-01-05 09:15', 5))
+    storage.write(other, frame('2026-01-05 09:17', 5))
+    both = storage.read_many([SYMBOL, other], start=pd.Timestamp('2026-01-05 09:18'))
+    assert sorted(both['symbol'].unique()) == sorted(iv_storage.safe_symbol_name(s) for s in (SYMBOL, other))
+    assert len(both) == 2 + 4
+    assert both['date'].is_monotonic_increasing
+
+
+def test_missing_symbol(storage):
+    assert storage.read('NSE:UNKNOWN') is None
+    assert not storage.exists('NSE:UNKNOWN')
+
+
+def test_delete(storage):
+    storage.write(SYMBOL, frame('2026-01-05 09:15', 5))
+    assert storage.delete(SYMBOL)
+    assert storage.read(SYMBOL) is None
+
+
+def test_sqlite_keeps_core_columns_without_values(tmp_path):
+    storage = create_storage_backend('sqlite', str(tmp_path))
+    written = frame('2026-01-05 09:15', 3).drop(columns=['fclose'])  # e.g. no future close yet
+    storage.write(SYMBOL, written)
+
+    stored = storage.read(SYMBOL)
+    assert {'close', 'fclose', 'iv'} <= set(stored.columns)
+    assert stored['fclose'].isna().all()
+    # Columns outside the core set that the series never had are still left out
+    assert 'call_iv' not in stored.columns
@@ -0,0 +1,99 @@
+"""Market calendar: sessions, special sessions over holidays, close grace, candle bounds and trading time (market_calendar.py)"""
+
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+import market_calendar
+from market_calendar import (SESSION_CLOSE_GRACE, TRADING_DAYS_PER_YEAR, build_trading_minutes_lookup, candle_bounds,
+                             compute_time_to_expiry, get_session, market_status)
+
+# 2026-01-05 is a Monday; Tuesday 2026-01-06 is a holiday with an evening special session
+MONDAY = datetime(2026, 1, 5)
+HOLIDAY = datetime(2026, 1, 6)
+FRIDAY = datetime(2026, 1, 9)
+
+
+@pytest.fixture(autouse=True)
+def calendar_files(tmp_path, monkeypatch):
+    holidays = tmp_path / 'MarketHolidays.csv'
+    holidays.write_text("Exchange,Date,Description\nNSE,06-01-2026,Test holiday\n")
+    special = tmp_path / 'MarketSpecialSessions.csv'
+    special.write_text("Exchange,Date,Open,Close,Description\nNSE,06-01-2026,18:15,19:15,Muhurat trading\n")
+    monkeypatch.setattr(market_calendar, 'HOLIDAYS_FILE', str(holidays))
+    monkeypatch.setattr(market_calendar, 'SPECIAL_SESSIONS_FILE', str(special))
+    market_calendar.reload_market_holidays()
+    yield
+    market_calendar.reload_market_holidays()
+
+
+def at(day, hour, minute, second=0):
+    return day.replace(hour=hour, minute=minute, second=second)
+
+
+def test_regular_session():
+    assert get_session(MONDAY, 'NSE') == (at(MONDAY, 9, 15), at(MONDAY, 15, 30))
+    assert get_session(MONDAY, 'MCX') == (at(MONDAY, 9, 0), at(MONDAY, 23, 30))
+    assert get_session(datetime(2026, 1, 10), 'NSE') is None  # Saturday
+
+
+def test_special_session_over_holiday():
+    assert get_session(HOLIDAY, 'NSE') == (at(HOLIDAY, 18, 15), at(HOLIDAY, 19, 15))
+    # Regular hours don't apply on the holiday; the market opens for the special session only
+    assert market_status('NSE', at(HOLIDAY, 10, 0)) == (False, at(HOLIDAY, 18, 15))
+    assert market_status('NSE', at(HOLIDAY, 18, 30)) == (True, at(HOLIDAY, 19, 15) + SESSION_CLOSE_GRACE)
+    # The holiday file is per exchange
+    assert get_session(HOLIDAY, 'MCX') == (at(HOLIDAY, 9, 0), at(HOLIDAY, 23, 30))
+
+
+def test_close_grace():
+    close = at(MONDAY, 15, 30)
+    assert market_status('NSE', close - timedelta(seconds=1)) == (True, close + SESSION_CLOSE_GRACE)
+    # Still open during the grace period, so the final candle is collected
+    assert market_status('NSE', close + timedelta(seconds=30)) == (True, close + SESSION_CLOSE_GRACE)
+    # After it, closed until the next session (the special session on the holiday)
+    assert market_status('NSE', close + SESSION_CLOSE_GRACE) == (False, at(HOLIDAY, 18, 15))
+
+
+def test_closed_over_weekend():
+    assert market_status('NSE', at(FRIDAY, 16, 0)) == (False, at(datetime(2026, 1, 12), 9, 15))
+
+
+def test_30m_candles_anchored_at_open():
+    thirty = 30 * 60
+    assert candle_bounds(thirty, 'NSE', at(MONDAY, 9, 15)) == (at(MONDAY, 9, 15), at(MONDAY, 9, 45))
+    assert candle_bounds(thirty, 'NSE', at(MONDAY, 10, 0)) == (at(MONDAY, 9, 45), at(MONDAY, 10, 15))
+    # The last candle is cut short by the close
+    assert candle_bounds(thirty, 'NSE', at(MONDAY, 15, 20)) == (at(MONDAY, 15, 15), at(MONDAY, 15, 30))
+    # Special sessions anchor to their own open
+    assert candle_bounds(thirty, 'NSE', at(HOLIDAY, 18, 50)) == (at(HOLIDAY, 18, 45), at(HOLIDAY, 19, 15))
+
+
+def test_candles_outside_session_follow_clock():
+    assert candle_bounds(30 * 60, 'NSE', at(MONDAY, 16, 10)) == (at(MONDAY, 16, 0), at(MONDAY, 16, 30))
+
+
+def trading_minutes_to(expiry, *timestamps):
+    years = compute_time_to_expiry(np.array(timestamps, dtype='datetime64[ns]'), expiry, basis='trading')
+    return (years * TRADING_DAYS_PER_YEAR * 375).round(6).tolist()  # 375 NSE session minutes per year-day
+
+
+def test_trading_time_counts_special_sessions():
+    wednesday = datetime(2026, 1, 7)
+    # Monday close -> Wednesday 10:15: the holiday's 60-minute special session plus 60 minutes on Wednesday
+    assert trading_minutes_to(at(wednesday, 10, 15), at(MONDAY, 15, 30)) == [120.0]
+    # Inside the special session only the rest of it counts
+    assert trading_minutes_to(at(wednesday, 10, 15), at(HOLIDAY, 18, 45), at(HOLIDAY, 10, 0)) == [90.0, 120.0]
+    # Over the weekend nothing accrues
+    assert trading_minutes_to(at(datetime(2026, 1, 12), 9, 45), at(FRIDAY, 15, 0)) == [60.0]
+
+
+def test_trading_lookup_is_cached_per_exchange():
+    first = build_trading_minutes_lookup('NSE', '2026-01-05', '2026-01-09')
+    assert build_trading_minutes_lookup('NSE', '2026-01-06', '2026-01-08') is first
+    # A range outside the cached one extends it instead of adding another entry
+    extended = build_trading_minutes_lookup('NSE', '2026-01-01', '2026-01-20')
+    assert set(market_calendar._trading_lookup_cache) == {'NSE'}
+    assert extended['base'] == np.datetime64('2026-01-01')
+    assert len(extended['day_start']) == 20
+    # Monday 9:15 to the Monday after next: 9 regular sessions plus the special session
+    assert trading_minutes_to(at(datetime(2026, 1, 19), 9, 15), at(MONDAY, 9, 15)) == [9 * 375 + 60.0]
@@ -0,0 +1,40 @@
+"""Put-call parity implied forward (main.build_parity_forward)"""
+
+from datetime import datetime
+import pandas as pd
+import pytest
+
+EXPIRY = datetime(2026, 1, 6, 15, 30)
+
+
+def leg(closes, start='2026-01-05 09:15'):
+    return pd.DataFrame({'date': pd.date_range(start, periods=len(closes), freq='min'), 'close': closes})
+
+
+def test_forward_matches_hand_computed_value(main):
+    # T = 30 h 15 min / (365 * 24 h) = 0.0034532 years, e^(0.07 * T) = 1.00024175
+    # F = K + e^(rT) * (C - P) = 26000 + 1.00024175 * (120 - 80) = 26040.00967
+    forward = main.build_parity_forward(leg([120.0]), leg([80.0]), 26000, EXPIRY, risk_free_rate=0.07)
+    assert forward['date'].tolist() == [pd.Timestamp('2026-01-05 09:15')]
+    assert forward['close'].iloc[0] == pytest.approx(26040.00967, abs=1e-5)
+    assert forward['forward_source'].tolist() == ['parity']
+
+
+def test_put_above_call_gives_forward_below_strike(main):
+    forward = main.build_parity_forward(leg([80.0]), leg([120.0]), 26000, EXPIRY, risk_free_rate=0.07)
+    assert forward['close'].iloc[0] == pytest.approx(25959.99033, abs=1e-5)
+
+
+def test_rows_without_a_valid_forward_are_left_out(main):
+    call = leg([120.0, 0.0, 121.0, 122.0])
+    put = leg([80.0, 81.0, 82.0, 83.0]).drop(index=2)  # No put candle at 09:17
+    forward = main.build_parity_forward(call, put, 26000, EXPIRY, risk_free_rate=0.07)
+    # 09:16 has a zero call price
+    assert forward['date'].tolist() == [pd.Timestamp('2026-01-05 09:15'), pd.Timestamp('2026-01-05 09:18')]
+
+
+def test_missing_leg_or_expired(main):
+    assert len(main.build_parity_forward(leg([120.0]), None, 26000, EXPIRY)) == 0
+    assert len(main.build_parity_forward(leg([120.0]), leg([80.0])[:0], 26000, EXPIRY)) == 0
+    after_expiry = main.build_parity_forward(leg([120.0], '2026-01-06 15:31'), leg([80.0], '2026-01-06 15:31'), 26000, EXPIRY)
+    assert len(after_expiry) == 0
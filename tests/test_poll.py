@@ -0,0 +1,106 @@
+"""Status + chart data long-poll (/api/poll)"""
+
+import threading
+import time
+import pandas as pd
+import pytest
+
+SYMBOL = 'NSE:NIFTY-ATM-CE-20260106'
+
+
+def payload(main, periods):
+    return main.build_iv_payload(pd.DataFrame({
+        'date': pd.date_range('2026-01-05 09:15', periods=periods, freq='min'),
+        'iv': [12.0 + i * 0.01 for i in range(periods)],
+        'close': 100.0,
+        'fclose': 26000.0
+    }))
+
+
+@pytest.fixture
+def client(main):
+    main.set_iv_data(SYMBOL, payload(main, 50))
+    return main.app.test_client()
+
+
+def poll(client, **params):
+    started = time.monotonic()
+    response = client.get('/api/poll', query_string={'symbol': SYMBOL, **params})
+    assert response.status_code == 200
+    return response.get_json(), time.monotonic() - started
+
+
+def test_first_poll_returns_at_once(client):
+    body, elapsed = poll(client, timeout=5)
+    assert elapsed < 2
+    assert body['changed'] and not body['delta']
+    assert body['symbol'] == SYMBOL
+    assert len(body['data']['timestamps']) == 50
+
+
+def test_returns_unchanged_on_timeout(main, client):
+    version = main.iv_data_versions[SYMBOL]
+    body, elapsed = poll(client, version=version, active=0, timeout=0.5)
+    assert 0.4 <= elapsed < 2
+    assert not body['changed']
+    assert body['version'] == version
+    assert body['data'] is None
+
+
+def test_returns_on_version_bump(main, client):
+    version = main.iv_data_versions[SYMBOL]
+    since = payload(main, 50)['timestamps'][-1]
+    writer = threading.Timer(0.3, lambda: main.set_iv_data(SYMBOL, payload(main, 52)))
+    writer.start()
+    try:
+        body, elapsed = poll(client, version=version, active=0, since=since, timeout=10)
+    finally:
+        writer.join()
+    assert elapsed < 5
+    assert body['changed'] and body['version'] > version
+    # Only the rows from the client's latest point on
+    assert body['delta']
+    assert body['data']['timestamps'] == payload(main, 52)['timestamps'][49:]
+
+
+def test_timeout_is_capped(main, client, monkeypatch):
+    monkeypatch.setattr(main, 'POLL_MAX_TIMEOUT', 0.5)
+    body, elapsed = poll(client, version=main.iv_data_versions[SYMBOL], active=0, timeout=60)
+    assert 0.4 <= elapsed < 2
+    assert not body['changed']
+
+
+def test_invalid_parameter(client):
+    assert client.get('/api/poll', query_string={'version': 'x'}).status_code == 400
+
+
+@pytest.fixture
+def viewer(main, client, monkeypatch):
+    """The app as a read-only viewer (IV_VIEWER_ONLY=1) of a collector tracking SYMBOL"""
+    monkeypatch.setattr(main, 'VIEWER_ONLY', True)
+
+    def publish(active):
+        main.write_collector_status([{'active': active, 'mode': 'automatic', 'future_symbol': 'NSE:NIFTY26JANFUT',
+                                      'symbol': 'NSE:NIFTY2610626000CE', 'continuous_symbol': SYMBOL}])
+    publish(True)
+    return publish
+
+
+def test_viewer_reports_the_collector_status(main, client, viewer):
+    assert not main.fetching_status.get('active')  # The viewer itself never fetches
+    body, _ = poll(client, timeout=5)
+    assert body['status']['active'] and body['status']['viewer']
+    assert body['status']['continuous_symbol'] == SYMBOL
+    assert body['status'] == client.get('/api/get_status').get_json()
+
+
+def test_viewer_poll_waits_while_the_collector_is_active(main, client, viewer):
+    version = main.iv_data_versions[SYMBOL]
+    body, elapsed = poll(client, version=version, active=1, timeout=0.5)
+    assert elapsed >= 0.4
+    assert not body['changed'] and body['status']['active']
+
+    viewer(False)  # The collector stopped tracking
+    body, elapsed = poll(client, version=version, active=1, timeout=5)
+    assert elapsed < 2
+    assert body['changed'] and not body['status']['active']
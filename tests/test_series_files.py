@@ -0,0 +1,156 @@
+"""Memory-mapped binary IV series files: append, tail rewrite, window reads and the resolution pyramid (iv_storage.SeriesFileStore)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from iv_storage import SeriesFileStore
+
+SYMBOL = 'NSE:NIFTY-ATM-CE-20260106'
+
+
+@pytest.fixture
+def series(tmp_path):
+    return SeriesFileStore(str(tmp_path))
+
+
+def frame(start, periods, iv_offset=0.0, freq='min'):
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=periods, freq=freq),
+        'iv': [iv_offset + 12.0 + i * 0.01 for i in range(periods)],
+        'close': [100.0 + i for i in range(periods)],
+        'fclose': 26000.0
+    })
+
+
+def test_round_trip(series):
+    written = frame('2026-01-05 09:15', 100)
+    assert series.write(SYMBOL, written) == 100
+
+    stored = series.read(SYMBOL)
+    assert stored['date'].tolist() == written['date'].tolist()
+    assert stored['iv'].tolist() == written['iv'].tolist()
+    assert stored['close'].tolist() == written['close'].tolist()
+    assert stored['fclose'].tolist() == written['fclose'].tolist()
+
+
+def test_reader_ignores_a_partly_written_append(series):
+    """A reader racing an append sees the whole records already written, never a partial one"""
+    series.write(SYMBOL, frame('2026-01-05 09:15', 10))
+    appended = np.zeros(2, dtype=SeriesFileStore.RECORD).tobytes()
+    with open(series.path(SYMBOL), 'ab') as f:
+        f.write(appended[:SeriesFileStore.RECORD.itemsize + 5])  # One record and part of the next
+
+    stored = series.read(SYMBOL)
+    assert len(stored) == 11
+    assert stored['date'].tolist()[:10] == frame('2026-01-05 09:15', 10)['date'].tolist()
+
+
+def test_append_and_rewrite_tail(series):
+    series.write(SYMBOL, frame('2026-01-05 09:15', 10))
+    series.write(SYMBOL, frame('2026-01-05 09:25', 5, iv_offset=1.0))  # Appended after the last record
+    series.write(SYMBOL, frame('2026-01-05 09:29', 2, iv_offset=5.0))  # Rewrites the live candle, adds one
+
+    stored = series.read(SYMBOL)
+    assert stored['date'].tolist() == list(pd.date_range('2026-01-05 09:15', periods=16, freq='min'))
+    assert stored['iv'].tolist()[:10] == frame('2026-01-05 09:15', 10)['iv'].tolist()
+    assert stored['iv'].tolist()[10:14] == pytest.approx([13.0, 13.01, 13.02, 13.03])
+    assert stored['iv'].tolist()[14:] == pytest.approx([17.0, 17.01])
+
+
+def test_rewrite_leaves_earlier_mappings_intact(series):
+    written = frame('2026-01-05 09:15', 10)
+    series.write(SYMBOL, written)
+    # A reader (another process) that mapped the file before the rewrite
+    mapped = np.memmap(series.path(SYMBOL), dtype=SeriesFileStore.RECORD, mode='r', offset=SeriesFileStore.HEADER.size)
+
+    series.write(SYMBOL, frame('2026-01-05 09:20', 5, iv_offset=5.0))
+    assert mapped['iv'].tolist() == written['iv'].tolist()
+    assert series.read(SYMBOL)['iv'].tolist()[5:] == pytest.approx([17.0, 17.01, 17.02, 17.03, 17.04])
+    del mapped
+
+def test_replace_from(series):
+    series.write(SYMBOL, frame('2026-01-05 09:15', 10))
+    series.write(SYMBOL, frame('2026-01-05 09:20', 2, iv_offset=5.0), replace_from=pd.Timestamp('2026-01-05 09:20'))
+    stored = series.read(SYMBOL)
+    assert stored['date'].tolist() == list(pd.date_range('2026-01-05 09:15', periods=7, freq='min'))
+    assert series.read(SYMBOL, level='5m')['date'].tolist() == [pd.Timestamp('2026-01-05 09:15'), pd.Timestamp('2026-01-05 09:20')]
+    assert series.read(SYMBOL, level='5m')['iv'].tolist() == pytest.approx([12.04, 17.01])
+
+def test_window_read(series):
+    series.write(SYMBOL, frame('2026-01-05 09:15', 100))
+    window = series.read(SYMBOL, start=pd.Timestamp('2026-01-05 09:30'), end=pd.Timestamp('2026-01-05 09:39'))
+    assert window['date'].tolist() == list(pd.date_range('2026-01-05 09:30', periods=10, freq='min'))
+    assert window['close'].tolist() == [115.0 + i for i in range(10)]
+
+
+def test_missing_values_stay_nan(series):
+    written = frame('2026-01-05 09:15', 3).drop(columns=['fclose'])
+    written.loc[1, 'iv'] = np.nan
+    series.write(SYMBOL, written)
+    stored = series.read(SYMBOL)
+    assert np.isnan(stored['fclose']).all()
+    assert np.isnan(stored['iv'][1]) and stored['iv'][0] == 12.0
+
+
+def test_no_series(series):
+    assert series.read(SYMBOL) is None
+    assert not series.exists(SYMBOL)
+    series.write(SYMBOL, frame('2026-01-05 09:15', 3))
+    assert series.delete(SYMBOL) == 1
+    assert series.read(SYMBOL) is None
+
+
+def resampled(raw, rule):
+    """Pandas reference for a pyramid level: IV OHLC plus the last close/fclose of each non-empty bucket"""
+    grouped = raw.set_index('date').resample(rule)
+    expected = pd.DataFrame({
+        'open': grouped['iv'].first(),
+        'high': grouped['iv'].max(),
+        'low': grouped['iv'].min(),
+        'iv': grouped['iv'].last(),
+        'close': grouped['close'].last(),
+        'fclose': grouped['fclose'].last()
+    })
+    return expected[grouped['iv'].count() > 0].reset_index()
+
+
+def session_minutes(days):
+    """NSE session candles (9:15-15:29) with a random-walk IV"""
+    dates = pd.DatetimeIndex([])
+    for day in days:
+        dates = dates.append(pd.date_range(f"{day} 09:15", f"{day} 15:29", freq='min'))
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        'date': dates,
+        'iv': 12 + np.cumsum(rng.normal(0, 0.05, len(dates))),
+        'close': 100 + np.cumsum(rng.normal(0, 0.5, len(dates))),
+        'fclose': 26000 + np.cumsum(rng.normal(0, 2, len(dates)))
+    })
+
+
+@pytest.mark.parametrize('level, rule', [('5m', '5min'), ('15m', '15min'), ('1h', '1h'), ('1D', '1D')])
+def test_pyramid_matches_pandas_resample(series, level, rule):
+    raw = session_minutes(['2026-01-05', '2026-01-06', '2026-01-07'])
+    # Written in chunks, with the live candle rewritten, as the fetch loop does
+    for lo in range(0, len(raw), 97):
+        series.write(SYMBOL, raw.iloc[lo:lo + 97])
+        live = raw.iloc[[min(lo + 96, len(raw) - 1)]].copy()
+        live['iv'] += 1.0
+        series.write(SYMBOL, live)
+        series.write(SYMBOL, raw.iloc[[min(lo + 96, len(raw) - 1)]])
+
+    stored = series.read(SYMBOL, level=level)
+    expected = resampled(raw, rule)
+    assert stored['date'].tolist() == expected['date'].tolist()
+    for column in ('open', 'high', 'low', 'iv', 'close', 'fclose'):
+        assert stored[column].to_numpy() == pytest.approx(expected[column].to_numpy()), column
+
+
+def test_pick_level(series):
+    series.write(SYMBOL, session_minutes(['2026-01-05', '2026-01-06']))  # 750 candles
+    assert series.pick_level(SYMBOL) == '1m'
+    assert series.pick_level(SYMBOL, max_points=750) == '1m'
+    assert series.pick_level(SYMBOL, max_points=200) == '5m'    # 150 points
+    assert series.pick_level(SYMBOL, max_points=100) == '15m'   # 50 points
+    assert series.pick_level(SYMBOL, max_points=10) == '1D'     # 1h has 14 points, 1D has 2
+    assert series.pick_level(SYMBOL, max_points=1) == '1D'      # Nothing fits: the coarsest level
@@ -0,0 +1,90 @@
+"""Shared-memory series: publish / grow / incremental read round trips (shared_series.py)"""
+
+import uuid
+import pandas as pd
+import pytest
+import shared_series
+from shared_series import MIN_CAPACITY, SharedSeriesReader, SharedSeriesWriter
+
+pytestmark = pytest.mark.skipif(not shared_series.SHARED_MEMORY_AVAILABLE, reason="multiprocessing.shared_memory needs Python 3.8+")
+
+
+def make_payload(count, iv_offset=0.0):
+    timestamps = pd.date_range('2026-01-05 09:15', periods=count, freq='min').strftime('%Y-%m-%dT%H:%M:%S+05:30').tolist()
+    return {
+        'timestamps': timestamps,
+        'iv_values': [iv_offset + i * 0.01 for i in range(count)],
+        'close_prices': [100.0 + i for i in range(count)],
+        'fclose_prices': [None] * count,
+    }
+
+
+@pytest.fixture
+def symbol():
+    return f"NSE:TEST-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def series(monkeypatch):
+    # Writer and reader share this process, so the reader must not unregister the writer's segments
+    # from the resource tracker (across processes it has to)
+    monkeypatch.setattr(shared_series.resource_tracker, 'unregister', lambda *args: None)
+    writer, reader = SharedSeriesWriter(), SharedSeriesReader()
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_round_trip(series, symbol):
+    writer, reader = series
+    published = make_payload(45)
+    writer.publish(symbol, published)
+
+    payload, changed = reader.payload(symbol)
+    assert changed
+    assert payload['timestamps'] == published['timestamps']
+    assert payload['iv_values'] == pytest.approx(published['iv_values'])
+    assert payload['close_prices'] == published['close_prices']
+    assert payload['fclose_prices'] == [None] * 45
+    assert 'strikes' not in payload
+
+    assert reader.payload(symbol) == (payload, False)
+
+
+def test_tail_update(series, symbol):
+    writer, reader = series
+    writer.publish(symbol, make_payload(100))
+    reader.payload(symbol)
+
+    updated = make_payload(101)
+    updated['iv_values'][99] = 42.0  # Rewritten forming candle plus one new candle
+    writer.publish(symbol, updated, from_index=99)
+
+    payload, changed = reader.payload(symbol)
+    assert changed
+    assert payload['timestamps'] == updated['timestamps']
+    assert payload['iv_values'] == pytest.approx(updated['iv_values'])
+
+
+def test_growth_replaces_segment(series, symbol):
+    writer, reader = series
+    writer.publish(symbol, make_payload(45))
+    assert len(reader.payload(symbol)[0]['timestamps']) == 45
+
+    # Past MIN_CAPACITY the writer retires the segment and starts a larger one whose sequence restarts
+    grown = make_payload(MIN_CAPACITY + 949, iv_offset=1.0)
+    writer.publish(symbol, grown)
+
+    payload, changed = reader.payload(symbol)
+    assert changed
+    assert payload['timestamps'] == grown['timestamps']
+    assert payload['iv_values'] == pytest.approx(grown['iv_values'])
+
+
+def test_drop(series, symbol):
+    writer, reader = series
+    writer.publish(symbol, make_payload(10))
+    assert reader.payload(symbol)[0] is not None
+
+    writer.drop(symbol)
+    assert reader.payload(symbol) == (None, False)
@@ -0,0 +1,48 @@
+"""Paired CE+PE mode: straddle IV frame from the two legs (main.build_straddle_iv)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def leg(ivs, closes, start='2026-01-05 09:15'):
+    return pd.DataFrame({
+        'date': pd.date_range(start, periods=len(ivs), freq='min'),
+        'iv': ivs,
+        'close': closes,
+        'fclose': 26010.0,
+        'strike': 26000
+    })
+
+
+def test_both_legs(main):
+    straddle = main.build_straddle_iv(leg([12.0, 13.0], [110.0, 112.0]), leg([14.0, 15.0], [90.0, 88.0]))
+    assert straddle['call_iv'].tolist() == [12.0, 13.0]
+    assert straddle['put_iv'].tolist() == [14.0, 15.0]
+    assert straddle['iv'].tolist() == [13.0, 14.0]
+    assert straddle['close'].tolist() == [200.0, 200.0]
+    assert straddle['fclose'].tolist() == [26010.0, 26010.0]
+    assert (straddle['option_type'] == 'cp').all()
+
+
+def test_candle_missing_from_one_leg(main):
+    # The put has no 09:16 candle: that candle has no straddle premium, so it is left out
+    call = leg([12.0, 13.0, 14.0], [110.0, 112.0, 114.0])
+    put = leg([14.0, 15.0, 16.0], [90.0, 88.0, 86.0]).drop(index=1)
+    straddle = main.build_straddle_iv(call, put)
+    assert straddle['date'].tolist() == [pd.Timestamp('2026-01-05 09:15'), pd.Timestamp('2026-01-05 09:17')]
+    assert straddle['iv'].tolist() == [13.0, 15.0]
+
+
+@pytest.mark.parametrize('missing', [0.0, np.nan])
+def test_leg_without_iv_uses_the_other_leg(main, missing):
+    straddle = main.build_straddle_iv(leg([12.0, missing], [110.0, 112.0]), leg([14.0, 15.0], [90.0, 88.0]))
+    assert straddle['iv'].tolist() == [13.0, 15.0]
+
+    straddle = main.build_straddle_iv(leg([12.0, 13.0], [110.0, 112.0]), leg([missing, 15.0], [90.0, 88.0]))
+    assert straddle['iv'].tolist() == [12.0, 14.0]
+
+
+def test_no_valid_leg(main):
+    straddle = main.build_straddle_iv(leg([0.0], [110.0]), leg([np.nan], [90.0]))
+    assert straddle['iv'].tolist() == [0.0]
@@ -32,13 +32,8 @@ except ImportError:
 # Constants
 DATA_FOLDER = 'data'
 
-# Market hours configuration
-# NSE: 9:15 AM to 3:30 PM IST
-# MCX: 9:00 AM to 11:30 PM IST (23:30)
-MARKET_HOURS = {
-    'NSE': {'open': (9, 15), 'close': (15, 30)},  # 9:15 AM to 3:30 PM IST
-    'MCX': {'open': (9, 0), 'close': (23, 30)}     # 9:00 AM to 11:30 PM IST
-}
+# Market hours configuration (NSE: 9:15 AM - 3:30 PM IST, MCX: 9:00 AM - 11:30 PM IST)
+from market_calendar import MARKET_HOURS
 
 # Create data folder if it doesn't exist
 if not os.path.exists(DATA_FOLDER):